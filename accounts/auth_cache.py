@@ -0,0 +1,71 @@
+"""
+Short-lived cache of authenticated users.
+
+Cached users carry their default organization (and API token, if any) so that a cache hit
+resolves everything authentication needs in a single lookup. Entries are dropped by signal
+receivers whenever a user, token or membership changes.
+"""
+from hashlib import md5
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from .models import Membership, Token
+
+USER_KEY = "auth:user:{}"
+TOKEN_KEY = "auth:token:{}"
+
+User = get_user_model()
+
+
+def _token_key(key):
+    return TOKEN_KEY.format(md5(key.encode()).hexdigest())
+
+
+def _prepare(user):
+    user.organization  # populate cached_property so it is pickled along with the user
+    return user
+
+
+def get_user(user_id):
+    key = USER_KEY.format(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = User.objects.filter(id=user_id).first()
+        if user is None:
+            return None
+        cache.set(key, _prepare(user), settings.AUTH_CACHE_TIMEOUT)
+    return user
+
+
+def get_token_user(token_key):
+    key = _token_key(token_key)
+    user = cache.get(key)
+    if user is None:
+        token = Token.objects.select_related("user").filter(key=token_key).first()
+        if token is None:
+            return None
+        user = _prepare(token.user)
+        cache.set(key, user, settings.AUTH_CACHE_TIMEOUT)
+    return user
+
+
+def invalidate_token(token_key):
+    cache.delete(_token_key(token_key))
+
+
+def invalidate_users(*user_ids):
+    keys = [USER_KEY.format(user_id) for user_id in user_ids]
+    keys.extend(
+        _token_key(token_key)
+        for token_key in Token.objects.filter(user_id__in=user_ids).values_list("key", flat=True)
+    )
+    cache.delete_many(keys)
+
+
+def invalidate_organization(organization_id):
+    user_ids = Membership.objects.filter(organization_id=organization_id).values_list(
+        "user_id", flat=True
+    )
+    invalidate_users(*user_ids)
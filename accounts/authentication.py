@@ -1,18 +1,35 @@
 import jwt
-from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
-from django.core.exceptions import ValidationError
 from django.utils.encoding import smart_text
 from django.utils.translation import ugettext as _
-from jwt.exceptions import DecodeError
 from rest_framework import exceptions
 from rest_framework.authentication import get_authorization_header
 from rest_framework_jwt import authentication as jwt_auth
+from rest_framework_jwt.settings import api_settings
 
 from accounts.utils import jwt_decode_handler
-from .models import Token
+from . import auth_cache
 
-User = get_user_model()
+jwt_get_username_from_payload = api_settings.JWT_PAYLOAD_GET_USERNAME_HANDLER
+
+
+def _check_active(user):
+    if not user.is_active:
+        raise exceptions.AuthenticationFailed(_("User account is disabled."))
+    return user
+
+
+class CachedCredentialsMixin:
+    """Resolve JWT users through the authentication cache."""
+
+    def authenticate_credentials(self, payload):
+        if "user_id" not in payload:
+            return super().authenticate_credentials(payload)
+
+        user = auth_cache.get_user(payload["user_id"])
+        if user is None or user.get_username() != jwt_get_username_from_payload(payload):
+            raise exceptions.AuthenticationFailed(_("Invalid signature."))
+        return _check_active(user)
 
 
 class APITokenAuthentication(jwt_auth.BaseJSONWebTokenAuthentication):
@@ -30,38 +47,26 @@ class APITokenAuthentication(jwt_auth.BaseJSONWebTokenAuthentication):
         if smart_text(header_prefix) != self.auth_header_prefix:
             return None
 
-        try:
-            Token.objects.filter(key=token.decode("utf-8")).get()
-        except (ValidationError, Token.DoesNotExist):
+        self.token_user = auth_cache.get_token_user(token.decode("utf-8"))
+        if self.token_user is None:
             return None
 
         return token
 
+    def authenticate_credentials(self, payload):
+        return _check_active(self.token_user)
+
     def authenticate_header(self, request):
         return '{} realm="{}"'.format(self.auth_header_prefix, self.www_authenticate_realm)
 
 
-class ShadowJWTAuthentication(jwt_auth.JSONWebTokenAuthentication):
-    def authenticate(self, request):
-        auth = super().authenticate(request)
-
-        try:
-            user, raw_jwt = auth
-        except TypeError:
-            return auth
-
-        try:
-            jwt = jwt_decode_handler(raw_jwt)
-        except DecodeError:
-            jwt = {}
-
-        is_superuser = User.objects.filter(id=jwt.get("user_id"), is_superuser=True).exists()
-        shadow_user = User.objects.filter(id=jwt.get("shadow")).first()
-
-        if is_superuser and shadow_user:
-            user = shadow_user
-
-        return user, raw_jwt
+class ShadowJWTAuthentication(CachedCredentialsMixin, jwt_auth.JSONWebTokenAuthentication):
+    def authenticate_credentials(self, payload):
+        user = super().authenticate_credentials(payload)
+        shadow_id = payload.get("shadow")
+        if shadow_id and user.is_superuser:
+            user = auth_cache.get_user(shadow_id) or user
+        return user
 
 
 class PublicJWTAuthentication(jwt_auth.JSONWebTokenAuthentication):
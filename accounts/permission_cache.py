@@ -0,0 +1,83 @@
+"""
+Cached object permission resolution.
+
+Permitted object ids are stored per user (and organization) under keys that embed a version
+token. Changing a membership or an object permission replaces the version token, which makes
+all entries built on top of it unreachable without having to find and delete them.
+"""
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from guardian.shortcuts import get_objects_for_user
+
+from .models import OrgMembership
+
+USER_VERSION_KEY = "perms:user:{}:version"
+ORG_VERSION_KEY = "perms:org:{}:version"
+ORGANIZATIONS_KEY = "perms:org:{}:{}:organizations"
+PERMITTED_KEY = "perms:user:{}:{}:org:{}:{}:{}:{}"
+
+
+def _versions(*keys):
+    versions = cache.get_many(keys)
+    missing = {key: uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def _bump(key_template, *ids):
+    cache.set_many({key_template.format(pk): uuid4().hex for pk in ids}, None)
+
+
+def invalidate_users(*user_ids):
+    _bump(USER_VERSION_KEY, *user_ids)
+
+
+def invalidate_organizations(*organization_ids):
+    _bump(ORG_VERSION_KEY, *organization_ids)
+
+
+def get_organization_ids(organization_id):
+    """Return id of the organization and ids of all its child organizations."""
+    (version,) = _versions(ORG_VERSION_KEY.format(organization_id))
+    key = ORGANIZATIONS_KEY.format(organization_id, version)
+    organization_ids = cache.get(key)
+    if organization_ids is None:
+        organization_ids = [organization_id] + list(
+            OrgMembership.objects.filter(parent_id=organization_id).values_list(
+                "child_id", flat=True
+            )
+        )
+        cache.set(key, organization_ids, settings.PERMISSION_CACHE_TIMEOUT)
+    return organization_ids
+
+
+def get_permitted_ids(user, perm, model, organization_id=None):
+    """
+    Return ids of `model` objects `user` was granted `perm` on.
+
+    If `organization_id` is given, only objects belonging to that organization or to one of its
+    child organizations are considered.
+    """
+    version_keys = [USER_VERSION_KEY.format(user.pk)]
+    if organization_id is not None:
+        version_keys.append(ORG_VERSION_KEY.format(organization_id))
+    user_version, *org_version = _versions(*version_keys)
+    key = PERMITTED_KEY.format(
+        user.pk, user_version, organization_id, "".join(org_version), model._meta.label_lower, perm
+    )
+    permitted = cache.get(key)
+    if permitted is None:
+        queryset = model._default_manager.all()
+        if organization_id is not None:
+            queryset = queryset.filter(organization_id__in=get_organization_ids(organization_id))
+        permitted = list(
+            get_objects_for_user(user, perm, queryset, with_superuser=False).values_list(
+                "id", flat=True
+            )
+        )
+        cache.set(key, permitted, settings.PERMISSION_CACHE_TIMEOUT)
+    return permitted
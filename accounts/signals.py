@@ -3,10 +3,13 @@ from copy import deepcopy
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import Signal, receiver
+from guardian.models import GroupObjectPermission, UserObjectPermission
 
+from accounts import auth_cache, permission_cache
 from accounts.choices import ApplicationTypes, RoleTypes
-from accounts.models import Organization
+from accounts.models import Membership, Organization, OrgMembership, Token
 
 user_role_changed = Signal(providing_args=["instance"])
 subscription_started = Signal(providing_args=["instance"])
@@ -86,3 +89,51 @@ def apply_org_app_permissions(sender, instance, **kwargs):
     users = instance.user_set.filter(role__in=org_user_types)
     for user in users:
         apply_user_permissions(get_user_model(), user)
+
+
+@receiver([post_save, post_delete], sender=get_user_model())
+def invalidate_user_auth_cache(sender, instance, **kwargs):
+    auth_cache.invalidate_users(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Token)
+def invalidate_token_auth_cache(sender, instance, **kwargs):
+    auth_cache.invalidate_token(instance.key)
+
+
+@receiver([post_save, post_delete], sender=Membership)
+def invalidate_membership_auth_cache(sender, instance, **kwargs):
+    auth_cache.invalidate_users(instance.user_id)
+
+
+@receiver(post_save, sender=Organization)
+def invalidate_organization_auth_cache(sender, instance, created, **kwargs):
+    if not created:
+        auth_cache.invalidate_organization(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=UserObjectPermission)
+def invalidate_user_permission_cache(sender, instance, **kwargs):
+    permission_cache.invalidate_users(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=GroupObjectPermission)
+def invalidate_group_permission_cache(sender, instance, **kwargs):
+    user_ids = instance.group.user_set.values_list("id", flat=True)
+    permission_cache.invalidate_users(*user_ids)
+
+
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+def invalidate_user_groups_permission_cache(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            permission_cache.invalidate_users(instance.pk)
+    elif action in ("post_add", "post_remove"):
+        permission_cache.invalidate_users(*pk_set)
+    elif action == "pre_clear":
+        permission_cache.invalidate_users(*instance.user_set.values_list("id", flat=True))
+
+
+@receiver([post_save, post_delete], sender=OrgMembership)
+def invalidate_org_membership_permission_cache(sender, instance, **kwargs):
+    permission_cache.invalidate_organizations(instance.parent_id)
@@ -283,6 +283,24 @@ class APITokenAuthenticationTestCase(TestCase):
             }
             self.assertIsNone(self.auth.get_jwt_value(self.request))
 
+    def test_authenticate_cached(self):
+        api_key = Token.objects.create(
+            name="test api key", organization=Organization.objects.create()
+        )
+        self.request.META = {
+            self.auth_header: "{} {}".format(self.auth.auth_header_prefix, api_key.key)
+        }
+        APITokenAuthentication().authenticate(self.request)
+
+        with self.assertNumQueries(0):
+            user, _ = APITokenAuthentication().authenticate(self.request)
+            self.assertEqual(user, api_key.user)
+            self.assertEqual(user.organization, api_key.organization)
+
+        with self.subTest("Revoked token"):
+            Token.objects.filter(pk=api_key.pk).delete()
+            self.assertIsNone(APITokenAuthentication().authenticate(self.request))
+
     def test_authenticate_header(self):
         self.assertIsInstance(self.auth.authenticate_header(self.request), str)
 
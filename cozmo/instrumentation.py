@@ -0,0 +1,162 @@
+"""
+Query instrumentation.
+
+`QueryRecorder` collects statistics of queries executed on a database connection, it is used
+by `cozmo.middleware.QueryInstrumentationMiddleware` for a sample of production requests and
+by `query_budget` in tests. Statistics of sampled requests are logged and aggregated per
+endpoint in cache, from where they are served to admins by `QueryStatsView`.
+"""
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+ENDPOINTS_KEY = "instrumentation:endpoints"
+STATS_KEY = "instrumentation:{}:{}"
+METRICS = ("requests", "queries", "duplicates", "db_ms", "total_ms", "n_plus_one")
+
+
+class QueryRecorder:
+    """
+    Collect count and duration of queries executed on a database connection.
+
+    Works regardless of `DEBUG`. Statements are counted both as executed, with parameters,
+    and as templates; a template repeated many times is likely an N+1 pattern.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.executed = Counter()
+        self.templates = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.monotonic() - start
+            self.count += 1
+            self.executed[(sql, repr(params))] += 1
+            self.templates[sql] += 1
+
+    @property
+    def duplicates(self):
+        """Number of queries repeating an already executed statement with same parameters."""
+        return self.count - len(self.executed)
+
+    def repeated(self, threshold):
+        """Return `(sql, count)` of statements executed at least `threshold` times."""
+        return [(sql, count) for sql, count in self.templates.most_common() if count >= threshold]
+
+    @classmethod
+    @contextmanager
+    def record(cls, using=DEFAULT_DB_ALIAS):
+        recorder = cls()
+        with connections[using].execute_wrapper(recorder):
+            yield recorder
+
+
+@contextmanager
+def query_budget(max_queries, max_duplicates=0, using=DEFAULT_DB_ALIAS):
+    """
+    Fail if the block executes more queries or duplicated queries than allowed.
+
+    Meant for tests, e.g. `with query_budget(5): self.client.get(url)`.
+    """
+    with QueryRecorder.record(using=using) as recorder:
+        yield recorder
+
+    if recorder.count > max_queries or recorder.duplicates > max_duplicates:
+        statements = "\n".join(f"{count} x {sql}" for sql, count in recorder.repeated(2))
+        raise AssertionError(
+            f"{recorder.count} queries ({recorder.duplicates} duplicated) executed, "
+            f"budget is {max_queries} ({max_duplicates} duplicated)\n{statements}"
+        )
+
+
+def record(endpoint, recorder, total_time, n_plus_one_threshold):
+    """Log statistics of a request and add them to the aggregates of its endpoint."""
+    repeated = recorder.repeated(n_plus_one_threshold)
+    values = {
+        "requests": 1,
+        "queries": recorder.count,
+        "duplicates": recorder.duplicates,
+        "db_ms": int(recorder.duration * 1000),
+        "total_ms": int(total_time * 1000),
+        "n_plus_one": int(bool(repeated)),
+    }
+    logger.info(
+        "%s queries=%d duplicates=%d db_ms=%d total_ms=%d",
+        endpoint,
+        values["queries"],
+        values["duplicates"],
+        values["db_ms"],
+        values["total_ms"],
+    )
+    for sql, count in repeated:
+        logger.warning("Possible N+1 in %s: %d x %s", endpoint, count, sql[:500])
+
+    try:
+        endpoints = cache.get(ENDPOINTS_KEY) or []
+        if endpoint not in endpoints:
+            cache.set(ENDPOINTS_KEY, sorted(set(endpoints) | {endpoint}), None)
+        for metric, value in values.items():
+            key = STATS_KEY.format(endpoint, metric)
+            cache.add(key, 0, None)
+            cache.incr(key, value)
+    except Exception:
+        logger.warning("Could not store query statistics of %s", endpoint, exc_info=True)
+
+
+def get_stats():
+    """Return aggregated statistics of all sampled endpoints, the most DB-heavy first."""
+    endpoints = cache.get(ENDPOINTS_KEY) or []
+    values = cache.get_many(
+        [STATS_KEY.format(endpoint, metric) for endpoint in endpoints for metric in METRICS]
+    )
+    stats = []
+    for endpoint in endpoints:
+        counters = {
+            metric: values.get(STATS_KEY.format(endpoint, metric), 0) for metric in METRICS
+        }
+        requests = counters["requests"] or 1
+        stats.append(
+            dict(
+                counters,
+                endpoint=endpoint,
+                avg_queries=counters["queries"] / requests,
+                avg_db_ms=counters["db_ms"] / requests,
+                avg_total_ms=counters["total_ms"] / requests,
+            )
+        )
+    return sorted(stats, key=lambda endpoint: endpoint["db_ms"], reverse=True)
+
+
+def reset_stats():
+    endpoints = cache.get(ENDPOINTS_KEY) or []
+    cache.delete_many(
+        [ENDPOINTS_KEY]
+        + [STATS_KEY.format(endpoint, metric) for endpoint in endpoints for metric in METRICS]
+    )
+
+
+class QueryStatsView(APIView):
+    """Read or reset query statistics aggregated per endpoint."""
+
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_stats())
+
+    def delete(self, request, *args, **kwargs):
+        reset_stats()
+        return Response(status=204)
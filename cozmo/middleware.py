@@ -1,10 +1,14 @@
 import pstats
+import random
+import time
 from cProfile import Profile
 from io import StringIO
 
 from django.conf import settings
 from django.http import HttpResponse
 
+from cozmo import instrumentation
+
 
 class cProfileMiddleware:
     # Based on https://github.com/someshchaturvedi/customizable-django-profiler
@@ -49,3 +53,35 @@ class cProfileMiddleware:
 
             can = False
         return can
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Record query statistics of a sample of requests.
+
+    The fraction of sampled requests is `QUERY_INSTRUMENTATION["sample_rate"]`, statistics
+    are aggregated per endpoint by `cozmo.instrumentation`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = getattr(settings, "QUERY_INSTRUMENTATION", {})
+        if random.random() >= config.get("sample_rate", 0):
+            return self.get_response(request)
+
+        start = time.monotonic()
+        with instrumentation.QueryRecorder.record() as recorder:
+            response = self.get_response(request)
+        total_time = time.monotonic() - start
+
+        resolver_match = getattr(request, "resolver_match", None)
+        view_name = resolver_match.view_name if resolver_match else "unresolved"
+        instrumentation.record(
+            f"{request.method}:{view_name}",
+            recorder,
+            total_time,
+            config.get("n_plus_one_threshold", 5),
+        )
+        return response
@@ -135,6 +135,7 @@ LOGGING = {
 }
 
 MIDDLEWARE = [
+    "cozmo.middleware.QueryInstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -260,6 +261,9 @@ CELERY_ROUTES = {"rental_network.tasks.*": {"queue": "selenium"}}
 
 # Cozmo
 PROFILER = {}
+# fraction of requests whose queries are recorded and threshold of repeated statements logged
+# as N+1, aggregated statistics are served at /service/queries/
+QUERY_INSTRUMENTATION = {"sample_rate": 0.0, "n_plus_one_threshold": 5}
 AIRBNB_ID = "3945gczqpi169jtyaouwzknrs"
 AIRBNB_SECRET = _required_env("AIRBNB_SECRET")
 BOOKING_CLIENT_SECRET = _required_env("BOOKING_CLIENT_SECRET")
@@ -353,6 +357,15 @@ SWAGGER_SETTINGS = {
 # drf-jwt
 JWT_AUTH = {"JWT_EXPIRATION_DELTA": timedelta(weeks=1)}
 
+# seconds authenticated users and API tokens are kept in cache
+AUTH_CACHE_TIMEOUT = 300
+# seconds resolved object permissions are kept in cache
+PERMISSION_CACHE_TIMEOUT = 600
+# seconds organization-wide CRM ticket statistics are kept in cache
+TICKET_STATS_CACHE_TIMEOUT = 300
+# seconds dashboard summaries are kept in cache
+DASHBOARD_CACHE_TIMEOUT = 60
+
 # sendgrid
 SENDGRID_API_KEY = _required_env("SENDGRID_API")
 
@@ -392,6 +405,10 @@ ZILLOW_SITE_KEY = _required_env("ZILLOW_SITE_KEY")
 LONG_TERM_CHANNELS_ENABLED = _required_env("LONG_TERM_CHANNELS_ENABLED") == "True"
 
 DEFAULT_SMART_PRICING_DAYS = 365
+SMART_PRICING_SOURCE = "services.pricing.PricingService"
+
+MEDIA_IMPORT_CONCURRENCY = 8
+DEPOSIT_REFUND_CONCURRENCY = 4
 
 INVITATION_EXPIRY_DAYS = 7
 
@@ -11,6 +11,8 @@ DATABASES["default"]["OPTIONS"] = {"sslmode": "require"}
 COZMO_CALENDAR_URL = "https://api-cozmo.voyajoy.com/calendars/{id}/ical/"
 COZMO_WEB_URL = "https://cozmo.voyajoy.com/"
 
+QUERY_INSTRUMENTATION = {**QUERY_INSTRUMENTATION, "sample_rate": 0.01}  # noqa: F405
+
 SUBSCRIPTION_PLANS = {
     "free": {
         "plan_id": "plan_FpWBb7GTQenrn4",
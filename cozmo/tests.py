@@ -1,7 +1,10 @@
 from unittest import mock
 
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
 
+from . import instrumentation
+from .instrumentation import QueryRecorder, query_budget
 from .storages import DOStorage
 
 RELATIVE_URL = "/some/relative/file/"
@@ -26,3 +29,64 @@ class DOStorageTestCase(TestCase):
         with self.subTest(msg="Relative url without slash"):
             relative = RELATIVE_URL.lstrip("/")
             self.assert_url_correct(relative)
+
+
+class QueryInstrumentationTestCase(TestCase):
+    def _query_users(self, times):
+        User = get_user_model()
+        for _ in range(times):
+            list(User.objects.filter(username="user"))
+
+    def test_recorder(self):
+        with QueryRecorder.record() as recorder:
+            self._query_users(3)
+
+        self.assertEqual(recorder.count, 3)
+        self.assertEqual(recorder.duplicates, 2)
+        self.assertEqual(len(recorder.repeated(3)), 1)
+        self.assertEqual(recorder.repeated(4), [])
+
+    def test_query_budget(self):
+        with self.subTest(msg="Within budget"):
+            with query_budget(3, max_duplicates=2):
+                self._query_users(3)
+
+        with self.subTest(msg="Too many queries"):
+            with self.assertRaises(AssertionError):
+                with query_budget(2, max_duplicates=2):
+                    self._query_users(3)
+
+        with self.subTest(msg="Too many duplicates"):
+            with self.assertRaises(AssertionError):
+                with query_budget(3):
+                    self._query_users(2)
+
+    @mock.patch("cozmo.instrumentation.record")
+    def test_middleware_sampling(self, m_record):
+        with self.subTest(msg="Not sampled"):
+            with override_settings(QUERY_INSTRUMENTATION={"sample_rate": 0}):
+                self.client.get("/service/status/")
+            m_record.assert_not_called()
+
+        with self.subTest(msg="Sampled"):
+            with override_settings(QUERY_INSTRUMENTATION={"sample_rate": 1}):
+                self.client.get("/service/status/")
+            m_record.assert_called_once()
+            endpoint, recorder, total_time, threshold = m_record.call_args[0]
+            self.assertEqual(endpoint, "GET:status")
+            self.assertEqual(threshold, 5)
+
+    def test_stats(self):
+        recorder = QueryRecorder()
+        recorder.count = 4
+        recorder.duration = 0.02
+        instrumentation.reset_stats()
+        for _ in range(2):
+            instrumentation.record("GET:status", recorder, 0.05, 5)
+
+        stats = instrumentation.get_stats()
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats[0]["requests"], 2)
+        self.assertEqual(stats[0]["queries"], 8)
+        self.assertEqual(stats[0]["avg_queries"], 4)
+        instrumentation.reset_stats()
@@ -26,6 +26,7 @@ from rest_framework.status import HTTP_200_OK
 from rest_framework_swagger.views import get_swagger_view
 
 from accounts.views import PhoneLoginView
+from cozmo.instrumentation import QueryStatsView
 from send_mail.tasks import parse_email
 from send_mail.views import MessageViewSet, ConversationInboxViewSet
 
@@ -61,6 +62,7 @@ urlpatterns = [
     url(r"^test/", test, name="test"),
     url(r"^doc/$", schema_view, name="swagger-ui"),
     url(r"^service/status/$", get_status_view, name="status"),
+    url(r"^service/queries/$", QueryStatsView.as_view(), name="query-stats"),
     url(r"^api/v1/", include(("public_api.urls", "public_api"), namespace="v1")),
     url(r"^api-auth/", include("rest_framework.urls", namespace="rest_framework")),
     url(r"^accounts/", include("allauth.urls")),
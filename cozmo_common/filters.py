@@ -7,7 +7,7 @@ from rest_framework.exceptions import NotFound
 from rest_framework.fields import BooleanField
 from rest_framework.filters import BaseFilterBackend
 
-from accounts.models import OrgMembership
+from accounts import permission_cache
 
 
 class DateFilter(BaseFilterBackend):
@@ -148,8 +148,8 @@ class OrgGroupFilter(BaseFilterBackend):
         if organization:
             org_field = "{}__in".format(
                 getattr(view, "org_lookup_field", self.default_org_lookup_field))
-            child_orgs = [o.child for o in OrgMembership.objects.filter(parent=organization)]
-            queryset = queryset.filter(**{org_field: [organization] + child_orgs})
+            organization_ids = permission_cache.get_organization_ids(organization.id)
+            queryset = queryset.filter(**{org_field: organization_ids})
         elif request.user.is_superuser:
             return queryset
         else:
@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.db.models import DEFERRED
 from rest_framework.exceptions import NotAuthenticated, NotFound
 
 from cozmo_common.permissions import ApplicationModelPermissions, IsOrgAllowedToRead
@@ -33,66 +34,164 @@ class ApplicationPermissionViewMixin:
 
 
 class ChangedFieldMixin:
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self._initial_data = {}
+    """
+    Track changes of the fields declared in `tracked_fields`.
+
+    Values are captured by reference in `from_db` and only turned into a snapshot when changes
+    are requested, so instances that are loaded and never modified pay almost nothing. Saving
+    a loaded instance without `update_fields` writes only the columns that changed.
+    """
+
+    tracked_fields = ()
+    ignored_fields = ("date_updated", "date_created")
+
+    _loaded_state = None
+    _db_state = None
+    _db_values = None
+    _snapshot = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_state = instance._db_state = (field_names, values)
+        return instance
+
+    @classmethod
+    def _tracked_attnames(cls):
+        if "_tracked_attnames_cache" not in cls.__dict__:
+            cls._tracked_attnames_cache = tuple(
+                cls._meta.get_field(name).attname for name in cls.tracked_fields
+            )
+        return cls._tracked_attnames_cache
+
+    @property
+    def _initial_data(self):
+        if self._snapshot is None:
+            names, values = self._loaded_state or ((), ())
+            tracked = self._tracked_attnames()
+            self._snapshot = {
+                name: value for name, value in zip(names, values) if name in tracked
+            }
+        return self._snapshot
 
     def snapshot_data(self):
-        self._initial_data = self._as_dict().copy()
-        ignored_fields = ("date_updated", "date_created")
-        for field in ignored_fields:
-            self._initial_data.pop(field, None)
+        self._snapshot = self._as_dict()
 
     def _as_dict(self):
-        ignored_fields = ("date_updated", "date_created", "_state")
-        initial_data = self.__dict__.copy()
-        related_objects = self._get_related_objects_for_change_fields()
-        data = dict()
-        for each in related_objects:
+        data = {
+            attname: self.__dict__[attname]
+            for attname in self._tracked_attnames()
+            if attname in self.__dict__
+        }
+        for each in self._get_related_objects_for_change_fields():
             rel_obj = getattr(self, each, None)
             if not rel_obj:
                 continue
-            data[each] = rel_obj.__dict__
-            for field in ignored_fields:
-                data[each].pop(field, None)
-        initial_data.update(data)
-        return initial_data
+            data[each] = {
+                field: value
+                for field, value in rel_obj.__dict__.items()
+                if not field.startswith("_") and field not in self.ignored_fields
+            }
+        return data
 
     def _get_related_objects_for_change_fields(self):
         return list()
 
     def _get_nested_changed_related_fields(self, new, old):
         if isinstance(new, dict):
-            return {field: value for field, value in new.items() if value != old[field]}
+            old = old or {}
+            return {field: value for field, value in new.items() if value != old.get(field)}
         return new
 
     def _changed_fields(self):
         d = self._as_dict()
         return {
-            field: self._get_nested_changed_related_fields(value, d[field])
+            field: self._get_nested_changed_related_fields(value, d.get(field))
             for field, value in self._initial_data.items()
-            if value != d[field]
+            if value != d.get(field)
         }
 
-    def _get_nested_updated_related_fields(self, new, old):
-        if isinstance(new, dict):
-            data = {
-                field: {"initial": value, "updated": old[field]}
-                for field, value in new.items()
-                if value != old[field]
+    def _get_nested_updated_related_fields(self, initial, updated):
+        if isinstance(initial, dict):
+            updated = updated or {}
+            return {
+                field: {"initial": value, "updated": updated.get(field)}
+                for field, value in initial.items()
+                if value != updated.get(field)
             }
-            return data
-        return {"initial": new, "updated": old}
+        return {"initial": initial, "updated": updated}
 
     def _updated_fields(self):
-        fields = self._changed_fields()
         d = self._as_dict()
         return {
-            field: self._get_nested_updated_related_fields(value, d[field])
-            for field, value in fields.items()
-            if value != d[field]
+            field: self._get_nested_updated_related_fields(value, d.get(field))
+            for field, value in self._initial_data.items()
+            if value != d.get(field)
         }
 
+    def _get_db_values(self):
+        if self._db_values is None and self._db_state is not None:
+            self._db_values = dict(zip(*self._db_state))
+        return self._db_values
+
+    def _set_db_state(self, attnames):
+        self._db_state = (attnames, tuple(self.__dict__[attname] for attname in attnames))
+        self._db_values = None
+
+    def _get_dirty_fields(self):
+        """
+        Return names of concrete fields that differ from the last known database state,
+        or `None` if every field has to be written.
+        """
+        db_values = self._get_db_values()
+        if db_values is None:
+            return None
+
+        opts = self._meta
+        if opts.pk.attname not in db_values or db_values[opts.pk.attname] != self.pk:
+            return None
+
+        dirty = []
+        for field in opts.concrete_fields:
+            if field.primary_key or field.attname not in self.__dict__:
+                continue
+            value = self.__dict__[field.attname]
+            old = db_values.get(field.attname, DEFERRED)
+            if (
+                old is DEFERRED
+                or old != value
+                or isinstance(value, (list, dict))  # could have been mutated in place
+                or getattr(field, "auto_now", False)
+            ):
+                dirty.append(field.name)
+        return dirty or None
+
+    def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
+        if update_fields is None and not force_insert and not self._state.adding:
+            update_fields = self._get_dirty_fields()
+        super().save(
+            force_insert=force_insert,
+            force_update=force_update,
+            using=using,
+            update_fields=update_fields,
+        )
+        self._set_db_state(
+            tuple(f.attname for f in self._meta.concrete_fields if f.attname in self.__dict__)
+        )
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        db_values = self._get_db_values() or {}
+        db_values.update(
+            {
+                f.attname: self.__dict__[f.attname]
+                for f in self._meta.concrete_fields
+                if f.attname in self.__dict__
+                and (fields is None or f.name in fields or f.attname in fields)
+            }
+        )
+        self._set_db_state(tuple(db_values))
+
     @property
     def request_user(self):
         return self._request_user if hasattr(self, "_request_user") else None
@@ -0,0 +1,28 @@
+# Generated by Django 2.0.9 on 2019-11-05 00:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("crm", "0002_auto_20191002_0029")]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX "crm_ticket_org_stats" '
+            'ON "crm_ticket" ("organization_id", "is_archived", "assignee_id");',
+            'DROP INDEX "crm_ticket_org_stats";',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX "crm_ticket_active_assignee" '
+            'ON "crm_ticket" ("organization_id", "assignee_id", "date_created" DESC) '
+            "WHERE NOT is_archived;",
+            'DROP INDEX "crm_ticket_active_assignee";',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX "crm_ticket_active_status" '
+            'ON "crm_ticket" ("organization_id", "status", "date_created" DESC) '
+            "WHERE NOT is_archived;",
+            'DROP INDEX "crm_ticket_active_status";',
+        ),
+    ]
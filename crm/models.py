@@ -5,6 +5,7 @@ from django.contrib.contenttypes import fields as ct_fields
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.postgres.fields import JSONField
 from django.db import models
+from django.db.models import Count, Q
 
 from cozmo.storages import UploadImageTo
 from cozmo_common.db.fields import PhoneField
@@ -62,6 +63,16 @@ class TicketQuerySet(models.QuerySet):
     def unassigned(self):
         return self.active().filter(assignee=None)
 
+    def stats(self):
+        """Return number of Tickets in each pre-defined category with a single query."""
+        active = Q(is_archived=False)
+        return self.aggregate(
+            active=Count("id", filter=active),
+            assigned=Count("id", filter=active & Q(assignee__isnull=False)),
+            unassigned=Count("id", filter=active & Q(assignee__isnull=True)),
+            archived=Count("id", filter=Q(is_archived=True)),
+        )
+
 
 class Ticket(models.Model):
     class Priorities(IntEnum):
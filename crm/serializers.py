@@ -1,8 +1,11 @@
 from dictdiffer import diff
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 
 from cozmo_common.fields import DefaultOrganization, NestedRelatedField
-from . import fields, models
+from . import fields, models, services, stats_cache
 
 
 class ListUpdateSerializer(serializers.ListSerializer):
@@ -36,6 +39,36 @@ class ContactSerializer(serializers.ModelSerializer):
         exclude = ("organization",)
 
 
+class AffectedRowsSerializer(serializers.Serializer):
+    """Number of rows affected in each model, e.g. by a dry run."""
+
+    def to_representation(self, instance):
+        return dict(instance)
+
+
+class ContactMergeSerializer(serializers.Serializer):
+
+    contacts = serializers.PrimaryKeyRelatedField(
+        many=True, queryset=models.Contact.objects.all()
+    )
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate_contacts(self, contacts):
+        organization_id = self.context["request"].user.organization.id
+        if any(c for c in contacts if c.organization_id != organization_id):
+            raise serializers.ValidationError("Invalid contacts")
+        if self.instance in contacts:
+            raise serializers.ValidationError("Cannot merge with itself")
+        return contacts
+
+    def update(self, instance, validated_data):
+        return AffectedRowsSerializer(
+            services.merge(
+                instance, validated_data["contacts"], dry_run=validated_data["dry_run"]
+            )
+        )
+
+
 class EventSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.TicketEvent
@@ -56,18 +89,22 @@ class BulkBaseSerializer(serializers.Serializer):
 
 class BulkArchiveSerializer(BulkBaseSerializer):
     def create(self, validated_data):
-        for ticket in validated_data["tickets"]:
-            ticket.is_archived = True
-            ticket.save()
+        models.Ticket.objects.filter(pk__in=[t.pk for t in validated_data["tickets"]]).update(
+            is_archived=True, date_updated=timezone.now()
+        )
+        stats_cache.invalidate_organizations(self.context["request"].user.organization.id)
         return validated_data
 
 
 class BulkUpdateSerializer(BulkBaseSerializer):
 
+    dry_run = serializers.BooleanField(default=False, write_only=True)
     status = fields.EnumField(
         enum_klass=models.Ticket.Statuses, default=models.Ticket.Statuses.Open, required=False
     )
-    type = fields.EnumField(enum_klass=models.Ticket.TicketTypes, required=False)
+    type = fields.EnumField(
+        enum_klass=models.Ticket.TicketTypes, source="ticket_type", required=False
+    )
     tags = fields.TagRelatedField(many=True, required=False)
     priority = serializers.IntegerField(
         min_value=min(models.Ticket.Priorities),
@@ -93,21 +130,47 @@ class BulkUpdateSerializer(BulkBaseSerializer):
 
         return data
 
+    def _get_values(self, validated_data):
+        """Return Ticket columns set by the request."""
+        return {
+            field.source: validated_data[field.source]
+            for name, field in self.fields.items()
+            if name in self.initial_data and name not in ("tickets", "dry_run", "tags")
+        }
+
     def create(self, validated_data):
-        tickets = validated_data["tickets"]
-        serializer = TicketDetailedSerializer(
-            instance=tickets,
-            partial=True,
-            many=True,
-            context=self.context,
-            data=[self.initial_data] * len(tickets),
+        ids = [ticket.pk for ticket in validated_data["tickets"]]
+        if validated_data.get("dry_run", False):
+            return AffectedRowsSerializer({models.Ticket._meta.label: len(ids)})
+
+        tickets = (
+            models.Ticket.objects.filter(pk__in=ids)
+            .select_related("assignee", "creator", "requester")
+            .prefetch_related("tags")
+            .order_by("pk")
         )
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
-
-        validated_data.setdefault("assignee", None)
-        validated_data.setdefault("tags", [])
-        return TicketSerializer(instance=tickets, many=True)
+        tags = validated_data.get("tags") if "tags" in self.initial_data else None
+        with transaction.atomic():
+            old = TicketSerializer(instance=tickets, many=True).data
+            tickets.update(date_updated=timezone.now(), **self._get_values(validated_data))
+
+            if tags is not None:
+                content_type = ContentType.objects.get_for_model(models.Ticket)
+                models.Tag.objects.filter(content_type=content_type, object_id__in=ids).delete()
+                models.Tag.objects.bulk_create(
+                    models.Tag(name=tag.name, content_type=content_type, object_id=pk)
+                    for pk in ids
+                    for tag in tags
+                )
+
+            new = TicketSerializer(instance=tickets.all(), many=True)
+            models.TicketEvent.objects.bulk_create(
+                models.TicketEvent(diff=d, ticket_id=after["id"])
+                for before, after in zip(old, new.data)
+                for d in diff(before, after, ignore=["date_updated"])
+            )
+        stats_cache.invalidate_organizations(self.context["request"].user.organization.id)
+        return new
 
 
 class LinksToSerializer(serializers.ModelSerializer):
@@ -131,6 +194,9 @@ class LinkedBySerializer(serializers.ModelSerializer):
 
 
 class MergeSerializer(BulkBaseSerializer):
+
+    dry_run = serializers.BooleanField(default=False, write_only=True)
+
     def validate_tickets(self, tickets):
         super().validate_tickets(tickets)
         if self.instance in tickets:
@@ -138,20 +204,27 @@ class MergeSerializer(BulkBaseSerializer):
         return tickets
 
     def update(self, instance, validated_data):
-        old = TicketDetailedSerializer(instance=instance).data
-
         ids = [obj.id for obj in validated_data["tickets"]]
-        models.Ticket.objects.filter(id__in=ids).update(status=models.Ticket.Statuses.Solved)
-
-        models.TicketLink.objects.bulk_create(
-            models.TicketLink(from_ticket=instance, to_ticket_id=to_id) for to_id in ids
-        )
-
-        new = TicketDetailedSerializer(instance=instance).data
-        models.TicketEvent.objects.bulk_create(
-            models.TicketEvent(diff=d, ticket=instance)
-            for d in diff(old, new, ignore=["date_updated"])
-        )
+        if validated_data["dry_run"]:
+            return AffectedRowsSerializer(
+                {models.Ticket._meta.label: len(ids), models.TicketLink._meta.label: len(ids)}
+            )
+
+        with transaction.atomic():
+            old = TicketDetailedSerializer(instance=instance).data
+
+            models.Ticket.objects.filter(id__in=ids).update(
+                status=models.Ticket.Statuses.Solved, date_updated=timezone.now()
+            )
+            models.TicketLink.objects.bulk_create(
+                models.TicketLink(from_ticket=instance, to_ticket_id=to_id) for to_id in ids
+            )
+
+            new = TicketDetailedSerializer(instance=instance).data
+            models.TicketEvent.objects.bulk_create(
+                models.TicketEvent(diff=d, ticket=instance)
+                for d in diff(old, new, ignore=["date_updated"])
+            )
 
         return TicketSerializer(instance=instance)
 
@@ -170,22 +243,10 @@ class MessageSerializer(serializers.ModelSerializer):
 
 class StatsSerializer(serializers.Serializer):
 
-    active = serializers.SerializerMethodField()
-    assigned = serializers.SerializerMethodField()
-    unassigned = serializers.SerializerMethodField()
-    archived = serializers.SerializerMethodField()
-
-    def get_active(self, obj):
-        return obj.active().count()
-
-    def get_assigned(self, obj):
-        return obj.assigned().count()
-
-    def get_unassigned(self, obj):
-        return obj.unassigned().count()
-
-    def get_archived(self, obj):
-        return obj.archived().count()
+    active = serializers.IntegerField()
+    assigned = serializers.IntegerField()
+    unassigned = serializers.IntegerField()
+    archived = serializers.IntegerField()
 
 
 class TicketSerializer(TicketMinimalSerializer):
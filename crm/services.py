@@ -0,0 +1,49 @@
+from collections import OrderedDict
+
+from django.contrib.contenttypes.fields import GenericRelation
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+
+def _references(model):
+    """
+    Yield `(related model, column, filters)` of every relation pointing to `model`.
+
+    Reverse foreign keys and generic relations declared on `model` are included, `filters`
+    restrict generic relations to rows of `model`.
+    """
+    for field in model._meta.get_fields(include_hidden=True):
+        if field.one_to_many and field.auto_created and not field.concrete:
+            yield field.related_model, field.field.attname, {}
+        elif isinstance(field, GenericRelation):
+            content_type = ContentType.objects.get_for_model(model)
+            yield (
+                field.related_model,
+                field.object_id_field_name,
+                {field.content_type_field_name: content_type},
+            )
+
+
+def merge(instance, duplicates, dry_run=False):
+    """
+    Re-point every row referencing `duplicates` to `instance` and delete the duplicates.
+
+    Each referencing table is updated with a single UPDATE, all in one transaction. Return
+    number of affected rows per model; with `dry_run` nothing is changed.
+    """
+    model = type(instance)
+    ids = [obj.pk for obj in duplicates if obj.pk != instance.pk]
+    affected = OrderedDict()
+    with transaction.atomic():
+        for related_model, column, filters in _references(model):
+            queryset = related_model._base_manager.filter(**{f"{column}__in": ids}, **filters)
+            label = related_model._meta.label
+            affected[label] = affected.get(label, 0) + (
+                queryset.count() if dry_run else queryset.update(**{column: instance.pk})
+            )
+
+        queryset = model._base_manager.filter(pk__in=ids)
+        affected[model._meta.label] = (
+            queryset.count() if dry_run else queryset.delete()[1].get(model._meta.label, 0)
+        )
+    return affected
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import stats_cache
+from .models import Ticket
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def invalidate_stats(sender, instance, **kwargs):
+    stats_cache.invalidate_organizations(instance.organization_id)
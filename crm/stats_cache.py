@@ -0,0 +1,26 @@
+"""
+Cached Ticket statistics.
+
+Statistics of all Tickets of an organization are kept in cache until any Ticket of that
+organization is saved or deleted.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Ticket
+
+STATS_KEY = "crm:ticket-stats:{}"
+
+
+def invalidate_organizations(*organization_ids):
+    cache.delete_many([STATS_KEY.format(pk) for pk in organization_ids])
+
+
+def get_stats(organization_id):
+    """Return statistics of all Tickets of the organization."""
+    key = STATS_KEY.format(organization_id)
+    stats = cache.get(key)
+    if stats is None:
+        stats = Ticket.objects.filter(organization_id=organization_id).stats()
+        cache.set(key, stats, settings.TICKET_STATS_CACHE_TIMEOUT)
+    return stats
@@ -1,10 +1,16 @@
+from decimal import Decimal
 from unittest import mock
 
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
 from rest_framework.exceptions import ValidationError
 
 from accounts.models import Organization
-from . import fields, models, serializers, views
+from listings.models import Property, Reservation
+from . import fields, models, serializers, stats_cache, views
+
+User = get_user_model()
 
 
 # fields tests
@@ -34,6 +40,42 @@ class TagRelatedFieldTestCase(TestCase):
         self.assertIsNone(tag.id)
 
 
+# models tests
+
+
+class TicketQuerySetTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create()
+        cls.user = User.objects.create(username="assignee")
+        ticket_type = models.Ticket.TicketTypes.Task
+        for is_archived, assignee in ((False, None), (False, cls.user), (True, cls.user)):
+            models.Ticket.objects.create(
+                title="Title",
+                ticket_type=ticket_type,
+                organization=cls.organization,
+                is_archived=is_archived,
+                assignee=assignee,
+            )
+
+    def setUp(self):
+        cache.delete(stats_cache.STATS_KEY.format(self.organization.id))
+
+    def test_stats(self):
+        expected = {"active": 2, "assigned": 1, "unassigned": 1, "archived": 1}
+        with self.assertNumQueries(1):
+            self.assertEqual(models.Ticket.objects.stats(), expected)
+
+        with self.subTest(msg="Cached per organization"):
+            self.assertEqual(stats_cache.get_stats(self.organization.id), expected)
+            with self.assertNumQueries(0):
+                self.assertEqual(stats_cache.get_stats(self.organization.id), expected)
+
+        with self.subTest(msg="Invalidated on change"):
+            models.Ticket.objects.filter(is_archived=True).get().delete()
+            self.assertEqual(stats_cache.get_stats(self.organization.id)["archived"], 0)
+
+
 # serializers tests
 
 
@@ -139,6 +181,105 @@ class TickerSerializerTestCase(TestCase):
             instance = serializer.save()
             self.assertEqual(instance.tags.count(), 0)
 
+    def test_bulk_update(self):
+        tickets = [
+            models.Ticket.objects.create(
+                title=self.title,
+                organization=self.organization,
+                ticket_type=models.Ticket.TicketTypes.Problem,
+            )
+            for _ in range(2)
+        ]
+        data = {
+            "tickets": [t.id for t in tickets],
+            "status": models.Ticket.Statuses.Solved.name,
+            "type": models.Ticket.TicketTypes.Question.name,
+            "tags": self.tags,
+        }
+
+        with self.subTest(msg="Dry run"):
+            serializer = serializers.BulkUpdateSerializer(
+                data=dict(data, dry_run=True), partial=True, context=self.context
+            )
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+            self.assertEqual(serializer.save().data, {"crm.Ticket": 2})
+            self.assertFalse(models.Ticket.objects.filter(status=2).exists())
+
+        serializer = serializers.BulkUpdateSerializer(
+            data=data, partial=True, context=self.context
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        updated = serializer.save().data
+        self.assertEqual([t["status"] for t in updated], ["Solved", "Solved"])
+        for ticket in tickets:
+            ticket.refresh_from_db()
+            self.assertEqual(ticket.status, models.Ticket.Statuses.Solved)
+            self.assertEqual(ticket.ticket_type, models.Ticket.TicketTypes.Question)
+            self.assertCountEqual(ticket.tags.values_list("name", flat=True), self.tags)
+            self.assertCountEqual(
+                [event.diff[:2] for event in ticket.ticketevent_set.all()],
+                [["change", "type"], ["change", "status"], ["add", "tags"]],
+            )
+
+
+class ContactMergeSerializerTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create()
+        cls.context = {"request": mock.Mock(**{"user.organization": cls.organization})}
+        cls.prop = Property.objects.create(
+            name="Name",
+            property_type=Property.Types.Apartment.value,
+            rental_type=Property.Rentals.Private.value,
+            organization=cls.organization,
+        )
+
+    def test_merge(self):
+        contact, *duplicates = (
+            models.Contact.objects.create(first_name=name, organization=self.organization)
+            for name in ("John", "Jon", "Johnny")
+        )
+        for duplicate in duplicates:
+            models.Ticket.objects.create(
+                title="Title",
+                ticket_type=models.Ticket.TicketTypes.Question,
+                requester=duplicate,
+                organization=self.organization,
+            )
+        Reservation.objects.create(
+            start_date="2019-11-01",
+            end_date="2019-11-03",
+            price=Decimal("0"),
+            paid=Decimal("0"),
+            prop=self.prop,
+            guest=duplicates[0],
+        )
+        data = {"contacts": [c.id for c in duplicates]}
+
+        with self.subTest(msg="Dry run"):
+            serializer = serializers.ContactMergeSerializer(
+                contact, data=dict(data, dry_run=True), context=self.context
+            )
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+            affected = serializer.save().data
+            self.assertEqual(affected["crm.Ticket"], 2)
+            self.assertEqual(affected["listings.Reservation"], 1)
+            self.assertEqual(affected["crm.Contact"], 2)
+            self.assertEqual(models.Contact.objects.count(), 3)
+
+        serializer = serializers.ContactMergeSerializer(contact, data=data, context=self.context)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.save().data, affected)
+        self.assertEqual(list(models.Contact.objects.all()), [contact])
+        self.assertEqual(models.Ticket.objects.filter(requester=contact).count(), 2)
+        self.assertTrue(Reservation.objects.filter(guest=contact).exists())
+
+        with self.subTest(msg="Cannot merge with itself"):
+            serializer = serializers.ContactMergeSerializer(
+                contact, data={"contacts": [contact.id]}, context=self.context
+            )
+            self.assertFalse(serializer.is_valid())
+
 
 # views tests
 
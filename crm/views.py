@@ -5,7 +5,7 @@ from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 
 from cozmo_common.filters import OrganizationFilter
-from . import filters, models, serializers
+from . import filters, models, serializers, stats_cache
 
 
 class TicketViewSet(viewsets.ModelViewSet):
@@ -36,7 +36,7 @@ class TicketViewSet(viewsets.ModelViewSet):
         """
         Update multiple Tickets at once.
 
-        Return list of updated tickets.
+        Return list of updated tickets, or number of affected records on dry run.
         """
         serializer = self.get_serializer(data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
@@ -65,8 +65,12 @@ class TicketViewSet(viewsets.ModelViewSet):
     )
     def stats(self, request):
         """Read number of Tickets in each pre-defined category."""
-        queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(instance=queryset)
+        organization = request.user.organization
+        if organization and not request.query_params:
+            stats = stats_cache.get_stats(organization.id)
+        else:
+            stats = self.filter_queryset(self.get_queryset()).stats()
+        serializer = self.get_serializer(instance=stats)
         return Response(serializer.data)
 
     @action(
@@ -76,10 +80,10 @@ class TicketViewSet(viewsets.ModelViewSet):
         """
         Merge chosen Tickets with parent one.
 
-        This means Messages and Tags will be moved to a parent Ticket and merged tickets
-        will be deleted.
+        This means merged Tickets will be linked to a parent Ticket and marked as solved.
+        With `dry_run` nothing is changed.
 
-        Return updated Ticket.
+        Return updated Ticket, or number of affected records on dry run.
         """
         instance = self.get_object()
         serializer = self.get_serializer(instance=instance, data=request.data)
@@ -107,3 +111,23 @@ class ContactViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         serializer.save(organization=self.request.user.organization)
+
+    @action(
+        detail=True,
+        methods=["POST"],
+        get_serializer_class=lambda: serializers.ContactMergeSerializer,
+    )
+    def merge(self, request, pk):
+        """
+        Merge chosen Contacts with parent one.
+
+        Tickets, Reservations and other records of merged Contacts are moved to the parent
+        Contact and merged Contacts are deleted. With `dry_run` nothing is changed.
+
+        Return number of affected records of each kind.
+        """
+        instance = self.get_object()
+        serializer = self.get_serializer(instance=instance, data=request.data)
+        serializer.is_valid(raise_exception=True)
+        affected = serializer.save()
+        return Response(affected.data)
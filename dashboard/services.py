@@ -0,0 +1,152 @@
+"""
+Dashboard summary of an organization.
+
+Summaries are cached per organization under keys embedding a version token. Any change of
+data shown on the dashboard replaces the token, so stale summaries are never served even
+though they are kept for `DASHBOARD_CACHE_TIMEOUT` seconds.
+"""
+import hashlib
+import json
+from uuid import uuid4
+
+import pytz
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Exists, Q
+from django.utils import timezone
+
+from listings.choices import ReservationStatuses
+from listings.models import Property, Reservation
+from send_mail.choices import DeliveryStatus
+from send_mail.models import Message
+from settings.models import OrganizationSettings
+from .serializers import DashboardSerializer
+
+DEFAULT_TIME_ZONE = "America/Los_Angeles"
+VERSION_KEY = "dashboard:org:{}:version"
+SUMMARY_KEY = "dashboard:org:{}:{}:{}:{}"
+
+TODO_FIRST_PROPERTY = {
+    "title": "Create your first property",
+    "url": "/properties/",
+    "text": "Take your first step with Cozmo",  # noqa: E501
+    "icon": "download",
+}
+TODO_CHANNEL_NETWORK = {
+    "title": "Connect your properties to the channel network",
+    "url": "/channelnetwork/",
+    "text": "Earn more by exposing your home to multiple rental sites via the rental channel network",  # noqa: E501
+    "icon": "channels",
+}
+TODO_SMART_RESPONSES = {
+    "title": "Enable Smart Responses",
+    "url": "/settings/responses/",
+    "text": "Save more time by enabling our Smart Assistant to respond to simple guest queries",  # noqa: E501
+    "icon": "wrench",
+}
+
+
+def invalidate_organizations(*organization_ids):
+    cache.set_many({VERSION_KEY.format(pk): uuid4().hex for pk in organization_ids}, None)
+
+
+def _version(organization_id):
+    key = VERSION_KEY.format(organization_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid4().hex
+        cache.set(key, version, None)
+    return version
+
+
+def get_time_zone(organization):
+    time_zone = organization.timezone.name if organization.timezone_id else DEFAULT_TIME_ZONE
+    try:
+        return pytz.timezone(time_zone)
+    except pytz.UnknownTimeZoneError:
+        return pytz.timezone(DEFAULT_TIME_ZONE)
+
+
+class DashboardSummary:
+    """
+    Compute all dashboard widgets of an organization.
+
+    `filter_queryset` restricts querysets to objects the user may see, it is called with
+    the queryset and the lookups of organization and group of the queryset's model.
+    """
+
+    def __init__(self, organization, filter_queryset, scope="all"):
+        self.organization = organization
+        self.filter_queryset = filter_queryset
+        self.scope = scope
+        self.today = timezone.now().astimezone(get_time_zone(organization)).date()
+
+    def get_bookings(self):
+        reservations = self.filter_queryset(
+            Reservation.objects.filter(
+                Q(start_date=self.today) | Q(end_date=self.today),
+                status=ReservationStatuses.Accepted,
+            ).select_related("guest", "prop__pricing_settings"),
+            "prop__organization",
+            "prop__group",
+        )
+        bookings = {"arrivals": [], "departures": []}
+        for reservation in reservations:
+            if reservation.start_date == self.today:
+                bookings["arrivals"].append(reservation)
+            if reservation.end_date == self.today:
+                bookings["departures"].append(reservation)
+        return bookings
+
+    def get_messages(self):
+        return self.filter_queryset(
+            Message.objects.filter(outgoing=False, delivery_status=DeliveryStatus.delivered.value)
+            .select_related("conversation__reservation__guest")
+            .order_by("conversation_id", "-date_created")
+            .distinct("conversation_id"),
+            "conversation__reservation__prop__organization",
+            "conversation__reservation__prop__group",
+        )[:5]
+
+    def get_todo(self):
+        properties = self.filter_queryset(Property.objects.all(), "organization", "group")
+        org_settings = (
+            OrganizationSettings.objects.filter(organization=self.organization)
+            .annotate(has_properties=Exists(properties.values("pk")))
+            .values("channel_network_enabled", "chat_settings__enabled", "has_properties")
+            .first()
+        )
+        if org_settings is None:
+            org_settings = {"has_properties": properties.exists()}
+
+        todo = list()
+        if not org_settings["has_properties"]:
+            todo.append(TODO_FIRST_PROPERTY)
+        if not org_settings.get("channel_network_enabled"):
+            todo.append(TODO_CHANNEL_NETWORK)
+        if not org_settings.get("chat_settings__enabled"):
+            todo.append(TODO_SMART_RESPONSES)
+        return todo
+
+    def compute(self):
+        return DashboardSerializer(
+            {
+                "bookings": self.get_bookings(),
+                "messages": self.get_messages(),
+                "todo": self.get_todo(),
+            }
+        ).data
+
+    def get(self):
+        """Return `(data, etag)` of the summary, computing it if it is not cached."""
+        key = SUMMARY_KEY.format(
+            self.organization.id, _version(self.organization.id), self.scope, self.today
+        )
+        summary = cache.get(key)
+        if summary is None:
+            data = json.loads(json.dumps(self.compute(), cls=DjangoJSONEncoder))
+            etag = hashlib.md5(json.dumps(data, sort_keys=True).encode()).hexdigest()
+            summary = (data, etag)
+            cache.set(key, summary, settings.DASHBOARD_CACHE_TIMEOUT)
+        return summary
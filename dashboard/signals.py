@@ -0,0 +1,57 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import Organization
+from chat.models import Settings as ChatSettings
+from listings.models import Property, Reservation
+from send_mail.models import Message
+from settings.models import OrganizationSettings
+from .services import invalidate_organizations
+
+
+@receiver(post_save, sender=Organization)
+def invalidate_organization(sender, instance, **kwargs):
+    invalidate_organizations(instance.pk)
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+@receiver(post_save, sender=OrganizationSettings)
+def invalidate_owner(sender, instance, **kwargs):
+    invalidate_organizations(instance.organization_id)
+
+
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Reservation)
+def invalidate_reservation(sender, instance, **kwargs):
+    organization_id = (
+        Property.objects.filter(pk=instance.prop_id)
+        .values_list("organization_id", flat=True)
+        .first()
+    )
+    if organization_id is not None:
+        invalidate_organizations(organization_id)
+
+
+@receiver(post_save, sender=Message)
+def invalidate_message(sender, instance, **kwargs):
+    if instance.outgoing:
+        return
+    organization_id = (
+        Message.objects.filter(pk=instance.pk)
+        .values_list("conversation__reservation__prop__organization_id", flat=True)
+        .first()
+    )
+    if organization_id is not None:
+        invalidate_organizations(organization_id)
+
+
+@receiver(post_save, sender=ChatSettings)
+def invalidate_chat_settings(sender, instance, **kwargs):
+    organization_id = (
+        OrganizationSettings.objects.filter(pk=instance.org_settings_id)
+        .values_list("organization_id", flat=True)
+        .first()
+    )
+    if organization_id is not None:
+        invalidate_organizations(organization_id)
@@ -0,0 +1,58 @@
+import datetime as dt
+from decimal import Decimal
+
+from django.test import TestCase
+
+from accounts.models import Organization, Timezone
+from listings.models import Property, Reservation
+from .services import DashboardSummary
+
+
+class DashboardSummaryTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(
+            timezone=Timezone.objects.create(name="Pacific/Auckland")
+        )
+        cls.prop = Property.objects.create(
+            name="Name",
+            property_type=Property.Types.Apartment.value,
+            rental_type=Property.Rentals.Private.value,
+            organization=cls.organization,
+        )
+
+    def _summary(self):
+        return DashboardSummary(
+            self.organization,
+            lambda queryset, org_lookup, group_lookup: queryset.filter(
+                **{org_lookup: self.organization}
+            ),
+        )
+
+    def _reservation(self, start_date, end_date):
+        return Reservation.objects.create(
+            start_date=start_date,
+            end_date=end_date,
+            price=Decimal("0"),
+            paid=Decimal("0"),
+            prop=self.prop,
+            status=Reservation.Statuses.Accepted.value,
+        )
+
+    def test_get(self):
+        summary = self._summary()
+        arrival = self._reservation(summary.today, summary.today + dt.timedelta(days=3))
+
+        data, etag = summary.get()
+        self.assertEqual([r["id"] for r in data["bookings"]["arrivals"]], [arrival.id])
+        self.assertEqual(data["bookings"]["departures"], [])
+        self.assertNotIn("Create your first property", [t["title"] for t in data["todo"]])
+
+        with self.subTest("Cached"), self.assertNumQueries(0):
+            self.assertEqual(self._summary().get(), (data, etag))
+
+        with self.subTest("Invalidated on reservation change"):
+            departure = self._reservation(summary.today - dt.timedelta(days=3), summary.today)
+            data, new_etag = self._summary().get()
+            self.assertNotEqual(new_etag, etag)
+            self.assertEqual([r["id"] for r in data["bookings"]["departures"]], [departure.id])
@@ -1,103 +1,43 @@
-import pytz
-from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+from rest_framework.exceptions import NotFound
 from rest_framework.generics import GenericAPIView
-from rest_framework.mixins import RetrieveModelMixin
 from rest_framework.response import Response
-from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_200_OK, HTTP_304_NOT_MODIFIED
 
 from accounts.permissions import GroupAccess
 from cozmo_common.fields import AppendFields
 from cozmo_common.filters import OrganizationFilter
 from dashboard.serializers import DashboardSerializer
-from listings.choices import ReservationStatuses
+from dashboard.services import DashboardSummary
 from listings.filters import GroupAccessFilter
-from listings.models import Property, Reservation
-from send_mail.choices import DeliveryStatus
-from send_mail.models import Message
-from settings.models import OrganizationSettings
 
-TODO_FIRST_PROPERTY = {
-    "title": "Create your first property",
-    "url": "/properties/",
-    "text": "Take your first step with Cozmo",  # noqa: E501
-    "icon": "download",
-}
-TODO_CHANNEL_NETWORK = {
-    "title": "Connect your properties to the channel network",
-    "url": "/channelnetwork/",
-    "text": "Earn more by exposing your home to multiple rental sites via the rental channel network",  # noqa: E501
-    "icon": "channels",
-}
-TODO_SMART_RESPONSES = {
-    "title": "Enable Smart Responses",
-    "url": "/settings/responses/",
-    "text": "Save more time by enabling our Smart Assistant to respond to simple guest queries",  # noqa: E501
-    "icon": "wrench",
-}
 
-
-class DashboardViewSet(RetrieveModelMixin, GenericAPIView):
-    # TODO write tests
+class DashboardViewSet(GenericAPIView):
     permission_classes = (GroupAccess,)
     filter_backends = (OrganizationFilter, GroupAccessFilter)
     serializer_class = DashboardSerializer
 
-    def get_object(self):
-
-        # TODO fix this hardcoded hack
-        now = timezone.now()
-        t = pytz.timezone("America/Los_Angeles")
-        today = now.astimezone(t).date()
-
-        with AppendFields(
-            self, {"org_lookup_field": "prop__organization", "group_lookup_field": "prop__group"}
-        ):
-            arrivals = self.filter_queryset(
-                Reservation.objects.filter(start_date=today, status=ReservationStatuses.Accepted)
-            )
-            departures = self.filter_queryset(
-                Reservation.objects.filter(end_date=today, status=ReservationStatuses.Accepted)
-            )
-
+    def _filter_queryset(self, queryset, org_lookup_field, group_lookup_field):
         with AppendFields(
-            self,
-            {
-                "org_lookup_field": "conversation__reservation__prop__organization",
-                "group_lookup_field": "conversation__reservation__prop__group",
-            },
+            self, {"org_lookup_field": org_lookup_field, "group_lookup_field": group_lookup_field}
         ):
-            messages = self.filter_queryset(
-                Message.objects.filter(
-                    outgoing=False, delivery_status=DeliveryStatus.delivered.value
-                )
-                .order_by("conversation_id", "-date_created")
-                .distinct("conversation_id")
-            )[:5]
-
-        has_properties = self.filter_queryset(Property.objects.all()).exists()
-
-        has_channel_network_enabled = OrganizationSettings.objects.filter(
-            channel_network_enabled=True, organization=self.request.user.organization
-        ).exists()
-
-        has_smart_responses_enabled = OrganizationSettings.objects.filter(
-            chat_settings__enabled=True, organization=self.request.user.organization
-        ).exists()
-
-        todo = list()
-        if not has_properties:
-            todo.append(TODO_FIRST_PROPERTY)
-        if not has_channel_network_enabled:
-            todo.append(TODO_CHANNEL_NETWORK)
-        if not has_smart_responses_enabled:
-            todo.append(TODO_SMART_RESPONSES)
-
-        return {
-            "bookings": {"arrivals": arrivals, "departures": departures},
-            "messages": messages,
-            "todo": todo,
-        }
+            return self.filter_queryset(queryset)
 
     def get(self, request, *args, **kwargs):
-        serializer = self.get_serializer(self.get_object())
-        return Response(serializer.data, status=HTTP_200_OK)
+        organization = request.user.organization
+        if organization is None:
+            raise NotFound()
+
+        # Group contributors see only a subset of the organization's data
+        scope = request.user.pk if request.user.is_group_contributor else "all"
+        data, etag = DashboardSummary(organization, self._filter_queryset, scope).get()
+        etag = quote_etag(etag)
+
+        if etag in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+            response = Response(status=HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data, status=HTTP_200_OK)
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,62 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from internal.synthetic import DEFAULT_SCALE, SyntheticOrganization, email
+
+
+class Command(BaseCommand):
+
+    help = (
+        "Generate synthetic organizations and write credentials used by locustfile.py. "
+        "Counts of every kind of generated objects can be scaled with their own option."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--organizations", type=int, default=1)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--password", default="benchmark")
+        parser.add_argument(
+            "--today",
+            type=parse_date,
+            default=None,
+            help="Anchor date of generated reservations, defaults to today",
+        )
+        parser.add_argument(
+            "--ical-dir",
+            default="benchmark_calendars",
+            help="Directory iCal files of external calendars are written to",
+        )
+        parser.add_argument(
+            "--output",
+            default="benchmark_seed.json",
+            help="File the credentials and ids of generated organizations are written to",
+        )
+        for name, default in DEFAULT_SCALE.items():
+            parser.add_argument(f"--{name.replace('_', '-')}", type=type(default), default=default)
+
+    def handle(self, *args, **options):
+        verbosity = options["verbosity"]
+        seed = options["seed"]
+        emails = [email(seed, index) for index in range(options["organizations"])]
+        if get_user_model().objects.filter(username__in=emails).exists():
+            raise CommandError(f"Organizations of seed {seed} already exist, use another seed")
+
+        scale = {name: options[name] for name in DEFAULT_SCALE}
+        organizations = []
+        for index in range(options["organizations"]):
+            generator = SyntheticOrganization(
+                seed, index, scale=scale, today=options["today"], ical_dir=options["ical_dir"]
+            )
+            organizations.append(generator.create(options["password"]))
+            if verbosity > 1:
+                self.stdout.write(f"Created organization {organizations[-1]['organization']}")
+
+        with open(options["output"], "w") as f:
+            json.dump({"seed": seed, "organizations": organizations}, f, indent=2)
+
+        if verbosity > 0:
+            message = f"Created {len(organizations)} organizations, see {options['output']}"
+            self.stdout.write(self.style.SUCCESS(message))
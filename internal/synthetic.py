@@ -0,0 +1,503 @@
+"""
+Synthetic organizations for benchmarks.
+
+Every organization is generated from its own random generator seeded with the seed of the run
+and the index of the organization, so the same seed, scale and anchor date always produce the
+same data. Rows are inserted with `bulk_create`, no signals are sent.
+"""
+import datetime as dt
+import hashlib
+import os
+import random
+from collections import defaultdict
+from decimal import Decimal
+
+import icalendar
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from guardian.models import UserObjectPermission
+from guardian.shortcuts import assign_perm
+from psycopg2.extras import DateRange
+
+from accounts.choices import ApplicationTypes, RoleTypes
+from accounts.models import Membership, Organization, Token
+from accounts.permissions import MANAGE_ORGANIZATION_PERMISSION
+from crm.models import Contact
+from cozmo_common.functions import end_date_plus
+from listings.calendars.models import CozmoCalendar, ExternalCalendar, ExternalCalendarEvent
+from listings.choices import PropertyTypes, ReservationStatuses
+from listings.models import (
+    Blocking,
+    Location,
+    PriceSummary,
+    PricingSettings,
+    Property,
+    Rate,
+    Reservation,
+    SchedulingAssistant,
+)
+from send_mail.choices import DeliveryStatus, MessageType
+from send_mail.models import Conversation, Message
+from vendors.models import Assignment, Job, Vendor
+from vendors.reminders import schedule_job_reminders
+from vendors.tasks import _clean_time_frame
+
+User = get_user_model()
+
+DEFAULT_SCALE = {
+    # properties of every organization
+    "properties": 100,
+    # days of reservations before and after the anchor date
+    "history_days": 365,
+    "future_days": 180,
+    # contacts of every organization, guests are picked among them
+    "contacts": 500,
+    # share of reservations with a conversation and messages in each conversation
+    "conversation_ratio": 0.3,
+    "messages": 6,
+    # blockings of every property, some of them overlap each other and reservations
+    "blockings": 4,
+    # external calendars of every property, served from local iCal files
+    "external_calendars": 1,
+    # vendors of every organization and maintenance jobs of every property besides cleanings
+    "vendors": 10,
+    "maintenance_jobs": 2,
+}
+
+# (label, first day, last day, nightly price factor) of yearly seasons
+SEASONS = (
+    ("Winter holidays", (1, 1), (1, 6), Decimal("1.6")),
+    ("Low season", (1, 7), (3, 31), Decimal("0.8")),
+    ("Spring", (4, 1), (6, 14), Decimal("1.0")),
+    ("Summer", (6, 15), (9, 14), Decimal("1.4")),
+    ("Fall", (9, 15), (12, 19), Decimal("0.9")),
+    ("Winter holidays", (12, 20), (12, 31), Decimal("1.6")),
+)
+CHANNELS = ("Airbnb", "VRBO", "Booking.com", "TripAdvisor")
+
+CITIES = ("San Francisco", "Los Angeles", "San Diego", "Lake Tahoe", "Palm Springs", "Napa")
+STREETS = ("Market St", "Mission St", "Ocean Ave", "Sunset Blvd", "Main St", "Lake Dr")
+FIRST_NAMES = ("John", "Mary", "James", "Linda", "Robert", "Anna", "David", "Laura", "Paul")
+LAST_NAMES = ("Smith", "Johnson", "Brown", "Garcia", "Miller", "Davis", "Lopez", "Wilson")
+MAINTENANCE_JOBS = (Job.Jobs.Checkup, Job.Jobs.Repair, Job.Jobs.Delivery)
+PROPERTY_TYPES = (PropertyTypes.Apartment, PropertyTypes.Condo, PropertyTypes.Cabin)
+MESSAGES = (
+    "Hi, is early check-in possible?",
+    "What is the wifi password?",
+    "Thank you, we had a great stay!",
+    "Where can we park the car?",
+)
+
+
+def email(seed, index):
+    return f"benchmark-{seed}-{index}@example.com"
+
+
+class SyntheticOrganization:
+    """Generate an organization with a manager, an API token and related data."""
+
+    def __init__(self, seed, index, scale=None, today=None, ical_dir="benchmark_calendars"):
+        self.seed = seed
+        self.index = index
+        self.scale = dict(DEFAULT_SCALE, **(scale or {}))
+        self.today = today or dt.date.today()
+        self.first_day = self.today - dt.timedelta(days=self.scale["history_days"])
+        self.last_day = self.today + dt.timedelta(days=self.scale["future_days"])
+        self.ical_dir = ical_dir
+        self.random = random.Random(f"{seed}:{index}")
+
+    def _name(self):
+        return self.random.choice(FIRST_NAMES), self.random.choice(LAST_NAMES)
+
+    def _code(self):
+        return f"{self.random.getrandbits(48):012X}"
+
+    def create_organization(self, password):
+        user_email = email(self.seed, self.index)
+        organization = Organization.objects.create(
+            name=f"Benchmark {self.seed}-{self.index}",
+            email=user_email,
+            applications=[application.value for application in ApplicationTypes],
+        )
+        first_name, last_name = self._name()
+        user = User.objects.create_user(
+            username=user_email,
+            email=user_email,
+            password=password,
+            first_name=first_name,
+            last_name=last_name,
+            account_type=User.AllowedTypes.House_Broker.value,
+            role=RoleTypes.owner.value,
+        )
+        Membership.objects.create(user=user, organization=organization, is_default=True)
+        assign_perm(MANAGE_ORGANIZATION_PERMISSION, user, organization)
+        token = Token.objects.create(name="Benchmark", organization=organization, created_by=user)
+        return organization, user, token
+
+    def create_properties(self, organization):
+        count = self.scale["properties"]
+        locations = Location.objects.bulk_create(
+            Location(
+                city=self.random.choice(CITIES),
+                address=f"{self.random.randint(1, 9999)} {self.random.choice(STREETS)}",
+                country="United States",
+                country_code="US",
+                state="CA",
+            )
+            for _ in range(count)
+        )
+        properties = []
+        for i, location in enumerate(locations):
+            property_type = self.random.choice(PROPERTY_TYPES)
+            properties.append(
+                Property(
+                    name=f"{location.city} {property_type.pretty_name} {i}",
+                    property_type=property_type.value,
+                    rental_type=Property.Rentals.Entire_Home.value,
+                    bedrooms=self.random.randint(1, 5),
+                    bathrooms=self.random.randint(1, 3),
+                    max_guests=self.random.randint(2, 10),
+                    location=location,
+                    organization=organization,
+                )
+            )
+        Property.objects.bulk_create(properties)
+        PricingSettings.objects.bulk_create(
+            PricingSettings(
+                prop=prop,
+                nightly=Decimal(self.random.randrange(80, 600, 5)),
+                cleaning_fee=Decimal(self.random.randrange(50, 200, 10)),
+            )
+            for prop in properties
+        )
+        CozmoCalendar.objects.bulk_create(CozmoCalendar(prop=prop) for prop in properties)
+        return properties
+
+    def grant_api_access(self, token, properties):
+        content_type = ContentType.objects.get_for_model(Property)
+        permission = Permission.objects.get(
+            content_type=content_type, codename="public_api_access"
+        )
+        UserObjectPermission.objects.bulk_create(
+            UserObjectPermission(
+                user=token.user,
+                permission=permission,
+                content_type=content_type,
+                object_pk=str(prop.pk),
+            )
+            for prop in properties
+        )
+
+    def create_contacts(self, organization):
+        contacts = []
+        for i in range(self.scale["contacts"]):
+            first_name, last_name = self._name()
+            contacts.append(
+                Contact(
+                    first_name=first_name,
+                    last_name=last_name,
+                    email=f"{first_name}.{last_name}.{i}@example.com".lower(),
+                    phone=f"+1415555{i % 10000:04d}",
+                    organization=organization,
+                )
+            )
+        return Contact.objects.bulk_create(contacts)
+
+    def _time_frame(self, max_days):
+        start = self.first_day + dt.timedelta(
+            days=self.random.randint(0, (self.last_day - self.first_day).days)
+        )
+        return start, start + dt.timedelta(days=self.random.randint(1, max_days))
+
+    def create_rates(self, properties):
+        """Create seasonal rates of every year of the reservation window."""
+        rates = []
+        for prop in properties:
+            nightly = prop.pricing_settings.nightly
+            for year in range(self.first_day.year, self.last_day.year + 1):
+                for label, first, last, factor in SEASONS:
+                    rates.append(
+                        Rate(
+                            prop=prop,
+                            label=label,
+                            seasonal=True,
+                            time_frame=DateRange(
+                                dt.date(year, *first), dt.date(year, *last), "[]"
+                            ),
+                            nightly=(nightly * factor).quantize(Decimal("1")),
+                            weekend=(nightly * factor * Decimal("1.2")).quantize(Decimal("1")),
+                        )
+                    )
+        return Rate.objects.bulk_create(rates, batch_size=5000)
+
+    def create_blockings(self, properties):
+        """Create blockings, every other one overlapping the previous one."""
+        blockings = []
+        for prop in properties:
+            for i in range(self.scale["blockings"]):
+                if i % 2:
+                    previous = blockings[-1].time_frame
+                    start = previous.lower + dt.timedelta(
+                        days=self.random.randint(0, (previous.upper - previous.lower).days - 1)
+                    )
+                    end = previous.upper + dt.timedelta(days=self.random.randint(1, 5))
+                else:
+                    start, end = self._time_frame(14)
+                blockings.append(
+                    Blocking(
+                        prop=prop,
+                        time_frame=DateRange(start, end),
+                        summary=self.random.choice(("Owner stay", "Maintenance", "Renovation")),
+                    )
+                )
+        return Blocking.objects.bulk_create(blockings, batch_size=5000)
+
+    def _ical(self, channel, time_frames):
+        """Return iCal data and `ExternalCalendarEvent` fields of busy days on a channel."""
+        calendar = icalendar.Calendar()
+        calendar.add("prodid", f"-//{channel}//Calendar//EN")
+        calendar.add("version", "2.0")
+        events = []
+        for start, end in time_frames:
+            event = icalendar.Event()
+            event.add("uid", f"{self._code()}@{channel.lower()}.example.com")
+            event.add("summary", "Not available")
+            event.add("dtstart", start)
+            event.add("dtend", end)
+            event.add("dtstamp", dt.datetime.combine(self.today, dt.time()))
+            calendar.add_component(event)
+            events.append(
+                {
+                    "uid": str(event["uid"]),
+                    "summary": "Not available",
+                    "start_date": start,
+                    "end_date": end_date_plus(start, end),
+                    "hash": hashlib.md5(event.to_ical()).hexdigest(),  # nosec
+                }
+            )
+        return calendar.to_ical(), events
+
+    def create_external_calendars(self, properties, reservations):
+        """
+        Create external calendars served from local iCal files, with their events synced.
+
+        Calendars list part of the reservations of their property, as channels do, and days
+        booked on the channel only.
+        """
+        os.makedirs(self.ical_dir, exist_ok=True)
+        stays = defaultdict(list)
+        for reservation in reservations:
+            stays[reservation.prop_id].append((reservation.start_date, reservation.end_date))
+
+        count = min(self.scale["external_calendars"], len(CHANNELS))
+        calendars, events = [], []
+        for i, prop in enumerate(properties):
+            channels = self.random.sample(CHANNELS, count)
+            for channel in channels:
+                time_frames = [stay for stay in stays[prop.pk] if self.random.random() < 0.5]
+                time_frames += [self._time_frame(7) for _ in range(self.random.randint(0, 3))]
+                data, calendar_events = self._ical(channel, time_frames)
+                path = os.path.join(
+                    self.ical_dir, f"{self.seed}-{self.index}-{i}-{channel.lower()}.ics"
+                )
+                with open(path, "wb") as f:
+                    f.write(data)
+                calendars.append(
+                    ExternalCalendar(
+                        cozmo_cal=prop.cozmo_calendar,
+                        name=channel,
+                        url=f"file://{os.path.abspath(path)}",
+                        data=data,
+                    )
+                )
+                events.append(calendar_events)
+
+        ExternalCalendar.objects.bulk_create(calendars)
+        ExternalCalendarEvent.objects.bulk_create(
+            (
+                ExternalCalendarEvent(external_cal=calendar, **event)
+                for calendar, calendar_events in zip(calendars, events)
+                for event in calendar_events
+            ),
+            batch_size=5000,
+        )
+        return calendars
+
+    def _stays(self):
+        """Yield `(start, end)` of consecutive stays in the reservation window."""
+        day = self.first_day
+        while True:
+            start = day + dt.timedelta(days=self.random.randint(0, 6))
+            end = start + dt.timedelta(days=self.random.randint(1, 10))
+            if end > self.last_day:
+                return
+            yield start, end
+            day = end
+
+    def create_reservations(self, properties, contacts):
+        reservations = []
+        for prop in properties:
+            nightly = prop.pricing_settings.nightly
+            for start, end in self._stays():
+                nights = (end - start).days
+                cancelled = self.random.random() < 0.05
+                price = nightly * nights
+                reservations.append(
+                    Reservation(
+                        prop=prop,
+                        guest=self.random.choice(contacts),
+                        start_date=start,
+                        end_date=end,
+                        status=(
+                            ReservationStatuses.Cancelled.value
+                            if cancelled
+                            else ReservationStatuses.Accepted.value
+                        ),
+                        guests_adults=self.random.randint(1, prop.max_guests),
+                        source=self.random.choice(Reservation.Sources.choices())[0],
+                        confirmation_code=self._code(),
+                        price=price,
+                        base_total=price,
+                        paid=price if start < self.today else Decimal(0),
+                    )
+                )
+        return Reservation.objects.bulk_create(reservations, batch_size=5000)
+
+    def create_conversations(self, organization, reservations):
+        ratio = self.scale["conversation_ratio"]
+        conversations = Conversation.objects.bulk_create(
+            (
+                Conversation(reservation=reservation, unread=self.random.random() < 0.2)
+                for reservation in reservations
+                if self.random.random() < ratio
+            ),
+            batch_size=5000,
+        )
+        reservations = {reservation.pk: reservation for reservation in reservations}
+        messages = []
+        for conversation in conversations:
+            guest = reservations[conversation.reservation_id].guest
+            for i in range(self.random.randint(1, self.scale["messages"])):
+                outgoing = bool(i % 2)
+                messages.append(
+                    Message(
+                        conversation=conversation,
+                        sender=organization.email if outgoing else guest.email,
+                        recipient=guest.email if outgoing else organization.email,
+                        text=self.random.choice(MESSAGES),
+                        outgoing=outgoing,
+                        type=MessageType.email.value,
+                        delivery_status=DeliveryStatus.delivered.value,
+                    )
+                )
+        Message.objects.bulk_create(messages, batch_size=5000)
+        return conversations
+
+    def create_vendors(self, user, properties):
+        """Create vendors and assign a cleaner and a backup to every property."""
+        users = User.objects.bulk_create(
+            User(
+                username=f"vendor-{self.seed}-{self.index}-{i}@example.com",
+                email=f"vendor-{self.seed}-{self.index}-{i}@example.com",
+                password=make_password(None),
+                first_name=self.random.choice(FIRST_NAMES),
+                last_name=self.random.choice(LAST_NAMES),
+                account_type=User.VendorTypes.Cleaner.value,
+                role=None,
+            )
+            for i in range(self.scale["vendors"])
+        )
+        vendors = Vendor.objects.bulk_create(
+            Vendor(user=vendor_user, invited_by=user) for vendor_user in users
+        )
+        Assignment.objects.bulk_create(
+            Assignment(
+                vendor=vendor,
+                prop=prop,
+                cleaning_fee=prop.pricing_settings.cleaning_fee,
+                order=order,
+            )
+            for prop in properties
+            for order, vendor in enumerate(self.random.sample(vendors, min(2, len(vendors))), 1)
+        )
+        SchedulingAssistant.objects.bulk_create(
+            SchedulingAssistant(prop=prop, automatically_assign=bool(vendors))
+            for prop in properties
+        )
+        return vendors
+
+    def _job_status(self, day):
+        if day < self.today:
+            return Job.Statuses.Completed.value
+        return self.random.choice((Job.Statuses.Not_Accepted.value, Job.Statuses.Accepted.value))
+
+    def create_jobs(self, properties, reservations, vendors):
+        """Create a cleaning after every accepted stay and a few maintenance jobs."""
+        if not vendors:
+            return []
+
+        properties = {prop.pk: prop for prop in properties}
+        jobs = [
+            Job(
+                prop_id=reservation.prop_id,
+                job_type=Job.Jobs.Clean.value,
+                time_frame=_clean_time_frame(reservation.end_date),
+                status=self._job_status(reservation.end_date),
+                assignee=self.random.choice(vendors),
+                base_cost=properties[reservation.prop_id].pricing_settings.cleaning_fee,
+            )
+            for reservation in reservations
+            if reservation.status == ReservationStatuses.Accepted.value
+        ]
+        for prop in properties.values():
+            for _ in range(self.scale["maintenance_jobs"]):
+                day, _ = self._time_frame(1)
+                jobs.append(
+                    Job(
+                        prop=prop,
+                        job_type=self.random.choice(MAINTENANCE_JOBS).value,
+                        time_frame=_clean_time_frame(day),
+                        status=self._job_status(day),
+                        assignee=self.random.choice(vendors),
+                        base_cost=Decimal(self.random.randrange(50, 500, 10)),
+                        time_estimate=dt.timedelta(hours=self.random.randint(1, 4)),
+                    )
+                )
+        jobs = Job.objects.bulk_create(jobs, batch_size=5000)
+        schedule_job_reminders([job for job in jobs if job.time_frame.lower.date() >= self.today])
+        return jobs
+
+    def create(self, password):
+        """Create the organization and return credentials and ids used by benchmarks."""
+        with transaction.atomic():
+            organization, user, token = self.create_organization(password)
+            properties = self.create_properties(organization)
+            self.grant_api_access(token, properties)
+            self.create_rates(properties)
+            # Bulk created rates and pricing settings skip signals updating price summaries
+            PriceSummary.refresh([prop.pk for prop in properties])
+            contacts = self.create_contacts(organization)
+            reservations = self.create_reservations(properties, contacts)
+            self.create_blockings(properties)
+            self.create_external_calendars(properties, reservations)
+            self.create_conversations(organization, reservations)
+            vendors = self.create_vendors(user, properties)
+            self.create_jobs(properties, reservations, vendors)
+
+        return {
+            "organization": organization.pk,
+            "username": user.username,
+            "password": password,
+            "token": token.key,
+            "properties": [prop.pk for prop in properties],
+            "calendars": [str(prop.cozmo_calendar.pk) for prop in properties],
+            "reservations": [
+                reservation.confirmation_code
+                for reservation in reservations
+                if reservation.start_date >= self.today
+            ][:100],
+            "search": sorted({contact.last_name for contact in contacts}),
+        }
@@ -0,0 +1,94 @@
+import datetime as dt
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db.models import Q
+from django.test import TestCase
+
+from accounts.models import Organization
+from listings.calendars.models import ExternalCalendarEvent
+from listings.models import Blocking, PriceSummary, Property, Rate, Reservation
+from send_mail.models import Message
+from vendors.models import Job
+
+SCALE = ["--properties", "3", "--contacts", "5", "--history-days", "30", "--future-days", "30"]
+
+
+class SeedBenchmarkTestCase(TestCase):
+    def _seed(self, seed):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "seed.json")
+            call_command(
+                "seed_benchmark",
+                "--seed",
+                str(seed),
+                "--today",
+                "2019-11-01",
+                "--output",
+                output,
+                "--ical-dir",
+                directory,
+                *SCALE,
+                verbosity=0,
+            )
+            with open(output) as f:
+                return json.load(f)["organizations"][0]
+
+    def _dataset(self, organization_id):
+        reservations = Reservation.objects.filter(prop__organization_id=organization_id)
+        return (
+            list(Property.objects.filter(organization_id=organization_id).values_list("name")),
+            list(reservations.order_by("pk").values_list("start_date", "end_date", "price")),
+            Message.objects.filter(
+                conversation__reservation__prop__organization_id=organization_id
+            ).count(),
+            list(
+                Blocking.objects.filter(prop__organization_id=organization_id)
+                .order_by("pk")
+                .values_list("time_frame")
+            ),
+            Rate.objects.filter(prop__organization_id=organization_id).count(),
+            ExternalCalendarEvent.objects.filter(
+                external_cal__cozmo_cal__prop__organization_id=organization_id
+            ).count(),
+            Job.objects.filter(prop__organization_id=organization_id).count(),
+        )
+
+    def _delete(self, organization):
+        Property.objects.filter(organization_id=organization["organization"]).delete()
+        Organization.objects.filter(pk=organization["organization"]).delete()
+        get_user_model().objects.filter(
+            Q(username=organization["username"]) | Q(username__startswith="vendor-1-0-")
+        ).delete()
+
+    def test_seed_benchmark(self):
+        organization = self._seed(1)
+        self.assertEqual(len(organization["properties"]), 3)
+        self.assertEqual(len(organization["calendars"]), 3)
+
+        dataset = self._dataset(organization["organization"])
+        properties, reservations, _, blockings, rates, events, jobs = dataset
+        self.assertTrue(reservations)
+        for start_date, end_date, _ in reservations:
+            self.assertGreaterEqual(start_date, dt.date(2019, 10, 2))
+            self.assertLessEqual(end_date, dt.date(2019, 12, 1))
+        self.assertEqual(len(blockings), 3 * 4)
+        self.assertEqual(rates, 3 * 6)
+        summaries = PriceSummary.objects.filter(prop__organization_id=organization["organization"])
+        self.assertEqual(summaries.count(), 3)
+        self.assertFalse(summaries.filter(Q(nightly=None) | Q(min_nightly=None)).exists())
+        self.assertTrue(events)
+        self.assertGreaterEqual(jobs, 3 * 2)
+
+        with self.subTest(msg="Existing seed"):
+            with self.assertRaises(CommandError):
+                self._seed(1)
+
+        with self.subTest(msg="Deterministic"):
+            self._delete(organization)
+            organization = self._seed(1)
+            self.assertEqual(self._dataset(organization["organization"]), dataset)
+            self.assertNotEqual(self._dataset(self._seed(2)["organization"])[1], reservations)
@@ -2,18 +2,18 @@ from contextlib import suppress
 from datetime import timedelta
 
 from django.core.exceptions import FieldError
-from django.db.models import DateField, Max, Min, Prefetch, Q, Value
+from django.db.models import DateField, Exists, OuterRef, Prefetch, Q, Value
 from django.db.models.functions import Coalesce
 from django.utils import timezone
-from guardian.shortcuts import get_objects_for_user
 from psycopg2.extras import DateRange
 from rest_framework.compat import coreapi, coreschema
 from rest_framework.exceptions import NotFound, ParseError
 from rest_framework.filters import BaseFilterBackend
 
+from accounts import permission_cache
 from cozmo_common.filters import DateFilter
 from .choices import PropertyStatuses
-from .models import Blocking, Group, Rate, Reservation
+from .models import Blocking, Group, Property, Rate, Reservation
 
 
 class IdFilter(BaseFilterBackend):
@@ -150,6 +150,12 @@ class ReservationDateFilter(DateFilter):
         """Return queryset with Properties which have at least 1 reservation in a given period."""
         start, end = self.get_query_params(request)
 
+        return self.prefetch_calendar(queryset, start, end).annotate(
+            start_date=Value(start, output_field=DateField()),
+            end_date=Value(end, output_field=DateField()),
+        )
+
+    def prefetch_calendar(self, queryset, start, end):
         return queryset.prefetch_related(
             Prefetch(
                 "reservation_set",
@@ -169,9 +175,6 @@ class ReservationDateFilter(DateFilter):
                 queryset=Rate.objects.filter(time_frame__overlap=DateRange(start, end, "[]")),
                 to_attr="rate_included",
             ),
-        ).annotate(
-            start_date=Value(start, output_field=DateField()),
-            end_date=Value(end, output_field=DateField()),
         )
 
 
@@ -330,11 +333,18 @@ class MultiCalendarFilter(ReservationDateFilter):
                     raise ParseError(f'Invalid value for param "{f_name}"')
                 query[f"{f_value}__gte"] = int(param)
             elif f_type is list:
-                query[f_value] = param.split(",")
+                # Subquery keeps a single row per property, so no `distinct()` is needed
+                query["pk__in"] = Property._base_manager.filter(
+                    **{f_value: param.split(",")}
+                ).values("pk")
             else:
                 query[f_value] = param
         return query
 
+    def prefetch_calendar(self, queryset, start, end):
+        # Calendar data is attached by `CalendarLoader` to the visible page only
+        return queryset
+
     def filter_queryset(self, request, queryset, view):
         queryset = super().filter_queryset(request, queryset, view)
         query = self._get_query(request.query_params)
@@ -342,14 +352,26 @@ class MultiCalendarFilter(ReservationDateFilter):
         min_price = request.query_params.get("price_min", None)
         max_price = request.query_params.get("price_max", None)
         if start and end and (min_price or max_price):
-            rate_kwargs = {"rate__nightly__lte": max_price, "rate__nightly__gte": min_price}
-
-            query.update(
-                {
-                    "rate__time_frame__overlap": (start, end),
-                    **{k: v for k, v in rate_kwargs.items() if isinstance(v, str) and v.isdigit()},
-                }
+            rate_kwargs = {
+                k: v
+                for k, v in (("nightly__lte", max_price), ("nightly__gte", min_price))
+                if isinstance(v, str) and v.isdigit()
+            }
+            queryset = queryset.annotate(
+                has_rate=Exists(
+                    Rate.default_manager.filter(
+                        prop=OuterRef("pk"),
+                        time_frame__overlap=DateRange(start, end),
+                        **rate_kwargs,
+                    )
+                )
             )
+            query["has_rate"] = True
+            # Cheap pre-check on indexed bounds before probing rates of the period
+            if "nightly__gte" in rate_kwargs:
+                query["price_summary__max_nightly__gte"] = rate_kwargs["nightly__gte"]
+            if "nightly__lte" in rate_kwargs:
+                query["price_summary__min_nightly__lte"] = rate_kwargs["nightly__lte"]
 
         order = []
         ordering = request.query_params.get("ordering", "")
@@ -363,14 +385,16 @@ class MultiCalendarFilter(ReservationDateFilter):
                 order.append(max_guests)
             if p.find("price") != -1:
                 if p.startswith("-"):
-                    queryset = queryset.annotate(nightly=Coalesce(Max("rate__nightly"), Value(0)))
+                    queryset = queryset.annotate(
+                        nightly=Coalesce("price_summary__max_nightly", Value(0))
+                    )
                     order.append("-nightly")
                 else:
                     queryset = queryset.annotate(
-                        nightly=Coalesce(Min("rate__nightly"), Value(100_000_000))
+                        nightly=Coalesce("price_summary__min_nightly", Value(100_000_000))
                     )
                     order.append("nightly")
-        return queryset.filter(**query).distinct().order_by(*order)
+        return queryset.filter(**query).order_by(*order)
 
     def get_schema_fields(self, view):
         fields = [
@@ -436,11 +460,8 @@ class GroupAccessFilter(BaseFilterBackend):
         if not is_group_contributor:
             return queryset
 
-        perms = {"group_access"}
         group_field = getattr(view, "group_lookup_field", self.default_group_lookup_field)
-        permitted = get_objects_for_user(
-            request.user, perms, Group, with_superuser=False
-        ).values_list("id", flat=True)
+        permitted = permission_cache.get_permitted_ids(request.user, "group_access", Group)
         query = {f"{group_field}__in": permitted}
 
         imported_qs = queryset
@@ -0,0 +1,59 @@
+# Generated by Django 2.0.9 on 2019-10-28 00:00
+
+import django.db.models.deletion
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+from django.db.models import Max, Min
+
+
+def populate_price_summaries(apps, schema_editor):
+    Property = apps.get_model("listings", "Property")
+    PricingSettings = apps.get_model("listings", "PricingSettings")
+    PriceSummary = apps.get_model("listings", "PriceSummary")
+    Rate = apps.get_model("listings", "Rate")
+
+    bounds = {
+        row.pop("prop_id"): row
+        for row in Rate.objects.values("prop_id")
+        .annotate(min_nightly=Min("nightly"), max_nightly=Max("nightly"))
+        .order_by()
+    }
+    nightly = dict(
+        PricingSettings.objects.exclude(prop=None).values_list("prop_id", "nightly")
+    )
+    PriceSummary.objects.bulk_create(
+        (
+            PriceSummary(prop_id=prop_id, nightly=nightly.get(prop_id), **bounds[prop_id])
+            if prop_id in bounds
+            else PriceSummary(prop_id=prop_id, nightly=nightly.get(prop_id))
+            for prop_id in Property.objects.values_list("id", flat=True).iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0027_schedulingassistant_enabled'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceSummary',
+            fields=[
+                ('prop', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='price_summary', serialize=False, to='listings.Property')),
+                ('nightly', models.DecimalField(blank=True, decimal_places=2, max_digits=9, null=True)),
+                ('min_nightly', models.DecimalField(blank=True, db_index=True, decimal_places=2, max_digits=9, null=True)),
+                ('max_nightly', models.DecimalField(blank=True, db_index=True, decimal_places=2, max_digits=9, null=True)),
+                ('date_updated', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(populate_price_summaries, migrations.RunPython.noop),
+        TrigramExtension(),
+        migrations.RunSQL(
+            'CREATE INDEX "listings_location_city_upper_trgm" ON "listings_location" '
+            'USING gin (UPPER("city"::text) gin_trgm_ops);',
+            'DROP INDEX "listings_location_city_upper_trgm";',
+        ),
+    ]
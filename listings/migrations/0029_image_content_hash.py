@@ -0,0 +1,16 @@
+# Generated by Django 2.0.9 on 2019-10-30 00:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("listings", "0028_pricesummary")]
+
+    operations = [
+        migrations.AddField(
+            model_name="image",
+            name="content_hash",
+            field=models.CharField(blank=True, db_index=True, default="", max_length=32),
+        )
+    ]
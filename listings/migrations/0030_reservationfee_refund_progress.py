@@ -0,0 +1,21 @@
+# Generated by Django 2.0.9 on 2019-11-04 00:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("listings", "0029_image_content_hash")]
+
+    operations = [
+        migrations.AddField(
+            model_name="reservationfee",
+            name="refunded_amount",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AddField(
+            model_name="reservationfee",
+            name="refund_attempts",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
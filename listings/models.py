@@ -20,7 +20,7 @@ from django.core.exceptions import ValidationError
 from django.core.files.storage import get_storage_class
 from django.core.validators import FileExtensionValidator, MaxValueValidator
 from django.db import models, transaction
-from django.db.models.aggregates import Sum
+from django.db.models.aggregates import Max, Min, Sum
 from django.db.models.expressions import F, Value
 from django.utils import timezone
 
@@ -134,6 +134,31 @@ class Property(ChangedFieldMixin, TimestampModel, PaymentSetting):
     Rentals = choices.Rentals
     Types = choices.PropertyTypes
 
+    tracked_fields = (
+        "status",
+        "floor",
+        "name",
+        "location",
+        "size",
+        "locale",
+        "time_zone",
+        "property_type",
+        "rental_type",
+        "max_guests",
+        "external_id",
+        "license_number",
+        "bedrooms",
+        "bathrooms",
+        "inventory_count",
+        "building",
+        "owner",
+        "organization",
+        "group",
+        "arrival_instruction",
+        "rental_connection",
+        "channel_network_enabled",
+    )
+
     status = models.PositiveSmallIntegerField(
         choices=Statuses.choices(), default=Statuses.Active.value
     )
@@ -213,25 +238,24 @@ class Property(ChangedFieldMixin, TimestampModel, PaymentSetting):
         ]
         return ", ".join([field for field in address_fields if field]).strip()
 
-    @property
-    def cover_image(self):
+    def _first_image_url(self, field):
+        if hasattr(self, "cover_images"):
+            name = getattr(self.cover_images[0], field).name if self.cover_images else None
+        else:
+            name = self.image_set.all().values_list(field, flat=True).first()
         try:
-            image_url = StorageBackend().url(
-                self.image_set.all().values_list("url", flat=True).first()
-            )
+            image_url = StorageBackend().url(name)
         except TypeError:
             image_url = None
         return image_url
 
+    @property
+    def cover_image(self):
+        return self._first_image_url("url")
+
     @property
     def thumbnail(self):
-        try:
-            image_url = StorageBackend().url(
-                self.image_set.all().values_list("thumbnail", flat=True).first()
-            )
-        except TypeError:
-            image_url = None
-        return image_url
+        return self._first_image_url("thumbnail")
 
     @property
     def is_trip_advisor_sync_enabled(self):
@@ -440,6 +464,54 @@ class Rate(BasePricingSettings):
         return Counter(rates.values())
 
 
+class PriceSummary(models.Model):
+    """
+    Nightly price bounds of a property.
+
+    Maintained by `listings.signals` so multi-calendar can filter and order by price
+    without joining all rates of every property.
+    """
+
+    prop = models.OneToOneField(
+        "Property", on_delete=models.CASCADE, primary_key=True, related_name="price_summary"
+    )
+    nightly = models.DecimalField(max_digits=9, decimal_places=2, null=True, blank=True)
+    min_nightly = models.DecimalField(
+        max_digits=9, decimal_places=2, null=True, blank=True, db_index=True
+    )
+    max_nightly = models.DecimalField(
+        max_digits=9, decimal_places=2, null=True, blank=True, db_index=True
+    )
+    date_updated = models.DateTimeField(auto_now=True)
+
+    @classmethod
+    def refresh(cls, prop_ids, create=True):
+        """
+        Recalculate summaries of the given properties.
+
+        With `create=False` only existing summaries are updated, which is required
+        while a property is being deleted.
+        """
+        bounds = {
+            row.pop("prop_id"): row
+            for row in Rate.default_manager.filter(prop_id__in=prop_ids)
+            .values("prop_id")
+            .annotate(min_nightly=Min("nightly"), max_nightly=Max("nightly"))
+            .order_by()
+        }
+        nightly = dict(
+            PricingSettings.objects.filter(prop_id__in=prop_ids).values_list("prop_id", "nightly")
+        )
+        for prop_id in prop_ids:
+            values = bounds.get(prop_id, {"min_nightly": None, "max_nightly": None})
+            values["nightly"] = nightly.get(prop_id)
+            updated = cls.objects.filter(prop_id=prop_id).update(
+                date_updated=timezone.now(), **values
+            )
+            if not updated and create:
+                cls.objects.create(prop_id=prop_id, **values)
+
+
 def generate_code():
     return uuid.uuid4().hex[:12].upper()
 
@@ -449,6 +521,29 @@ class Reservation(ChangedFieldMixin, TimestampModel, PaymentSetting):
 
     Statuses = choices.ReservationStatuses
 
+    tracked_fields = (
+        "start_date",
+        "end_date",
+        "status",
+        "guests_adults",
+        "guests_children",
+        "guests_infants",
+        "pets",
+        "guest",
+        "prop",
+        "rebook_allowed_if_cancelled",
+        "expiration",
+        "refund_deposit_after",
+        "cancellation_policy",
+        "source",
+        "date_booked",
+        "price",
+        "paid",
+        "cancellation_reason",
+        "cancellation_notes",
+        "base_total",
+    )
+
     class DynamicStatuses(choices.IntChoicesEnum):
         Inquiry = auto()
         Pending = auto()
@@ -1029,6 +1124,9 @@ class ReservationFee(BaseFee):
     )
     custom = models.BooleanField(default=False)
     reservation = models.ForeignKey(Reservation, on_delete=models.CASCADE)
+    # Refund progress of security deposits, see `listings.tasks.reservation_deposit_refund`
+    refunded_amount = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    refund_attempts = models.PositiveSmallIntegerField(default=0)
 
 
 class ReservationRate(models.Model):
@@ -1121,6 +1219,7 @@ class Image(TimestampModel):
     prop = models.ForeignKey("Property", on_delete=models.CASCADE)
 
     external_id = models.CharField(max_length=100, blank=True, default="", null=True)
+    content_hash = models.CharField(max_length=32, blank=True, default="", db_index=True)
 
     objects = querysets.HostedQuerySet.as_manager()
 
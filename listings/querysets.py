@@ -18,7 +18,20 @@ class PropertyQuerySet(models.QuerySet):
         return self.exclude(status=choices.PropertyStatuses.Removed)
 
     def list(self):
-        return self.select_related("owner")
+        return self.select_related("owner__user").with_cover_image()
+
+    def with_cover_image(self):
+        """Prefetch the first image of each property as a single element `cover_images` list."""
+        image_model = self.model._meta.get_field("image").related_model
+        return self.prefetch_related(
+            models.Prefetch(
+                "image_set",
+                queryset=image_model.objects.order_by("prop_id", "order", "id").distinct(
+                    "prop_id"
+                ),
+                to_attr="cover_images",
+            )
+        )
 
 
 class FixedCaseQuerySet(models.QuerySet):
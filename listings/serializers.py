@@ -593,12 +593,11 @@ class PropertyListSerializer(PropertyMinimalSerializer):
 
     def get_channels(self, obj):
         channels = dict()
-        try:
-            channels["airbnb"] = ChannelSyncBasicSerializer(
-                instance=AirbnbSync.objects.get(Q(prop=obj))
-            ).data
-        except AirbnbSync.DoesNotExist:
-            pass
+        airbnb_syncs = getattr(obj, "airbnb_syncs", None)
+        if airbnb_syncs is None:
+            airbnb_syncs = AirbnbSync.objects.filter(prop=obj)[:1]
+        if airbnb_syncs:
+            channels["airbnb"] = ChannelSyncBasicSerializer(instance=airbnb_syncs[0]).data
         # try:
         #     channels.append(
         #         ChannelSyncBasicSerializer(instance=TripAdvisorSync.objects.get(Q(prop=obj))).data)
@@ -1596,6 +1595,8 @@ class PropertyCalMinSerializer(PropertyMinimalSerializer):
         )
 
     def get_ical_events(self, instance):
+        if hasattr(instance, "ical_events_included"):
+            return instance.ical_events_included
         fr = self.context["request"].query_params.get("from")
         to = self.context["request"].query_params.get("to")
         try:
@@ -1646,6 +1647,8 @@ class GroupSerializer(ModelSerializer):
         extra_kwargs = {"date_updated": {"read_only": True, "required": False}}
 
     def get_properties_count(self, obj):
+        if hasattr(obj, "properties_count"):
+            return obj.properties_count
         return obj.property_set.count()
 
 
@@ -1,21 +1,295 @@
 import datetime as dt
-
-from django.db.models import Q
+from collections import OrderedDict
+from operator import itemgetter
+
+from django.contrib.postgres.fields import ArrayField
+from django.db.models import (
+    BooleanField,
+    Case,
+    CharField,
+    DateField,
+    DateTimeField,
+    F,
+    PositiveSmallIntegerField,
+    Q,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Lower, Upper
+from django.utils import timezone
 from psycopg2.extras import DateRange
 
 from listings.calendars.models import ExternalCalendarEvent
-from .models import AvailabilitySettings, Reservation
+from .models import (
+    Availability,
+    AvailabilitySettings,
+    Blocking,
+    Rate,
+    Reservation,
+    TurnDay,
+)
+
+
+_NO_DATE = Cast(Value(None), output_field=DateField())
+_NO_DATETIME = Cast(Value(None), output_field=DateTimeField())
+_NO_NIGHTS = Cast(Value(None), output_field=PositiveSmallIntegerField())
+_NO_DAYS = Cast(Value(None), output_field=ArrayField(PositiveSmallIntegerField()))
+_NOT_EXPIRED = Value(False, output_field=BooleanField())
+
+
+def _overlaps(lower, upper, start_date, end_date):
+    """Check if `[lower, upper)` overlaps `[start_date, end_date)`, `None` being unbounded."""
+    return (
+        start_date < end_date
+        and (lower is None or lower < end_date)
+        and (upper is None or start_date < upper)
+    )
+
+
+def _range_key(row):
+    """Sort key matching Postgres ordering of date ranges."""
+    lower, upper = row["lower_date"], row["upper_date"]
+    return (lower is not None, lower or dt.date.min, upper is None, upper or dt.date.max)
+
+
+class PropertyConstraints:
+    """
+    Intervals constraining bookings of a property in a given period.
 
+    Reservations, blockings, iCal events, turn days and availabilities are loaded with
+    a single `UNION ALL` query, so many windows inside the period can be checked in memory.
+    Use `load_many` to load constraints of many properties with one query.
+    """
 
-def _date_range(start, end):
-    for i in range((end - start).days + 1):
-        yield start + dt.timedelta(i)
+    RESERVATION = "reservation"
+    BLOCKING = "blocking"
+    ICAL_EVENT = "ical_event"
+    TURN_DAY = "turn_day"
+    AVAILABILITY = "availability"
+    AVAILABILITY_SETTINGS = "availability_settings"
+
+    columns = (
+        "kind",
+        "row_id",
+        "property_id",
+        "lower_date",
+        "upper_date",
+        "updated",
+        "expired",
+        "weekdays",
+        "min_nights",
+        "max_nights",
+    )
+
+    def __init__(self, prop, start_date, end_date, reservations_excluded=()):
+        self.prop = prop
+        self.start_date = start_date
+        self.end_date = end_date
+        self._reservations_excluded = [r.pk for r in reservations_excluded]
+        self._prop_ids = [prop.pk]
+
+    def _select(self, queryset, kind, **columns):
+        defaults = {
+            "lower_date": _NO_DATE,
+            "upper_date": _NO_DATE,
+            "updated": _NO_DATETIME,
+            "expired": _NOT_EXPIRED,
+            "weekdays": _NO_DAYS,
+            "min_nights": _NO_NIGHTS,
+            "max_nights": _NO_NIGHTS,
+        }
+        defaults.update(columns)
+        defaults.setdefault("property_id", F("prop_id"))
+        annotations = OrderedDict(
+            [("kind", Value(kind, output_field=CharField())), ("row_id", F("pk"))]
+        )
+        annotations.update((name, defaults[name]) for name in self.columns[2:])
+        return queryset.order_by().annotate(**annotations).values(*self.columns)
+
+    def get_reservations(self):
+        statuses = Reservation.Statuses
+        inquiries = (statuses.Inquiry_Blocked.value, statuses.Inquiry.value)
+        return self._select(
+            Reservation.default_manager.filter(prop_id__in=self._prop_ids)
+            .exclude(status__in=(statuses.Declined.value, statuses.Inquiry.value))
+            .exclude(pk__in=self._reservations_excluded)
+            .filter(
+                Q(status__in=(statuses.Accepted.value, statuses.Inquiry_Blocked.value))
+                | Q(status=statuses.Cancelled.value, rebook_allowed_if_cancelled=False),
+                start_date__contained_by=DateRange(upper=self.end_date),
+                end_date__contained_by=DateRange(lower=self.start_date, bounds="()"),
+            ),
+            self.RESERVATION,
+            lower_date=F("start_date"),
+            upper_date=F("end_date"),
+            updated=F("date_updated"),
+            expired=Case(
+                When(status__in=inquiries, expiration__lt=timezone.now(), then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+        )
+
+    def get_blockings(self):
+        return self._select(
+            Blocking.default_manager.filter(
+                prop_id__in=self._prop_ids, time_frame__overlap=(self.start_date, self.end_date)
+            ),
+            self.BLOCKING,
+            lower_date=Cast(Lower("time_frame"), DateField()),
+            upper_date=Cast(Upper("time_frame"), DateField()),
+            updated=F("date_updated"),
+        )
+
+    def get_ical_events(self):
+        return self._select(
+            ExternalCalendarEvent.objects.filter(
+                external_cal__cozmo_cal__prop_id__in=self._prop_ids,
+                start_date__contained_by=DateRange(upper=self.end_date),
+                end_date__contained_by=DateRange(lower=self.start_date, bounds="()"),
+            ),
+            self.ICAL_EVENT,
+            property_id=F("external_cal__cozmo_cal__prop_id"),
+            lower_date=F("start_date"),
+            upper_date=F("end_date"),
+            updated=F("date_updated"),
+        )
+
+    def _seasonal(self, queryset):
+        return queryset.filter(
+            Q(time_frame__overlap=DateRange(self.start_date, self.end_date))
+            | Q(time_frame=(None, None))
+        )
+
+    def get_turn_days(self):
+        return self._select(
+            self._seasonal(TurnDay.objects.filter(prop_id__in=self._prop_ids)),
+            self.TURN_DAY,
+            lower_date=Cast(Lower("time_frame"), DateField()),
+            upper_date=Cast(Upper("time_frame"), DateField()),
+            weekdays=F("days"),
+        )
+
+    def get_availabilities(self):
+        return self._select(
+            self._seasonal(Availability.default_manager.filter(prop_id__in=self._prop_ids)),
+            self.AVAILABILITY,
+            lower_date=Cast(Lower("time_frame"), DateField()),
+            upper_date=Cast(Upper("time_frame"), DateField()),
+            min_nights=F("min_stay"),
+            max_nights=F("max_stay"),
+        )
+
+    def get_availability_settings(self):
+        return self._select(
+            AvailabilitySettings.objects.filter(prop_id__in=self._prop_ids),
+            self.AVAILABILITY_SETTINGS,
+            min_nights=F("min_stay"),
+            max_nights=F("max_stay"),
+        )
+
+    def _empty_rows(self):
+        return {
+            kind: []
+            for kind in (
+                self.RESERVATION,
+                self.BLOCKING,
+                self.ICAL_EVENT,
+                self.TURN_DAY,
+                self.AVAILABILITY,
+                self.AVAILABILITY_SETTINGS,
+            )
+        }
+
+    def _query(self):
+        return self.get_reservations().union(
+            self.get_blockings(),
+            self.get_ical_events(),
+            self.get_turn_days(),
+            self.get_availabilities(),
+            self.get_availability_settings(),
+            all=True,
+        )
+
+    def load(self):
+        self.rows = self._empty_rows()
+        for row in self._query():
+            self.rows[row["kind"]].append(row)
+        return self
+
+    @classmethod
+    def load_many(cls, properties, start_date, end_date):
+        """Return loaded constraints of given properties keyed by property id."""
+        loaded = OrderedDict((prop.pk, cls(prop, start_date, end_date)) for prop in properties)
+        if not loaded:
+            return loaded
+
+        for constraints in loaded.values():
+            constraints.rows = constraints._empty_rows()
+        query = cls(next(iter(loaded.values())).prop, start_date, end_date)
+        query._prop_ids = list(loaded)
+        for row in query._query():
+            loaded[row["property_id"]].rows[row["kind"]].append(row)
+        return loaded
+
+    def _seasonal_rule(self, kind, start_date, end_date):
+        """
+        Return the rule of a given kind which applies to a window.
+
+        Rules with the smallest bounded time frame overlapping the window have precedence over
+        the latest unbounded one.
+        """
+        rows = self.rows[kind]
+        bounded = [
+            row
+            for row in rows
+            if (row["lower_date"], row["upper_date"]) != (None, None)
+            and _overlaps(row["lower_date"], row["upper_date"], start_date, end_date)
+        ]
+        if bounded:
+            return min(bounded, key=_range_key)
+        unbounded = [row for row in rows if (row["lower_date"], row["upper_date"]) == (None, None)]
+        if unbounded:
+            return max(unbounded, key=itemgetter("row_id"))
+        return None
+
+    def turn_day(self, start_date, end_date):
+        return self._seasonal_rule(self.TURN_DAY, start_date, end_date)
+
+    def availability(self, start_date, end_date):
+        availability = self._seasonal_rule(self.AVAILABILITY, start_date, end_date)
+        if availability is None and self.rows[self.AVAILABILITY_SETTINGS]:
+            availability = max(self.rows[self.AVAILABILITY_SETTINGS], key=itemgetter("row_id"))
+        return availability
+
+    def reservations(self, start_date, end_date):
+        return [
+            row
+            for row in self.rows[self.RESERVATION]
+            if row["lower_date"] < end_date and row["upper_date"] > start_date
+        ]
+
+    def blockings(self, start_date, end_date):
+        return [
+            row
+            for row in self.rows[self.BLOCKING]
+            if _overlaps(row["lower_date"], row["upper_date"], start_date, end_date)
+        ]
+
+    def ical_events(self, start_date, end_date):
+        return [
+            row
+            for row in self.rows[self.ICAL_EVENT]
+            if row["lower_date"] < end_date and row["upper_date"] > start_date
+        ]
 
 
 class IsPropertyAvailable:
     """
     Class provide one public method `is_available` which returns
     message when the given period is blocked or empty string if not.
+
+    Use `check_windows` to verify many periods of the same property at once.
     """
 
     messages = {
@@ -35,12 +309,39 @@ class IsPropertyAvailable:
             prop.sync()
 
         self._reservations_excluded = kwargs.get("reservations_excluded", [])
+        self._constraints = kwargs.get("constraints", None)
 
         self.prop = prop
         self.start_date = start_date
         self.end_date = end_date
         self._latest = []
 
+    @classmethod
+    def check_windows(cls, prop, windows, **kwargs):
+        """
+        Run checks for many `(start_date, end_date)` windows of a property.
+
+        Constraints are loaded once for a period covering all windows.
+        """
+        windows = list(windows)
+        if not windows:
+            return []
+        if kwargs.pop("should_sync", False):
+            prop.sync()
+        constraints = PropertyConstraints(
+            prop,
+            min(start for start, _ in windows),
+            max(end for _, end in windows),
+            kwargs.get("reservations_excluded", []),
+        ).load()
+
+        checks = []
+        for start_date, end_date in windows:
+            ipa = cls(prop, start_date, end_date, constraints=constraints, **kwargs)
+            ipa.run_check()
+            checks.append(ipa)
+        return checks
+
     def _check_prop_state(self):
         return self.prop.status == self.prop.Statuses.Active
 
@@ -54,112 +355,61 @@ class IsPropertyAvailable:
         return not bool(advance_bookable and self.end_date > bookable_to)
 
     def _check_turn_days(self):
-        turn_days_queryset = self.prop.turnday_set
-        turn_days = (
-            turn_days_queryset.filter(
-                time_frame__overlap=DateRange(self.start_date, self.end_date)
-            )
-            .exclude(time_frame=(None, None))
-            .order_by("-time_frame")
-        )
-
-        if not turn_days:
-            turn_days = turn_days_queryset.filter(time_frame=(None, None))
-
-        if turn_days:
-            return self.start_date.weekday() in turn_days.last().days
+        turn_day = self._constraints.turn_day(self.start_date, self.end_date)
+        if turn_day:
+            return self.start_date.weekday() in turn_day["weekdays"]
         return True
 
     def _check_stay_requirements(self):
-        availability_queryset = self.prop.availability_set
-        availabilities = (
-            availability_queryset.filter(
-                time_frame__overlap=DateRange(self.start_date, self.end_date)
-            )
-            .exclude(time_frame=(None, None))
-            .order_by("-time_frame")
-        )
-
-        if not availabilities:
-            availabilities = availability_queryset.filter(time_frame=(None, None))
-        if not availabilities:
-            availabilities = AvailabilitySettings.objects.filter(prop=self.prop)
-
-        if availabilities:
+        availability = self._constraints.availability(self.start_date, self.end_date)
+        if availability:
             stay_days = (self.end_date - self.start_date).days
-            availability = availabilities.last()
-            ok = availability.min_stay <= stay_days
-            if availability.max_stay:
-                ok = ok and stay_days <= availability.max_stay
+            ok = availability["min_nights"] <= stay_days
+            if availability["max_nights"]:
+                ok = ok and stay_days <= availability["max_nights"]
             return ok
         return True
 
     def _verify_blocked_days(self, start_date, end_date):
-        self._blocked_days.update(
-            {day: True for day in _date_range(start_date, end_date) if day in self._blocked_days}
-        )
+        """Mark days from `start_date` to `end_date` (inclusive) within the period as blocked."""
+        start_date = max(start_date, self.start_date)
+        end_date = min(end_date, self.end_date)
+        if start_date <= end_date:
+            self._blocked_days.append((start_date, end_date))
 
-    def _add_latest(self, queryset):
-        if queryset:
-            latest = queryset.values_list("date_updated", flat=True).latest("date_updated")
-            self._latest.append(latest)
+    def _add_latest(self, rows):
+        updated = [row["updated"] for row in rows if row["updated"] is not None]
+        if updated:
+            self._latest.append(max(updated))
 
     def _check_reservations(self):
-        reservations_q = (
-            self.prop.reservation_set.exclude(
-                status__in=(
-                    Reservation.Statuses.Declined.value,
-                    Reservation.Statuses.Inquiry.value,
-                )
-            )
-            .exclude(pk__in=[r.pk for r in self._reservations_excluded])
-            .filter(
-                Q(
-                    status__in=(
-                        Reservation.Statuses.Accepted.value,
-                        Reservation.Statuses.Inquiry_Blocked.value,
-                    )
-                )
-                | Q(
-                    status=Reservation.Statuses.Cancelled.value, rebook_allowed_if_cancelled=False
-                ),
-                start_date__contained_by=DateRange(upper=self.end_date),
-                end_date__contained_by=DateRange(lower=self.start_date, bounds="()"),
-            )
-        )
+        reservations = self._constraints.reservations(self.start_date, self.end_date)
 
-        self._add_latest(reservations_q)
+        self._add_latest(reservations)
         expired_inquiries = []
-        for reservation in reservations_q:
-            if reservation.is_inquiry_expired:
+        for reservation in reservations:
+            if reservation["expired"]:
                 expired_inquiries.append(reservation)
                 continue
-            self._verify_blocked_days(reservation.start_date, reservation.end_date)
+            self._verify_blocked_days(reservation["lower_date"], reservation["upper_date"])
 
-        has_blocking_reservations = len(reservations_q) == len(expired_inquiries)
+        has_blocking_reservations = len(reservations) == len(expired_inquiries)
         return has_blocking_reservations
 
     def _check_blockings(self):
-        blockings = self.prop.blocking_set.filter(
-            time_frame__overlap=(self.start_date, self.end_date)
-        )
+        blockings = self._constraints.blockings(self.start_date, self.end_date)
 
         self._add_latest(blockings)
 
         for blocking in blockings:
-            start = blocking.time_frame.lower or self.start_date
-            end = blocking.time_frame.upper or self.end_date
+            start = blocking["lower_date"] or self.start_date
+            end = blocking["upper_date"] or self.end_date
             self._verify_blocked_days(start, end)
 
         return not blockings
 
     def _check_ical_blockings(self):
-        external_calendar_set = self.prop.cozmo_calendar.externalcalendar_set.values_list("pk")
-        external_blocking_dates = ExternalCalendarEvent.objects.filter(
-            external_cal__in=external_calendar_set,
-            start_date__contained_by=DateRange(upper=self.end_date),
-            end_date__contained_by=DateRange(lower=self.start_date, bounds="()"),
-        )
+        external_blocking_dates = self._constraints.ical_events(self.start_date, self.end_date)
 
         self._add_latest(external_blocking_dates)
         return not external_blocking_dates
@@ -184,21 +434,22 @@ class IsPropertyAvailable:
             msg = "You must call `.run_check()` before accessing `.blocked_days`."
             raise AssertionError(msg)
 
-        start_date = None
-        blockings = {}
-        for date, val in self._blocked_days.items():
-            if val:
-                if not start_date:
-                    start_date = date
-                blockings[start_date] = date
+        merged = []
+        for start, end in sorted(self._blocked_days):
+            if merged and start <= merged[-1][1] + dt.timedelta(days=1):
+                merged[-1][1] = max(merged[-1][1], end)
             else:
-                start_date = None
+                merged.append([start, end])
 
-        return [{"start_date": start, "end_date": end} for start, end in blockings.items()]
+        return [{"start_date": start, "end_date": end} for start, end in merged]
 
     def run_check(self):
         self._conflicts = []
-        self._blocked_days = {day: False for day in _date_range(self.start_date, self.end_date)}
+        self._blocked_days = []
+        if self._constraints is None:
+            self._constraints = PropertyConstraints(
+                self.prop, self.start_date, self.end_date, self._reservations_excluded
+            ).load()
 
         if not self._check_prop_state():
             self._conflicts.append(self.messages["not_active"])
@@ -217,3 +468,71 @@ class IsPropertyAvailable:
 
     def is_available(self):
         return not bool(self._conflicts)
+
+
+class CalendarLoader:
+    """
+    Load multi-calendar data for many properties at once.
+
+    Every model is fetched with a single query for all given properties and then distributed
+    in memory to `reservation_included`, `blocking_included`, `rate_included` and
+    `ical_events_included` attributes, as expected by `PropertyCalSerializer`.
+    """
+
+    def __init__(self, start_date, end_date):
+        self.start_date = start_date
+        self.end_date = end_date
+
+    def get_reservations(self, prop_ids):
+        return Reservation.objects.filter(
+            prop_id__in=prop_ids,
+            start_date__contained_by=DateRange(None, self.end_date, "[]"),
+            end_date__contained_by=DateRange(self.start_date, None, "[]"),
+        ).select_related("guest")
+
+    def get_blockings(self, prop_ids):
+        return Blocking.objects.filter(
+            prop_id__in=prop_ids,
+            time_frame__overlap=DateRange(self.start_date, self.end_date, "[]"),
+        )
+
+    def get_rates(self, prop_ids):
+        return Rate.objects.filter(
+            prop_id__in=prop_ids,
+            time_frame__overlap=DateRange(self.start_date, self.end_date, "[]"),
+        )
+
+    def get_ical_events(self, prop_ids):
+        return (
+            ExternalCalendarEvent.objects.filter(
+                external_cal__cozmo_cal__prop_id__in=prop_ids,
+                start_date__contained_by=DateRange(None, self.end_date),
+                end_date__contained_by=DateRange(self.start_date, None, "[]"),
+            )
+            .select_related("external_cal__color")
+            .annotate(prop_id=F("external_cal__cozmo_cal__prop_id"))
+        )
+
+    def load(self, properties):
+        properties = {prop.pk: prop for prop in properties}
+        for prop in properties.values():
+            prop.reservation_included = []
+            prop.blocking_included = []
+            prop.rate_included = []
+            prop.ical_events_included = []
+
+        if not properties:
+            return
+
+        for reservation in self.get_reservations(properties):
+            reservation.prop = properties[reservation.prop_id]
+            reservation.prop.reservation_included.append(reservation)
+
+        for blocking in self.get_blockings(properties):
+            properties[blocking.prop_id].blocking_included.append(blocking)
+
+        for rate in self.get_rates(properties):
+            properties[rate.prop_id].rate_included.append(rate)
+
+        for event in self.get_ical_events(properties):
+            properties[event.prop_id].ical_events_included.append(event.to_event())
@@ -1,15 +1,20 @@
+import threading
+from contextlib import contextmanager
+
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import Signal, receiver
 from guardian.shortcuts import assign_perm, remove_perm
 
 from .models import AdditionalFee, Image, Property, Rate, Reservation, SchedulingAssistant, \
-    GroupUserAssignment
+    GroupUserAssignment, PriceSummary, PricingSettings
 
 
 @receiver(post_delete, sender=Image)
 def image_remove_from_storage(sender, **kwargs):
     instance = kwargs["instance"]
-    instance.url.storage.delete(instance.url.name)
+    # Images with the same content share the stored file
+    if instance.url.name and not Image.objects.filter(url=instance.url.name).exists():
+        instance.url.storage.delete(instance.url.name)
 
 
 def schedule_sync(instance):
@@ -31,6 +36,33 @@ def after_rate_save(sender, instance, **kwargs):
     schedule_sync(instance.prop)
 
 
+_price_summary = threading.local()
+
+
+@contextmanager
+def price_summary_refresh_suppressed():
+    """Skip refreshing price summaries for every saved or deleted row, callers refresh them."""
+    _price_summary.suppressed = True
+    try:
+        yield
+    finally:
+        _price_summary.suppressed = False
+
+
+@receiver(post_save, sender=Rate)
+@receiver(post_save, sender=PricingSettings)
+def update_price_summary(sender, instance, **kwargs):
+    if instance.prop_id and not getattr(_price_summary, "suppressed", False):
+        PriceSummary.refresh([instance.prop_id])
+
+
+@receiver(post_delete, sender=Rate)
+@receiver(post_delete, sender=PricingSettings)
+def update_price_summary_on_delete(sender, instance, **kwargs):
+    if instance.prop_id and not getattr(_price_summary, "suppressed", False):
+        PriceSummary.refresh([instance.prop_id], create=False)
+
+
 @receiver(post_save, sender=AdditionalFee)
 def after_fee_save(sender, instance, **kwargs):
     schedule_sync(instance.prop)
@@ -1,5 +1,10 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+from collections import defaultdict
 from datetime import timedelta
+from decimal import Decimal
+from functools import partial
 from hashlib import md5
 from io import BytesIO
 from itertools import chain
@@ -8,16 +13,36 @@ from os.path import splitext
 from urllib.parse import urlparse
 
 import requests
-from celery import group
 from celery.task import periodic_task, task
-from django.db.models import DateField
-from django.db.models.expressions import ExpressionWrapper, F
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (
+    BooleanField,
+    DateField,
+    DecimalField,
+    Max,
+    PositiveSmallIntegerField,
+    Prefetch,
+    Q,
+    Sum,
+)
+from django.db.models.expressions import (
+    Case,
+    ExpressionWrapper,
+    F,
+    OuterRef,
+    Subquery,
+    Value,
+    When,
+)
 from django.utils import timezone
 
 from listings.models import Property
+from listings.signals import reservation_changed
+from payments.models import Charge
 from payments.services import Stripe, StripeError
 from services.errors import ServiceError
-from services.google import GoogleService
+from services.time_zones import TimeZoneResolver
 from . import models
 from .choices import SecurityDepositTypes
 
@@ -32,94 +57,320 @@ def ignored(*exceptions, log_message="%s"):
         logger.info(log_message, e.__class__.__name__)
 
 
+@contextmanager
+def _media_sessions():
+    """Yield a callable returning a session of the calling thread, sessions aren't thread-safe."""
+    local, sessions = threading.local(), []
+
+    def get_session():
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+            sessions.append(local.session)
+        return local.session
+
+    try:
+        yield get_session
+    finally:
+        for session in sessions:
+            session.close()
+
+
+def _download_media(get_session, media):
+    """Return content of externally hosted media or `None` if it could not be fetched."""
+    message = f"Error fetching media: %s url={media.url}"
+    with ignored(
+        requests.ConnectionError,
+        requests.HTTPError,
+        requests.RequestException,
+        log_message=message,
+    ):
+        resp = get_session().get(str(media.url), timeout=5)
+        resp.raise_for_status()
+        return resp.content
+    return None
+
+
+def _store_media(media, content, images_scope):
+    """
+    Upload downloaded content and point media at the hosted copy.
+
+    Images whose content was already uploaded for one of the images matching `images_scope`
+    lookups reuse the stored file (and its thumbnail) instead of storing a duplicate.
+    """
+    update_fields = ["url", "date_updated"]
+    if isinstance(media, models.Image):
+        media.content_hash = md5(content).hexdigest()  # nosec
+        update_fields += ["content_hash", "thumbnail"]
+        duplicate = (
+            models.Image.objects.self_hosted()
+            .filter(content_hash=media.content_hash, **images_scope)
+            .values("url", "thumbnail")
+            .first()
+        )
+        if duplicate:
+            media.url.name = duplicate["url"]
+            media.thumbnail.name = duplicate["thumbnail"]
+            media.save(update_fields=update_fields)
+            return
+
+    url = urlparse(media.url.url)
+    name = "{name}.{ext}".format(
+        name=md5(url.path.encode()).hexdigest(), ext=splitext(url.path)[-1]  # nosec
+    )
+    media.url.save(name, BytesIO(content), save=False)
+    media.save(update_fields=update_fields)
+
+
+@task(bind=True, max_retries=3, default_retry_delay=60)
+def fetch_property_media(self, prop_id):
+    """
+    Upload externally hosted media of a property to the storage.
+
+    Downloads run concurrently in batches, each thread on its own session, while every stored
+    item is saved right away, so a retried (or re-run) import only fetches what is still
+    external. Thumbnails are generated by a separate task once the images are stored.
+    """
+    concurrency = settings.MEDIA_IMPORT_CONCURRENCY
+    batch_size = concurrency * 2
+    pending = list(
+        chain(
+            models.Image.objects.filter(prop_id=prop_id).externally_hosted().order_by("pk"),
+            models.Video.objects.filter(prop_id=prop_id).externally_hosted().order_by("pk"),
+        )
+    )
+    # Stored files are only shared within an organization
+    organization_id = (
+        Property._base_manager.filter(pk=prop_id).values_list("organization_id", flat=True).first()
+    )
+    images_scope = (
+        {"prop__organization_id": organization_id} if organization_id else {"prop_id": prop_id}
+    )
+    thumbnails = []
+    try:
+        with _media_sessions() as get_session, ThreadPoolExecutor(concurrency) as pool:
+            download = partial(_download_media, get_session)
+            for start in range(0, len(pending), batch_size):
+                batch = pending[start:start + batch_size]
+                for media, content in zip(batch, pool.map(download, batch)):
+                    if content is None:
+                        continue
+                    _store_media(media, content, images_scope)
+                    if isinstance(media, models.Image) and not media.thumbnail:
+                        thumbnails.append(media.pk)
+    except Exception as e:
+        raise self.retry(exc=e)
+    finally:
+        if thumbnails:
+            generate_image_thumbnails.delay(thumbnails)
+
+
 @task
-def fetch_property_media(prop_id):
-    images = models.Image.objects.filter(prop_id=prop_id).externally_hosted()
-    videos = models.Video.objects.filter(prop_id=prop_id).externally_hosted()
-
-    for media in chain(images, videos):
-        message = f"Error fetching media: %s url={media.url}"
-        with ignored(
-            requests.ConnectionError,
-            requests.HTTPError,
-            requests.RequestException,
-            log_message=message,
-        ):
-            resp = requests.get(media.url, stream=True, timeout=5)
-            resp.raise_for_status()
-            url = urlparse(media.url.url)
-            name = "{name}.{ext}".format(
-                name=md5(url.path.encode()).hexdigest(), ext=splitext(url.path)[-1]  # nosec
+def generate_image_thumbnails(image_ids):
+    for image in models.Image.objects.filter(pk__in=image_ids, thumbnail=None).self_hosted():
+        image.generate_thumbnail()
+
+
+DEPOSIT_REFUND_LOCK = "deposit-refund-lock"
+DEPOSIT_REFUND_LOCK_TIMEOUT = 6 * 60 * 60
+
+
+def _refund_reservation(payment_service, reservation):
+    """
+    Refund the remaining deposit of a reservation from its charges, one after another.
+
+    A charge that could not be refunded is skipped and the next one covers the rest. Returns
+    refunded `(charge, amount)` pairs and whether the deposit is settled, that is nothing failed
+    or the whole deposit was refunded anyway.
+
+    Idempotency keys contain the attempt and the amount, so a retry of a failed run is sent as
+    a new request while a repeated attempt can only replay the very same refund.
+    """
+    remaining, failed, refunded = reservation.deposit, False, []
+    for charge in reservation.refundable_charges:
+        if remaining == 0:
+            break
+        to_refund = min(remaining, charge.currently_paid)
+        amount = int(to_refund * 100)
+        try:
+            payment_service.refund(
+                charge.external_id,
+                amount,
+                idempotency_key=(
+                    f"deposit-refund-{reservation.pk}-{charge.pk}-"
+                    f"{reservation.refund_attempts}-{amount}"
+                ),
             )
-            media.url.save(name, BytesIO(resp.content))
+        except StripeError as e:
+            logger.warning("Could not refund charge id: %s, %s", charge.id, e)
+            failed = True
+            continue
+        refunded.append((charge, to_refund))
+        remaining -= to_refund
+    return refunded, remaining == 0 or not failed
 
 
-@periodic_task(run_every=timedelta(hours=6))
-def reservation_deposit_refund():
-    today = timezone.now().today()
-    payment_service = Stripe()
+def _record_deposit_refunds(reservations, results):
+    """Spread refunded amounts over deposit fees and close fees of settled deposits."""
+    fees = []
+    for reservation, (refunded, settled) in zip(reservations, results):
+        left = sum((amount for _, amount in refunded), Decimal(0))
+        for fee in reservation.deposit_fees:
+            part = min(left, fee.value - fee.refunded_amount)
+            fee.refunded_amount += part
+            left -= part
+            if settled:
+                fee.refundable = False
+            else:
+                fee.refund_attempts += 1
+            fees.append(fee)
 
-    release_date = ExpressionWrapper(F("end_date") + F("refund_deposit_after"), DateField())
-    refunded = []
+    models.ReservationFee.objects.filter(pk__in=[fee.pk for fee in fees]).update(
+        refunded_amount=Case(
+            *(When(pk=fee.pk, then=Value(fee.refunded_amount)) for fee in fees),
+            output_field=DecimalField(max_digits=8, decimal_places=2),
+        ),
+        refund_attempts=Case(
+            *(When(pk=fee.pk, then=Value(fee.refund_attempts)) for fee in fees),
+            output_field=PositiveSmallIntegerField(),
+        ),
+        refundable=Case(
+            *(When(pk=fee.pk, then=Value(fee.refundable)) for fee in fees),
+            output_field=BooleanField(),
+        ),
+    )
 
-    for reservation in (
+
+def _refund_deposits(today):
+    release_date = ExpressionWrapper(F("end_date") + F("refund_deposit_after"), DateField())
+    deposit_fees = models.ReservationFee.objects.filter(
+        refundable=True, fee_tax_type=SecurityDepositTypes.Security_Deposit.value
+    )
+    deposit = (
+        deposit_fees.filter(reservation=OuterRef("pk"))
+        .values("reservation")
+        .annotate(total=Sum(F("value") - F("refunded_amount")))
+        .values("total")
+    )
+    refund_attempts = (
+        deposit_fees.filter(reservation=OuterRef("pk"))
+        .values("reservation")
+        .annotate(attempts=Max("refund_attempts"))
+        .values("attempts")
+    )
+    refundable_charges = (
+        Charge.objects.annotate(currently_paid=F("amount") - F("refunded_amount"))
+        .filter(currently_paid__gt=0)
+        .order_by("pk")
+    )
+    reservations = list(
         models.Reservation.objects.exclude(refund_deposit_after=None)
-        .annotate(release_date=release_date)
-        .filter(release_date=today)
-        .only("id", "payments")
-    ):
-        security_deposits = reservation.reservationfee_set.filter(
-            refundable=True, fee_tax_type=SecurityDepositTypes.Security_Deposit.value
+        .annotate(
+            release_date=release_date,
+            deposit=Subquery(deposit, output_field=DecimalField(max_digits=9, decimal_places=2)),
+            refund_attempts=Subquery(refund_attempts, output_field=PositiveSmallIntegerField()),
+        )
+        # Deposits released earlier are picked up again only if their refund failed
+        .filter(
+            Q(release_date=today) | Q(release_date__lt=today, refund_attempts__gt=0),
+            deposit__gt=0,
         )
-        total_deposit = security_deposits.aggregate(total=models.Sum("amount"))["total"]
+        .only("id")
+        .prefetch_related(
+            Prefetch("payments", queryset=refundable_charges, to_attr="refundable_charges"),
+            Prefetch(
+                "reservationfee_set",
+                queryset=deposit_fees.order_by("pk"),
+                to_attr="deposit_fees",
+            ),
+        )
+    )
+    if not reservations:
+        return []
 
-        if not total_deposit:
-            continue
+    payment_service = Stripe()
+    with ThreadPoolExecutor(settings.DEPOSIT_REFUND_CONCURRENCY) as pool:
+        results = list(pool.map(partial(_refund_reservation, payment_service), reservations))
+    succeeded = [refund for refunded, _ in results for refund in refunded]
+
+    if succeeded:
+        Charge.objects.filter(pk__in=[charge.pk for charge, _ in succeeded]).update(
+            refunded_amount=F("refunded_amount")
+            + Case(
+                *(When(pk=charge.pk, then=Value(amount)) for charge, amount in succeeded),
+                output_field=DecimalField(max_digits=8, decimal_places=2),
+            )
+        )
+    # Deposits with failed refunds stay refundable to be retried by the next run
+    _record_deposit_refunds(reservations, results)
 
-        refundable = reservation.payments.annotate(
-            currently_paid=F("amount") - F("refunded_amount")
-        ).filter(currently_paid__gt=0)
-        for charge in refundable:
-            to_refund = min(total_deposit, charge.currently_paid)
-            try:
-                payment_service.refund(charge.external_id, int(to_refund * 100))
-            except StripeError as e:
-                logger.warning("Could not refund charge id: %s, %s", charge.id, e)
-                continue
+    refunded_by_reservation = defaultdict(Decimal)
+    for charge, amount in succeeded:
+        refunded_by_reservation[charge.payment_for_id] += amount
+    for reservation in reservations:
+        if reservation.pk in refunded_by_reservation:
+            reservation_changed.send(
+                sender=models.Reservation,
+                changes={"refund": str(refunded_by_reservation[reservation.pk])},
+                instance=reservation,
+            )
 
-            charge.refunded_amount += to_refund
-            charge.save()
+    return [reservation.pk for reservation in reservations]
 
-            total_deposit -= to_refund
-            if total_deposit == 0:
-                break
 
-        security_deposits.update(refundable=False)
-        refunded.append(reservation.id)
+@periodic_task(run_every=timedelta(hours=6))
+def reservation_deposit_refund():
+    """
+    Refund security deposits of reservations released today.
+
+    Reservations are refunded concurrently, charges of a reservation one after another, with
+    idempotency keys and recorded in bulk. Deposits whose refund failed stay refundable and
+    only their remaining part is refunded by following runs. A cache lock keeps a long run from
+    overlapping with the next scheduled one.
+    """
+    if not cache.add(DEPOSIT_REFUND_LOCK, True, DEPOSIT_REFUND_LOCK_TIMEOUT):
+        return "Deposit refund already in progress"
+    try:
+        refunded = _refund_deposits(timezone.now().today())
+    finally:
+        cache.delete(DEPOSIT_REFUND_LOCK)
 
     return "Deposit refunded for reservations: {}".format(refunded)
 
 
 @periodic_task(run_every=timedelta(minutes=15))
-def queue_time_zone_jobs():
+def resolve_time_zones():
+    """
+    Set time zones of properties that have coordinates but no time zone yet.
+
+    Properties sharing a time zone are updated together. Properties whose remote lookup
+    failed are left unresolved and picked up again by the next run.
+    """
     properties = (
         Property.objects.filter(time_zone="")
         .exclude(location__latitude=None, location__longitude=None)
-        .values_list("pk", flat=True)
+        .values_list("pk", "location__latitude", "location__longitude")
+    )
+    resolver = TimeZoneResolver()
+    by_time_zone = defaultdict(list)
+    for pk, latitude, longitude in properties.iterator():
+        try:
+            by_time_zone[resolver.resolve(latitude, longitude)].append(pk)
+        except ServiceError:
+            continue
+
+    for time_zone, pks in by_time_zone.items():
+        Property.objects.filter(pk__in=pks).update(time_zone=time_zone)
+    return "Resolved time zones of {} properties".format(
+        sum(map(len, by_time_zone.values()))
     )
-    job = group(set_time_zone.s(pk) for pk in properties)
-    job.apply_async()
-    return "Scheduled timezone jobs"
 
 
 @task
 def set_time_zone(pk):
-    prop = Property.objects.get(pk=pk)
+    prop = Property.objects.select_related("location").get(pk=pk)
     location = prop.location
     try:
-        service = GoogleService()
-        tz = service.get_timezone(location.latitude, location.longitude)
-        prop.time_zone = tz
+        prop.time_zone = TimeZoneResolver().resolve(location.latitude, location.longitude)
     except ServiceError:
         prop.time_zone = None
     finally:
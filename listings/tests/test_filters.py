@@ -5,11 +5,15 @@ from random import choice
 from unittest import mock
 from uuid import uuid4
 
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.utils import timezone
 from rest_framework.compat import coreapi
 from rest_framework.exceptions import NotFound
 
+from accounts import permission_cache
+from accounts.choices import RoleTypes
+from accounts.models import Organization
 from cozmo_common.filters import OrganizationFilter
 from listings import filters, models
 from listings.choices import PropertyStatuses
@@ -299,3 +303,69 @@ class MultiCalendarFilterTestCase(TestCase):
             mc = filters.MultiCalendarFilter()
             result = mc.filter_queryset(request, queryset, view)
             self.assertEqual(1, len(result))
+
+    def test_filter_price(self):
+        cheap, expensive, no_rates = models.Property.objects.order_by("max_guests")
+        start = timezone.now().date()
+        for prop, nightly in ((cheap, 50), (expensive, 150)):
+            models.Rate.objects.create(
+                nightly=Decimal(nightly), time_frame=(start, start + timedelta(days=5)), prop=prop
+            )
+
+        def filter_props(**query_params):
+            request = mock.MagicMock(query_params=query_params)
+            return list(
+                filters.MultiCalendarFilter().filter_queryset(
+                    request, models.Property.objects.all(), mock.MagicMock()
+                )
+            )
+
+        with self.subTest("Minimal price"):
+            self.assertListEqual(filter_props(price_min="100"), [expensive])
+
+        with self.subTest("Maximal price"):
+            self.assertListEqual(filter_props(price_max="100"), [cheap])
+
+        with self.subTest("Order by price"):
+            self.assertListEqual(filter_props(ordering="price"), [cheap, expensive, no_rates])
+            self.assertListEqual(filter_props(ordering="-price"), [expensive, cheap, no_rates])
+
+        with self.subTest("Summary follows rate changes"):
+            models.Rate.objects.filter(prop=expensive).delete()
+            self.assertListEqual(filter_props(price_min="100"), [])
+            self.assertEqual(models.PriceSummary.objects.get(prop=expensive).max_nightly, None)
+
+
+class GroupAccessFilterTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.org = Organization.objects.create()
+        cls.user = get_user_model().objects.create(
+            username=str(uuid4()), role=RoleTypes.contributor_group.value
+        )
+        cls.group = models.Group.objects.create(name="Allowed", organization=cls.org)
+        cls.other_group = models.Group.objects.create(name="Other", organization=cls.org)
+        cls.prop = models.Property.objects.create(organization=cls.org, group=cls.group)
+        models.Property.objects.create(organization=cls.org, group=cls.other_group)
+        models.GroupUserAssignment.objects.create(user=cls.user, group=cls.group)
+
+    def setUp(self):
+        permission_cache.invalidate_users(self.user.pk)
+
+    def filter(self):
+        request = mock.MagicMock(user=self.user)
+        view = mock.MagicMock(spec=[])
+        return filters.GroupAccessFilter().filter_queryset(
+            request, models.Property.objects.filter(organization=self.org), view
+        )
+
+    def test_filter_queryset(self):
+        self.assertListEqual(list(self.filter()), [self.prop])
+
+        with self.assertNumQueries(1):
+            self.assertListEqual(list(self.filter()), [self.prop])
+
+    def test_permission_change_invalidates(self):
+        self.assertEqual(self.filter().count(), 1)
+        models.GroupUserAssignment.objects.create(user=self.user, group=self.other_group)
+        self.assertEqual(self.filter().count(), 2)
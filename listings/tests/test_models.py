@@ -661,6 +661,36 @@ class ReservationTestCase(TestCase):
         reservation = models.Reservation.objects.only("id").get(id=self.reservation.id)
         self.assertIsInstance(reservation._initial_data, dict)
 
+    def test_changed_fields(self):
+        reservation = models.Reservation.objects.get(id=self.reservation.id)
+        self.assertEqual(reservation._changed_fields(), {})
+
+        reservation.pets = 2
+        reservation.date_updated = None
+        self.assertEqual(reservation._changed_fields(), {"pets": 0})
+        self.assertEqual(reservation._updated_fields(), {"pets": {"initial": 0, "updated": 2}})
+
+    def test_save_only_dirty_fields(self):
+        reservation = models.Reservation.objects.get(id=self.reservation.id)
+        models.Reservation.objects.filter(id=reservation.id).update(cancellation_notes="Notes")
+
+        reservation.pets = 3
+        reservation.save()
+
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.pets, 3)
+        self.assertEqual(reservation.cancellation_notes, "Notes")
+
+        with self.subTest(msg="Value reverted after save is written"):
+            reservation.pets = 0
+            reservation.save()
+            self.assertEqual(
+                models.Reservation.objects.values_list("pets", flat=True).get(
+                    id=reservation.id
+                ),
+                0,
+            )
+
 
 class Azure404Storage(AzureStorage):
     """Always return empty file, simulating resource was not found on Azure"""
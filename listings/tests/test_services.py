@@ -10,7 +10,7 @@ from crm.models import Contact
 from listings import models
 from listings.calendars.models import ExternalCalendar
 from listings.choices import WeekDays
-from listings.services import IsPropertyAvailable
+from listings.services import IsPropertyAvailable, PropertyConstraints
 
 
 class IsPropertyAvailableTestCase(TestCase):
@@ -214,6 +214,47 @@ class IsPropertyAvailableTestCase(TestCase):
                 ipa.blocked_days,
             )
 
+    def test_check_windows(self):
+        windows = [
+            (self.start, self.end),
+            (self.start + timedelta(days=1), self.end),
+            (self.start - timedelta(days=14), self.start - timedelta(days=4)),
+            (date(2018, 6, 4), date(2018, 6, 15)),
+            (date(2018, 10, 8), date(2018, 10, 18)),
+        ]
+        prop = models.Property.objects.get(pk=self.prop.pk)
+
+        with self.assertNumQueries(2):
+            checks = IsPropertyAvailable.check_windows(prop, windows)
+
+        for (start, end), ipa in zip(windows, checks):
+            with self.subTest(start=start, end=end):
+                single = IsPropertyAvailable(self.prop, start, end)
+                single.run_check()
+                self.assertEqual(ipa.is_available(), single.is_available())
+                self.assertListEqual(ipa.conflicts, single.conflicts)
+                self.assertListEqual(ipa.blocked_days, single.blocked_days)
+
+    def test_load_many_constraints(self):
+        other = models.Property.objects.create(
+            name="Other",
+            property_type=models.Property.Types.Apartment.value,
+            rental_type=models.Property.Rentals.Private.value,
+            status=models.Property.Statuses.Active.value,
+            organization=self.organization,
+        )
+        start, end = self.start - timedelta(days=30), self.end + timedelta(days=300)
+
+        with self.assertNumQueries(1):
+            loaded = PropertyConstraints.load_many([self.prop, other], start, end)
+
+        self.assertEqual(list(loaded), [self.prop.pk, other.pk])
+        single = PropertyConstraints(self.prop, start, end).load()
+        for kind, rows in single.rows.items():
+            with self.subTest(kind=kind):
+                self.assertCountEqual(loaded[self.prop.pk].rows[kind], rows)
+                self.assertEqual(loaded[other.pk].rows[kind], [])
+
 
 raw_ical = b"""
 BEGIN:VCALENDAR
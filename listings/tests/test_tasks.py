@@ -1,10 +1,25 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from hashlib import md5
 from unittest import mock
 
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.test import TestCase
 from requests import ConnectTimeout, HTTPError
 
-from listings.models import Image, Property
-from listings.tasks import fetch_property_media
+from accounts.models import Organization
+from crm.models import Contact
+from listings.choices import SecurityDepositTypes
+from listings.models import Image, Property, Reservation, ReservationFee
+from listings.tasks import (
+    DEPOSIT_REFUND_LOCK,
+    _refund_deposits,
+    fetch_property_media,
+    reservation_deposit_refund,
+)
+from payments.models import Charge
+from payments.services import StripeError
 
 
 class FetchMediaTaskTestCase(TestCase):
@@ -19,7 +34,7 @@ class FetchMediaTaskTestCase(TestCase):
         cls.original_url = "http://example.org/file.jpg"
         cls.image = Image.objects.create(prop=cls.prop, url=cls.original_url)
 
-    @mock.patch("listings.tasks.requests.get")
+    @mock.patch("listings.tasks.requests.Session.get")
     def test_fetch_failure(self, m_get):
         for name, error in (
             ("Connection timeout", ConnectTimeout),
@@ -30,3 +45,246 @@ class FetchMediaTaskTestCase(TestCase):
                 fetch_property_media.s(self.prop.pk).apply()
                 self.image.refresh_from_db()
                 self.assertEqual(self.image.url, self.original_url)
+
+    @mock.patch("listings.tasks.generate_image_thumbnails.delay")
+    @mock.patch("listings.tasks.requests.Session.get")
+    def test_fetch_deduplicates_content(self, m_get, m_thumbnails):
+        hosted = Image.objects.create(
+            prop=self.prop,
+            url="properties/images/hosted.jpg",
+            thumbnail="properties/images/thumbnail/thumb_hosted.jpeg",
+            content_hash=md5(b"content").hexdigest(),
+        )
+        m_get.return_value = mock.Mock(content=b"content")
+
+        fetch_property_media.s(self.prop.pk).apply()
+
+        self.image.refresh_from_db()
+        self.assertEqual(self.image.url.name, hosted.url.name)
+        self.assertEqual(self.image.thumbnail.name, hosted.thumbnail.name)
+        self.assertEqual(self.image.content_hash, hosted.content_hash)
+        m_thumbnails.assert_not_called()
+
+        with self.subTest("Already stored media is not fetched again"):
+            m_get.reset_mock()
+            fetch_property_media.s(self.prop.pk).apply()
+            m_get.assert_not_called()
+
+    @mock.patch("listings.tasks.generate_image_thumbnails.delay")
+    @mock.patch("listings.tasks.requests.Session.get")
+    def test_fetch_does_not_share_content_with_other_organizations(self, m_get, m_thumbnails):
+        other = Property.objects.create(
+            name="Other",
+            property_type=Property.Types.Apartment.value,
+            rental_type=Property.Rentals.Private.value,
+            status=Property.Statuses.Active.value,
+            organization=Organization.objects.create(),
+        )
+        hosted = Image.objects.create(
+            prop=other,
+            url="properties/images/hosted.jpg",
+            content_hash=md5(b"content").hexdigest(),
+        )
+        m_get.return_value = mock.Mock(content=b"content")
+        storage = Image._meta.get_field("url").storage
+
+        with mock.patch.object(storage, "save", return_value="properties/images/new.jpg"):
+            fetch_property_media.s(self.prop.pk).apply()
+
+        self.image.refresh_from_db()
+        self.assertEqual(self.image.url.name, "properties/images/new.jpg")
+        self.assertNotEqual(self.image.url.name, hosted.url.name)
+        m_thumbnails.assert_called_once_with([self.image.pk])
+
+    def test_delete_keeps_shared_file(self):
+        images = [
+            Image.objects.create(
+                prop=self.prop,
+                url="properties/images/hosted.jpg",
+                content_hash=md5(b"content").hexdigest(),
+            )
+            for _ in range(2)
+        ]
+        storage = Image._meta.get_field("url").storage
+
+        with mock.patch.object(storage, "delete") as m_delete:
+            images[0].delete()
+            m_delete.assert_not_called()
+
+            images[1].delete()
+            m_delete.assert_called_once_with("properties/images/hosted.jpg")
+
+
+class StripeStub:
+    """Local replacement of `payments.services.Stripe` recording issued refunds."""
+
+    refunds = []
+    declined = set()
+    responses = {}
+
+    def refund(self, charge_id, amount=None, idempotency_key=None):
+        # Stripe replays the stored result of a request with a known idempotency key
+        if idempotency_key not in self.responses:
+            self.responses[idempotency_key] = charge_id in self.declined
+            if charge_id not in self.declined:
+                self.refunds.append((charge_id, amount, idempotency_key))
+        if self.responses[idempotency_key]:
+            raise StripeError("Card declined")
+
+
+@mock.patch("listings.tasks.Stripe", StripeStub)
+class ReservationDepositRefundTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create()
+        prop = Property.objects.create(
+            name="Name",
+            property_type=Property.Types.Apartment.value,
+            rental_type=Property.Rentals.Private.value,
+            status=Property.Statuses.Active.value,
+            organization=cls.organization,
+        )
+        cls.reservations = [
+            Reservation.objects.create(
+                start_date=date.today() - timedelta(days=5),
+                end_date=date.today() - timedelta(days=2),
+                refund_deposit_after=2,
+                price=Decimal("400"),
+                paid=Decimal("200"),
+                guest=Contact.objects.create(organization=cls.organization),
+                prop=prop,
+            )
+            for _ in range(2)
+        ]
+        for reservation in cls.reservations:
+            ReservationFee.objects.create(
+                reservation=reservation,
+                value=Decimal("150"),
+                refundable=True,
+                fee_tax_type=SecurityDepositTypes.Security_Deposit.value,
+            )
+
+    def setUp(self):
+        StripeStub.refunds = []
+        StripeStub.declined = set()
+        StripeStub.responses = {}
+        cache.delete(DEPOSIT_REFUND_LOCK)
+
+    def _charge(self, reservation, external_id, amount):
+        return Charge.objects.create(
+            external_id=external_id,
+            amount=Decimal(amount),
+            content_type=ContentType.objects.get_for_model(Reservation),
+            payment_for_id=reservation.pk,
+            organization=self.organization,
+        )
+
+    def test_refund(self):
+        first, second = self.reservations
+        charges = [
+            self._charge(first, "ch_1", "100"),
+            self._charge(first, "ch_2", "100"),
+            self._charge(second, "ch_3", "200"),
+        ]
+        StripeStub.declined = {"ch_3"}
+
+        reservation_deposit_refund.s().apply()
+
+        self.assertCountEqual(
+            StripeStub.refunds,
+            [
+                ("ch_1", 10000, f"deposit-refund-{first.pk}-{charges[0].pk}-0-10000"),
+                ("ch_2", 5000, f"deposit-refund-{first.pk}-{charges[1].pk}-0-5000"),
+            ],
+        )
+        self.assertEqual(
+            [c.refunded_amount for c in Charge.objects.order_by("pk")],
+            [Decimal("100"), Decimal("50"), Decimal("0")],
+        )
+        self.assertEqual(
+            list(ReservationFee.objects.filter(refundable=True).values_list("reservation_id")),
+            [(second.pk,)],
+        )
+
+        with self.subTest("Only deposits with failed refunds are processed again"):
+            StripeStub.refunds = []
+            StripeStub.declined = set()
+            reservation_deposit_refund.s().apply()
+            self.assertEqual(
+                StripeStub.refunds,
+                [("ch_3", 15000, f"deposit-refund-{second.pk}-{charges[2].pk}-1-15000")],
+            )
+            self.assertFalse(ReservationFee.objects.filter(refundable=True).exists())
+
+    def test_refund_declined_charge(self):
+        first, _ = self.reservations
+        charges = [
+            self._charge(first, "ch_1", "100"),
+            self._charge(first, "ch_2", "200"),
+        ]
+        StripeStub.declined = {"ch_1"}
+
+        reservation_deposit_refund.s().apply()
+
+        self.assertEqual(
+            StripeStub.refunds,
+            [("ch_2", 15000, f"deposit-refund-{first.pk}-{charges[1].pk}-0-15000")],
+        )
+        self.assertEqual(
+            [c.refunded_amount for c in Charge.objects.order_by("pk")],
+            [Decimal("0"), Decimal("150")],
+        )
+        self.assertFalse(
+            ReservationFee.objects.filter(reservation=first, refundable=True).exists()
+        )
+
+    def test_retry_refunds_remaining_deposit(self):
+        first, _ = self.reservations
+        charges = [
+            self._charge(first, "ch_1", "100"),
+            self._charge(first, "ch_2", "100"),
+        ]
+        StripeStub.declined = {"ch_2"}
+
+        reservation_deposit_refund.s().apply()
+
+        self.assertEqual(
+            StripeStub.refunds,
+            [("ch_1", 10000, f"deposit-refund-{first.pk}-{charges[0].pk}-0-10000")],
+        )
+        fee = ReservationFee.objects.get(reservation=first)
+        self.assertTrue(fee.refundable)
+        self.assertEqual(fee.refunded_amount, Decimal("100"))
+        self.assertEqual(fee.refund_attempts, 1)
+
+        with self.subTest("Failed refund is retried with a new key"):
+            StripeStub.refunds = []
+            StripeStub.declined = set()
+            _refund_deposits(date.today() + timedelta(days=1))
+
+            self.assertEqual(
+                StripeStub.refunds,
+                [("ch_2", 5000, f"deposit-refund-{first.pk}-{charges[1].pk}-1-5000")],
+            )
+            self.assertEqual(
+                [c.refunded_amount for c in Charge.objects.order_by("pk")],
+                [Decimal("100"), Decimal("50")],
+            )
+            fee.refresh_from_db()
+            self.assertFalse(fee.refundable)
+            self.assertEqual(fee.refunded_amount, Decimal("150"))
+
+        with self.subTest("Settled deposits released earlier are not processed again"):
+            StripeStub.refunds = []
+            _refund_deposits(date.today() + timedelta(days=2))
+            self.assertEqual(StripeStub.refunds, [])
+
+    def test_overlapping_run(self):
+        self._charge(self.reservations[0], "ch_1", "200")
+        cache.add(DEPOSIT_REFUND_LOCK, True)
+
+        result = reservation_deposit_refund.s().apply()
+
+        self.assertEqual(result.result, "Deposit refund already in progress")
+        self.assertEqual(StripeStub.refunds, [])
+        self.assertTrue(ReservationFee.objects.filter(refundable=True).exists())
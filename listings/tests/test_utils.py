@@ -0,0 +1,116 @@
+from collections import OrderedDict
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import zip_longest
+from random import Random
+
+from django.test import TestCase
+from psycopg2.extras import DateRange
+
+from cozmo_common.functions import date_range
+from listings.utils import is_weekend, prepare_prices, split_by_ranges
+
+
+def reference_split_by_ranges(start, days, ranges):
+    """Day by day implementation used before the interval based one."""
+    result = []
+    while days > 0:
+        for (field_name, range_days) in ranges.items():
+            if days >= range_days:
+                end = start + timedelta(days=range_days)
+                days = days - range_days
+                result.append({"field_name": field_name, "range": (start, end)})
+                start = end
+                break
+    return result
+
+
+def reference_prepare_prices(rate_groups, periods):
+    """Day by day implementation used before the interval based one."""
+    prices = {}
+    for period in periods:
+        divider = (period["range"][1] - period["range"][0]).days
+        for rates in rate_groups:
+            for rate in rates:
+                if rate is None:
+                    continue
+                rate_range = date_range(
+                    max(period["range"][0], rate["time_frame"].lower or date.min),
+                    min(period["range"][1], rate["time_frame"].upper or date.max),
+                )
+                prices.update(
+                    {
+                        visit_day: rate[period["field_name"]] / divider
+                        if rate[period["field_name"]] > 0
+                        else rate["nightly"]
+                        for visit_day in rate_range
+                    }
+                )
+                if period["field_name"] == "nightly":
+                    rate_range = date_range(
+                        max(period["range"][0], rate["time_frame"].lower or date.min),
+                        min(period["range"][1], rate["time_frame"].upper or date.max),
+                    )
+                    for visit_day in rate_range:
+                        if is_weekend(visit_day):
+                            prices[visit_day] = rate["weekend"] or rate["nightly"]
+    return prices
+
+
+class PricingUtilsTestCase(TestCase):
+
+    ITERATIONS = 300
+
+    def setUp(self):
+        self.random = Random(20191028)
+
+    def random_ranges(self):
+        return self.random.choice(
+            (
+                OrderedDict([("monthly", self.random.choice((28, 30, 31))), ("weekly", 7)]),
+                OrderedDict([("weekly", 7)]),
+                OrderedDict(),
+            )
+        )
+
+    def random_rate(self, start, days):
+        lower = start + timedelta(days=self.random.randint(-10, days))
+        upper = lower + timedelta(days=self.random.randint(1, days + 10))
+        return {
+            "time_frame": DateRange(
+                None if self.random.random() < 0.1 else lower,
+                None if self.random.random() < 0.1 else upper,
+            ),
+            "nightly": Decimal(self.random.randint(1, 500)),
+            "weekly": Decimal(self.random.choice((0, self.random.randint(1, 2000)))),
+            "monthly": Decimal(self.random.choice((0, self.random.randint(1, 8000)))),
+            "weekend": self.random.choice((None, Decimal(self.random.randint(1, 600)))),
+        }
+
+    def test_split_by_ranges(self):
+        for _ in range(self.ITERATIONS):
+            start = date(2019, 1, 1) + timedelta(days=self.random.randint(0, 365))
+            days = self.random.randint(-2, 400)
+            ranges = self.random_ranges()
+            ranges["nightly"] = 1
+            with self.subTest(start=start, days=days, ranges=ranges):
+                self.assertListEqual(
+                    split_by_ranges(start, days, ranges),
+                    reference_split_by_ranges(start, days, ranges),
+                )
+
+    def test_prepare_prices(self):
+        for _ in range(self.ITERATIONS):
+            start = date(2019, 1, 1) + timedelta(days=self.random.randint(0, 365))
+            days = self.random.randint(1, 120)
+            ranges = self.random_ranges()
+            ranges["nightly"] = 1
+            periods = split_by_ranges(start, days, ranges)
+            seasonal = [self.random_rate(start, days) for _ in range(self.random.randint(0, 3))]
+            visit = [self.random_rate(start, days) for _ in range(self.random.randint(0, 5))]
+            rate_groups = tuple(zip_longest(seasonal, visit))
+            with self.subTest(start=start, days=days, ranges=ranges, rates=rate_groups):
+                self.assertDictEqual(
+                    prepare_prices(rate_groups, periods),
+                    reference_prepare_prices(rate_groups, periods),
+                )
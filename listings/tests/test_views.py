@@ -11,11 +11,14 @@ from rest_framework import status
 from rest_framework.exceptions import NotFound
 from rest_framework.serializers import ListSerializer
 
-from accounts.models import Organization
+from accounts.models import Organization, OwnerUser
 from crm.models import Contact
 from listings import models, serializers, views
+from listings.calendars.models import CalendarColor, ExternalCalendar, ExternalCalendarEvent
 from listings.choices import CalculationMethod
 from listings.public_views import InquiryView
+from owners.models import Owner
+from rental_integrations.airbnb.models import AirbnbSync
 
 User = get_user_model()
 
@@ -80,6 +83,124 @@ class PointOfInterestViewSetTestCase(TestCase):
         self.assertIsInstance(serializer, ListSerializer)
 
 
+class PropertyListQueryCountTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create()
+        cls.group = models.Group.objects.create(name="Group", organization=cls.organization)
+
+    def add_properties(self, count):
+        for i in range(count):
+            owner = Owner.objects.create(
+                user=OwnerUser.objects.create(username=f"owner-{self.id()}-{i}"),
+                organization=self.organization,
+            )
+            prop = models.Property.objects.create(
+                name=f"Name {i}",
+                property_type=models.Property.Types.Apartment.value,
+                rental_type=models.Property.Rentals.Private.value,
+                organization=self.organization,
+                owner=owner,
+                group=self.group,
+                location=models.Location.objects.create(city="City"),
+            )
+            models.Image.objects.create(url="image.png", thumbnail="thumb.png", order=1, prop=prop)
+            models.Image.objects.create(url="cover.png", thumbnail="thumb.png", order=0, prop=prop)
+            AirbnbSync.objects.create(prop=prop, organization=self.organization)
+
+    def list_properties(self):
+        view = views.PropertyViewSet(action="list")
+        queryset = view.get_queryset().filter(organization=self.organization)
+        return serializers.PropertyListSerializer(queryset, many=True).data
+
+    def test_constant_query_count(self):
+        for count in (1, 5):
+            self.add_properties(count)
+            with self.subTest(properties=count), self.assertNumQueries(3):
+                data = self.list_properties()
+
+        self.assertTrue(all(prop["cover_image"].endswith("cover.png") for prop in data))
+        self.assertTrue(all("airbnb" in prop["channels"] for prop in data))
+
+    def test_group_properties_count(self):
+        self.add_properties(2)
+        view = views.GroupViewSet(action="list")
+        with self.assertNumQueries(1):
+            data = serializers.GroupSerializer(view.get_queryset(), many=True).data
+        self.assertEqual(data[0]["properties_count"], 2)
+
+
+class ReservationCalendarQueryCountTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create()
+        cls.color = CalendarColor.objects.create(name="Red", hex_color="#ff0000")
+        cls.start = timezone.now().date()
+        cls.end = cls.start + timedelta(days=10)
+
+    def add_properties(self, count):
+        for i in range(count):
+            prop = models.Property.objects.create(
+                name=f"Name {i}",
+                property_type=models.Property.Types.Apartment.value,
+                rental_type=models.Property.Rentals.Private.value,
+                organization=self.organization,
+                location=models.Location.objects.create(city="City"),
+            )
+            models.PricingSettings.objects.create(prop=prop, nightly=Decimal("100"))
+            models.Image.objects.create(url="cover.png", thumbnail="thumb.png", order=0, prop=prop)
+            models.Reservation.objects.create(
+                start_date=self.start + timedelta(days=1),
+                end_date=self.start + timedelta(days=3),
+                price=Decimal("0"),
+                paid=Decimal("0.00"),
+                prop=prop,
+                guest=Contact.objects.create(organization=self.organization),
+                status=models.Reservation.Statuses.Accepted.value,
+            )
+            models.Blocking.objects.create(time_frame=(self.start, self.end), prop=prop)
+            models.Rate.objects.create(
+                nightly=Decimal("120"), time_frame=(self.start, self.end), prop=prop
+            )
+            external = ExternalCalendar.objects.create(
+                name="External",
+                url="http://example.org/ical/",
+                cozmo_cal=prop.cozmo_calendar,
+                color=self.color,
+            )
+            ExternalCalendarEvent.objects.create(
+                external_cal=external,
+                uid=f"event-{i}",
+                start_date=self.start + timedelta(days=4),
+                end_date=self.start + timedelta(days=6),
+            )
+
+    def list_calendar(self):
+        request = mock.MagicMock(
+            query_params={"from": self.start.isoformat(), "to": self.end.isoformat()}
+        )
+        view = views.ReservationCalendarView(action="list", request=request)
+        queryset = view.get_queryset().filter(organization=self.organization)
+        page = view.load_calendar(list(queryset))
+        context = {"request": request}
+        return serializers.PropertyCalSerializer(page, many=True, context=context).data
+
+    def test_constant_query_count(self):
+        for count in (1, 5):
+            self.add_properties(count)
+            with self.subTest(properties=count), self.assertNumQueries(6):
+                data = self.list_calendar()
+
+        for prop in data:
+            self.assertEqual(len(prop["reservations"]), 1)
+            self.assertEqual(len(prop["blockings"]), 1)
+            self.assertEqual(len(prop["rates"]), 1)
+            self.assertEqual(prop["base_rate"]["nightly"], Decimal("100.00"))
+            self.assertEqual(
+                [event["color"] for event in prop["ical_events"]], [self.color.hex_color]
+            )
+
+
 class PropertyViewSetTestCase(TestCase):
     def setUp(self):
         self.view = views.PropertyViewSet(
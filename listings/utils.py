@@ -1,5 +1,7 @@
+from bisect import bisect_right
 from collections import OrderedDict
 from datetime import date, timedelta
+from itertools import islice
 from urllib.parse import urljoin
 
 from django.conf import settings
@@ -41,45 +43,94 @@ def is_weekend(day: date, weekend_days: list = None):
 
 
 def split_by_ranges(start: date, days: int, ranges: OrderedDict) -> list:
+    """
+    Split `days` starting at `start` into consecutive periods.
+
+    Ranges are used greedily in the given order, so every range takes as many whole
+    periods as fit into the days left by the previous ones.
+    """
     result = []
-    while days > 0:
-        for (field_name, range_days) in ranges.items():
-            if days >= range_days:
-                end = start + timedelta(days=range_days)
-                days = days - range_days
-                result.append({"field_name": field_name, "range": (start, end)})
-                start = end
-                break
+    for (field_name, range_days) in ranges.items():
+        if days <= 0:
+            break
+        count, days = divmod(days, range_days)
+        result.extend(
+            {
+                "field_name": field_name,
+                "range": (
+                    start + timedelta(days=range_days * i),
+                    start + timedelta(days=range_days * (i + 1)),
+                ),
+            }
+            for i in range(count)
+        )
+        start += timedelta(days=range_days * count)
     return result
 
 
+def _owned_intervals(rates: list, lower: date, upper: date) -> list:
+    """
+    Return `(start, end, rate)` intervals within `[lower, upper)` for the last rate covering them.
+
+    Rates are painted from the last one, so each day is assigned to exactly one rate.
+    """
+    free = [(lower, upper)]
+    owned = []
+    for rate in reversed(rates):
+        if not free:
+            break
+        rate_lower = rate["time_frame"].lower or date.min
+        rate_upper = rate["time_frame"].upper or date.max
+        left = []
+        for (start, end) in free:
+            if rate_upper <= start or end <= rate_lower:
+                left.append((start, end))
+                continue
+            if start < rate_lower:
+                left.append((start, rate_lower))
+            if rate_upper < end:
+                left.append((rate_upper, end))
+            owned.append((max(start, rate_lower), min(end, rate_upper), rate))
+        free = left
+    return owned
+
+
 def prepare_prices(rate_groups: tuple, periods: list) -> dict:
+    """
+    Map every day of `periods` (as returned by `split_by_ranges`) to its price.
+
+    Later rates in `rate_groups` take precedence. Prices are computed once per period and
+    rate interval, weekend prices are overlaid only on days of nightly periods.
+    """
     prices = {}
-    for period in periods:
-        divider = (period["range"][1] - period["range"][0]).days
-        for rates in rate_groups:
-            for rate in rates:
-                if rate is None:
-                    continue
-                rate_range = date_range(
-                    max(period["range"][0], rate["time_frame"].lower or date.min),
-                    min(period["range"][1], rate["time_frame"].upper or date.max),
-                )
+    rates = [rate for rates in rate_groups for rate in rates if rate is not None]
+    if not periods or not rates:
+        return prices
+
+    period_starts = [period["range"][0] for period in periods]
+    weekend_days = {WeekDays.Sunday.value, WeekDays.Saturday.value}
+    owned = _owned_intervals(rates, period_starts[0], periods[-1]["range"][1])
+    for (start, end, rate) in owned:
+        index = max(bisect_right(period_starts, start) - 1, 0)
+        for period in islice(periods, index, None):
+            period_start, period_end = period["range"]
+            if period_start >= end:
+                break
+            day_from, day_to = max(start, period_start), min(end, period_end)
+            if day_from >= day_to:
+                continue
+
+            field_name = period["field_name"]
+            divider = (period_end - period_start).days
+            price = rate[field_name] / divider if rate[field_name] > 0 else rate["nightly"]
+            prices.update(dict.fromkeys(date_range(day_from, day_to), price))
+
+            # update days only from nightly period
+            if field_name == "nightly":
+                weekend_price = rate["weekend"] or rate["nightly"]
                 prices.update(
-                    {
-                        visit_day: rate[period["field_name"]] / divider
-                        if rate[period["field_name"]] > 0
-                        else rate["nightly"]
-                        for visit_day in rate_range
-                    }
+                    (day, weekend_price)
+                    for day in date_range(day_from, day_to)
+                    if day.weekday() in weekend_days
                 )
-                # update days only from nightly period
-                if period["field_name"] == "nightly":
-                    rate_range = date_range(
-                        max(period["range"][0], rate["time_frame"].lower or date.min),
-                        min(period["range"][1], rate["time_frame"].upper or date.max),
-                    )
-                    for visit_day in rate_range:
-                        if is_weekend(visit_day):
-                            prices[visit_day] = rate["weekend"] or rate["nightly"]
     return prices
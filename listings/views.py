@@ -6,7 +6,7 @@ from itertools import chain
 
 from django.core import exceptions
 from django.core.cache import cache
-from django.db.models import F, Sum, Value
+from django.db.models import Count, F, Prefetch, Sum, Value
 from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, mixins, parsers, viewsets
@@ -275,7 +275,9 @@ class PropertyViewSet(ApplicationPermissionViewMixin, NestedViewSetMixin, viewse
             # "partial_update": self.queryset.list(),
             # "update": serializers.PropertyCreateSerializer,
             # "create": serializers.PropertyCreateSerializer,
-            "list": self.queryset.list()
+            "list": self.queryset.prefetch_related(None)
+            .list()
+            .prefetch_related(Prefetch("airbnb_sync", to_attr="airbnb_syncs"))
         }.get(self.action, self.queryset)
 
     def get_serializer_class(self):
@@ -450,6 +452,28 @@ class ReservationCalendarView(
     )
     search_fields = ("name", "location__address")
 
+    def get_queryset(self):
+        return (
+            super()
+            .get_queryset()
+            .select_related("location", "pricing_settings", "availability_settings")
+            .with_cover_image()
+        )
+
+    def load_calendar(self, properties):
+        start, end = filters.MultiCalendarFilter().get_query_params(self.request)
+        services.CalendarLoader(start, end).load(properties)
+        return properties
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            self.load_calendar(page)
+        return page
+
+    def get_object(self):
+        return self.load_calendar([super().get_object()])[0]
+
 
 class RoomViewSet(NestedPropertyCreateMixin, NestedViewSetMixin, viewsets.ModelViewSet):
     """Read, create, update and delete Room information."""
@@ -482,7 +506,7 @@ class TaxViewSet(viewsets.ModelViewSet):
 class GroupViewSet(ApplicationPermissionViewMixin, viewsets.ModelViewSet):
     """Read, create, update and delete Group information."""
 
-    queryset = models.Group.objects.all()
+    queryset = models.Group.objects.annotate(properties_count=Count("property", distinct=True))
     serializer_class = serializers.GroupSerializer
 
     @action(detail=True, methods=["PUT"])
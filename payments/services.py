@@ -136,9 +136,11 @@ class Stripe:
             raise
         return charge
 
-    def refund(self, charge_id: str, amount: int = None):
+    def refund(self, charge_id: str, amount: int = None, idempotency_key: str = None):
         try:
-            refund = stripe.Refund.create(charge=charge_id, amount=amount)
+            refund = stripe.Refund.create(
+                charge=charge_id, amount=amount, idempotency_key=idempotency_key
+            )
         except StripeError as e:
             logger.warn("StripeError : %s", e)
             raise
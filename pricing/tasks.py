@@ -1,15 +1,22 @@
 import logging
+from collections import OrderedDict
+from copy import copy
 from datetime import timedelta
 
 from celery.task import task
 from django.conf import settings
+from django.db import transaction
+from psycopg2.extras import DateRange
 
 from cozmo_common.utils import get_today_date
-from listings.models import Property, Rate
-from services.pricing import PricingService
+from listings.models import PriceSummary, Property, Rate
+from listings.signals import price_summary_refresh_suppressed
+from services.pricing import get_price_source
 
 logger = logging.getLogger(__name__)
 
+SMART_RATE_LABEL = "Voyajoy Pricing"
+
 
 """
 Once a day, perform pricing changes. Order of priority from least to greatest
@@ -36,17 +43,72 @@ def _generate_dates(days_delta):
     return days
 
 
+def _collapse_prices(prices):
+    """Collapse consecutive days with the same price into `(start, end)` ranges."""
+    ranges = []
+    for day, price in sorted(prices.items()):
+        if ranges and ranges[-1][1] == day and ranges[-1][2] == price:
+            ranges[-1][1] = day + timedelta(days=1)
+        else:
+            ranges.append([day, day + timedelta(days=1), price])
+    return OrderedDict(((start, end), price) for start, end, price in ranges)
+
+
+def _clone_rate(rate, lower, upper):
+    clone = copy(rate)
+    clone.pk = None
+    clone.time_frame = DateRange(lower, upper)
+    return clone
+
+
 @task
 def generate_smart_pricing(pk):
+    """
+    Store smart prices of a property as ranged Rates.
+
+    Rates which already match the computed prices are left untouched, the others are
+    replaced in bulk. Parts of replaced Rates outside of the horizon are preserved.
+    """
     prop = Property.objects.get(pk=pk)
-    # Rate.objects.filter(prop_id=pk, smart=True).delete()
     dates = _generate_dates(getattr(settings, "DEFAULT_SMART_PRICING_DAYS", 90))
-    service = PricingService(prop)
-    for d in dates:
-        price = service.get_price(d)
-        Rate.objects.update_or_create(
-            time_frame=(d, d + timedelta(days=1)),
-            smart=True,
-            prop=prop,
-            defaults={"nightly": price, "label": "Voyajoy Pricing"},
+    if not dates:
+        return
+    horizon_start, horizon_end = dates[0], dates[-1] + timedelta(days=1)
+    wanted = _collapse_prices(get_price_source(prop).get_prices(dates))
+
+    with transaction.atomic():
+        existing = Rate.default_manager.select_for_update().filter(
+            prop=prop, smart=True, time_frame__overlap=(horizon_start, horizon_end)
         )
+        stale, new_rates = [], []
+        for rate in existing:
+            lower, upper = rate.time_frame.lower, rate.time_frame.upper
+            price = wanted.get((lower, upper))
+            if price is not None and rate.nightly == price and rate.label == SMART_RATE_LABEL:
+                del wanted[(lower, upper)]
+                continue
+            stale.append(rate.pk)
+            if lower is None or lower < horizon_start:
+                new_rates.append(_clone_rate(rate, lower, horizon_start))
+            if upper is None or upper > horizon_end:
+                new_rates.append(_clone_rate(rate, horizon_end, upper))
+
+        new_rates.extend(
+            Rate(
+                prop=prop,
+                smart=True,
+                time_frame=DateRange(start, end),
+                nightly=price,
+                label=SMART_RATE_LABEL,
+            )
+            for (start, end), price in wanted.items()
+        )
+        if stale:
+            # The price summary is refreshed once below instead of for every deleted rate
+            with price_summary_refresh_suppressed():
+                Rate.default_manager.filter(pk__in=stale).delete()
+        if new_rates:
+            Rate.default_manager.bulk_create(new_rates)
+
+    if stale or new_rates:
+        PriceSummary.refresh([prop.pk])
@@ -1,6 +1,12 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from psycopg2.extras import DateRange
 
 from automation.serializers import ReservationAutomationSerializer
+from listings.models import PriceSummary, Property, Rate
+from pricing.tasks import SMART_RATE_LABEL, _generate_dates, generate_smart_pricing
 
 
 class ReservationAutomationTest(TestCase):
@@ -102,3 +108,71 @@ class AutomationTaskTest(TestCase):
     # reservation = mock.Mock(return_value)
     # template = mock.Mock()
     # render_template
+
+
+@override_settings(DEFAULT_SMART_PRICING_DAYS=10)
+class GenerateSmartPricingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.prop = Property.objects.create(
+            name="Name",
+            property_type=Property.Types.Apartment.value,
+            rental_type=Property.Rentals.Private.value,
+        )
+        cls.dates = _generate_dates(10)
+
+    def generate(self, prices):
+        source = mock.MagicMock()
+        source.get_prices.side_effect = lambda dates: dict(zip(dates, prices))
+        with mock.patch("pricing.tasks.get_price_source", return_value=source):
+            generate_smart_pricing(self.prop.pk)
+
+    def smart_rates(self):
+        return list(
+            Rate.default_manager.filter(prop=self.prop, smart=True)
+            .order_by("time_frame")
+            .values_list("time_frame", "nightly", "label")
+        )
+
+    def test_ranges(self):
+        start = self.dates[0]
+        day = timedelta(days=1)
+        past = Rate.objects.create(
+            prop=self.prop,
+            smart=True,
+            nightly=90,
+            time_frame=(start - 2 * day, start + day),
+        )
+
+        self.generate([100] * 4 + [120] * 6)
+        self.assertListEqual(
+            self.smart_rates(),
+            [
+                (DateRange(start - 2 * day, start), past.nightly, past.label),
+                (DateRange(start, start + 4 * day), 100, SMART_RATE_LABEL),
+                (DateRange(start + 4 * day, start + 10 * day), 120, SMART_RATE_LABEL),
+            ],
+        )
+        self.assertEqual(PriceSummary.objects.get(prop=self.prop).max_nightly, 120)
+
+        with self.subTest("Unchanged ranges are kept"):
+            ids = set(Rate.default_manager.filter(prop=self.prop).values_list("id", flat=True))
+            self.generate([100] * 4 + [120] * 6)
+            self.assertSetEqual(
+                ids, set(Rate.default_manager.filter(prop=self.prop).values_list("id", flat=True))
+            )
+
+        with self.subTest("Changed ranges are replaced"):
+            with mock.patch.object(
+                PriceSummary, "refresh", wraps=PriceSummary.refresh
+            ) as m_refresh:
+                self.generate([100] * 4 + [110] * 2 + [120] * 4)
+            m_refresh.assert_called_once_with([self.prop.pk])
+            self.assertListEqual(
+                [time_frame for time_frame, _, _ in self.smart_rates()][1:],
+                [
+                    DateRange(start, start + 4 * day),
+                    DateRange(start + 4 * day, start + 6 * day),
+                    DateRange(start + 6 * day, start + 10 * day),
+                ],
+            )
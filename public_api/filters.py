@@ -1,8 +1,7 @@
-from guardian.shortcuts import get_objects_for_user
 from rest_framework.compat import coreapi, coreschema
 from rest_framework.filters import BaseFilterBackend
 
-from accounts.models import OrgMembership
+from accounts import permission_cache
 from listings.choices import PropertyStatuses
 from rental_connections.models import RentalConnection
 
@@ -31,15 +30,12 @@ class PublicApiAccessFilter(BaseFilterBackend):
         if request.user.is_superuser:
             return queryset.filter(organization__settings__channel_network_enabled=True)
         organization = request.user.organization
-        child_orgs = [o.child for o in OrgMembership.objects.filter(parent=organization)]
         cozmo_qs = queryset.filter(rental_connection=None)
-        connections_qs = RentalConnection.objects.filter(
-            organization__in=[organization] + child_orgs
-        )
-        perms = {"public_api_access"}
-        permitted = get_objects_for_user(
-            request.user, perms, connections_qs, with_superuser=False
-        ).values_list("id", flat=True)
+        permitted = []
+        if organization:
+            permitted = permission_cache.get_permitted_ids(
+                request.user, "public_api_access", RentalConnection, organization.id
+            )
         imported_qs = queryset.filter(rental_connection__id__in=permitted)
         return cozmo_qs | imported_qs
 
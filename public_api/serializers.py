@@ -1,5 +1,6 @@
 from collections import OrderedDict
 from datetime import date, timedelta
+from itertools import chain
 
 from rest_framework import serializers
 from rest_framework.fields import (
@@ -434,8 +435,79 @@ class FeeSerializer(serializers.ModelSerializer):
 
 
 class AvailabilityCalendarSerializer(serializers.BaseSerializer):
+    """
+    Availability, minimum stay and nightly price for `count` days starting today.
+
+    Days are listed one by one, or with `_format=ranges` as runs of consecutive days
+    sharing the same values.
+    """
+
+    RANGES_FORMAT = "ranges"
+
+    @staticmethod
+    def _covering(items, day):
+        """Return the last of `items` whose time frame contains `day`."""
+        for item in reversed(items):
+            time_frame = getattr(item, "time_frame", None)
+            if time_frame is None or (
+                (time_frame.lower is None or time_frame.lower <= day)
+                and (time_frame.upper is None or day < time_frame.upper)
+            ):
+                return item
+        return None
+
+    def get_segments(self, instance, start, end, currency):
+        """Yield `(start, end, values)` for periods of days sharing the same values."""
+        rates = [getattr(instance, "pricing_settings", None)]
+        rates.extend(models.Rate.default_manager.seasonal_rates((start, end), instance.id))
+        rates.extend(models.Rate.default_manager.visit_rates((start, end), instance.id))
+        rates = [rate for rate in rates if rate is not None]
+
+        availabilities = [getattr(instance, "availability_settings", None)]
+        availabilities.extend(
+            models.Availability.get_visit_availability(start, end, instance.id)
+        )
+        availabilities = [availability for availability in availabilities if availability]
+
+        ipa = services.IsPropertyAvailable(instance, start, end)
+        ipa.run_check()
+        blocked = [(b["start_date"], b["end_date"]) for b in ipa.blocked_days]
+
+        bounds = {start, end}
+        for item in chain(rates, availabilities):
+            time_frame = getattr(item, "time_frame", None)
+            if time_frame is not None:
+                bounds.update(
+                    day
+                    for day in (time_frame.lower, time_frame.upper)
+                    if day and start < day < end
+                )
+        for blocked_start, blocked_end in blocked:
+            bounds.update(day for day in (blocked_start, blocked_end) if start < day < end)
+
+        bounds = sorted(bounds)
+        symbol = choices.Currencies[currency].symbol
+        for segment_start, segment_end in zip(bounds, bounds[1:]):
+            # If property does not have rates is unavailable
+            available = True
+            rate = self._covering(rates, segment_start)
+            if rate:
+                price = rate.nightly
+                price_formatted = "{0}{1}".format(symbol, price)
+            else:
+                price, price_formatted, available = None, None, False
+            availability = self._covering(availabilities, segment_start)
+            is_blocked = any(b_start <= segment_start < b_end for b_start, b_end in blocked)
+            yield segment_start, segment_end, {
+                "available": available and not is_blocked,
+                "min_nights": availability.min_stay if availability else None,
+                "price": price,
+                "price_formatted": price_formatted,
+            }
+
     def to_representation(self, instance):
-        count = self.context["request"].query_params.get("count")
+        query_params = self.context["request"].query_params
+        count = query_params.get("count")
         currency = getattr(
             instance.pricing_settings, "currency", choices.Currencies.USD.pretty_name
         )
@@ -444,34 +516,23 @@ class AvailabilityCalendarSerializer(serializers.BaseSerializer):
         start = date.today()
         end = start + timedelta(days=int(count))
 
-        rates = models.Rate.rate_per_day(start, end, instance.id)
-        availability = models.Availability.availability_per_day(start, end, instance.id)
-
-        ipa = services.IsPropertyAvailable(instance, start, end)
-        ipa.run_check()
-
-        blocked_days = []
-        for b in ipa.blocked_days:
-            blocked_days += [day for day in date_range(b.get("start_date"), b.get("end_date"))]
-
-        calendar = []
-        for d in date_range(start, end):
-            # If property does not have rates is unavailable
-            available = True
-            if rates[d]:
-                price = rates[d].nightly
-                priceFormatted = "{0}{1}".format(choices.Currencies[currency].symbol, price)
-            else:
-                price, priceFormatted, available = None, None, False
-            min_nights = availability[d].min_stay if availability.get(d) else None
-            calendar.append(
-                {
-                    "date": d,
-                    "available": available and d not in blocked_days,
-                    "min_nights": min_nights,
-                    "price": price,
-                    "price_formatted": priceFormatted,
-                }
-            )
-
+        segments = self.get_segments(instance, start, end, currency)
+        if query_params.get("_format") == self.RANGES_FORMAT:
+            runs = []
+            for segment_start, segment_end, values in segments:
+                if runs and runs[-1][2] == values:
+                    runs[-1][1] = segment_end
+                else:
+                    runs.append([segment_start, segment_end, values])
+            ranges = [
+                {"start_date": run_start, "end_date": run_end - timedelta(days=1), **values}
+                for run_start, run_end, values in runs
+            ]
+            return OrderedDict([("count", count), ("currency", currency), ("ranges", ranges)])
+
+        calendar = [
+            {"date": d, **values}
+            for segment_start, segment_end, values in segments
+            for d in date_range(segment_start, segment_end)
+        ]
         return OrderedDict([("count", count), ("currency", currency), ("calendar", calendar)])
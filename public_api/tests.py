@@ -1144,3 +1144,25 @@ class ApiEndPointsTestCase(TestCase):
 
             resp_json = resp.json()
             self.assertEqual(len(resp_json["calendar"]), 180)
+
+        with self.subTest("Ranges format"):
+            resp = self.api_client.get(
+                "/api/v1/properties/{prop_id}/availability_calendar/".format(prop_id=self.prop.id),
+                {"count": 3, "_format": "ranges"},
+            )
+
+            self.assertEqual(resp.status_code, 200)
+            today = date.today()
+            self.assertListEqual(
+                resp.json()["ranges"],
+                [
+                    {
+                        "available": True,
+                        "startDate": str(today),
+                        "endDate": str(today + timedelta(days=2)),
+                        "minNights": MIN_NIGHTS,
+                        "price": NIGHTLY_PRICE,
+                        "priceFormatted": NIGHTLY_PRICE_STR,
+                    }
+                ],
+            )
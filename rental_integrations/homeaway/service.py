@@ -6,10 +6,10 @@ import hashlib
 import logging
 import os
 import uuid
-from collections import OrderedDict
 from datetime import datetime, timedelta
 from itertools import chain
 
+from django.core.cache import cache
 from rest_framework import status
 
 from cozmo_common.functions import deep_get
@@ -100,6 +100,7 @@ def to_cozmo_property(listing) -> dict:
 
 class HomeAwayService(BaseService):
     logger = logging.getLogger(__name__)
+    calendar_snapshot_timeout = 7 * 24 * 60 * 60
 
     def __init__(self, *args, **kwargs):
         self._user_id = kwargs.pop("user_id", None)
@@ -397,86 +398,60 @@ class HomeAwayService(BaseService):
             return [to_cozmo_property(each) for each in listings], listings
         raise ServiceException(data.get("error_message", ""), **data)
 
-    def calendar_days(self, listings, start_date, end_date):
+    def _calendar_cache_key(self, listing_id):
+        return "homeaway:calendar_days:{}:{}".format(self._username, listing_id)
+
+    def calendar_days(self, listing_id, days):
         """
-        Get the calendar days from given listings between start_date and
-        end_date. Returns a ordered dict with busy days, like:
+        Send calendar days of a listing which changed since the last accepted update.
+
+        `days` maps dates to day data, like:
 
         {
-          UID: [
-            {
-              "day": datetime.date(2016, 4, 7),
-              "start_date": datetime.date(2016, 4, 1)
-              "end_date": datetime.date(2016, 4, 10)
-              "guest": {
-                "email": "felipe-blahblaheds3wd2sd@service.com",
-                "id": "felipe-blahblaheds3wd2sd@service.com",
-                "name": "Felipe Prenholato"
-              }
-              "description" "some usefull text",
-              "confirmation_code": "T4YSF9"
-
-            },
-            ...
-          ],
+          datetime.date(2016, 4, 7): {"available": False},
+          datetime.date(2016, 4, 8): {"available": True, "price": 120},
           ...
         }
 
-        The dict is ordered by UID, and then by date.
-        The UID is created by Service.generate_uid()
+        Days are compared with a cached snapshot of the last days accepted by HomeAway and
+        consecutive changed days with equal data are sent as a single range. Returns sent
+        ranges.
         """
-        path = "v2/calendar_days"
-        _requests = []
-        for _id in listings:
-            _requests.append(
-                {
-                    "method": "GET",
-                    "path": path,
-                    "query": {
-                        "listing_id": _id,
-                        "start_date": datetime.strptime(start_date, "%Y-%m-%d"),
-                        "end_date": datetime.strptime(end_date, "%Y-%m-%d"),
-                        "_format": "host_calendar_detailed",
-                    },
-                }
-            )
-        data = OrderedDict()
-        operations = self._batch(*_requests)
-        for resp in operations["operations"]:
-            days = resp["response"]["calendar_days"]
-            _id = resp["query"]["listing_id"]
-            reservations = {}
-            for day in days:
-                if day["available"]:
-                    continue
-                info = {
-                    "day": datetime.strptime(day["date"], "%Y-%m-%d").date(),
-                    "start_date": datetime.strptime(
-                        day["reservation"]["start_date"], "%Y-%m-%d"
-                    ).date(),
-                    "guest": {
-                        "email": "",
-                        "id": day["reservation"]["guest"]["id"],
-                        "name": day["reservation"]["guest"]["full_name"],
-                    },
-                    "description": "",
-                    "confirmation_code": day["reservation"]["confirmation_code"],
-                    "uid": self.generate_uid(_id, day),
-                    "listing_id": _id,
-                }
-                # calculate start and end_date
-                if day["group_id"] not in reservations:
-                    nights = day["reservation"]["nights"]
-                    reservations[day["group_id"]] = {
-                        "start_date": info["start_date"],
-                        "end_date": info["start_date"] + timedelta(days=nights),
-                    }
-                info.update(reservations[day["group_id"]])
-                if info["day"] not in data:
-                    data[info["day"]] = OrderedDict()
-                data[info["day"]][info[" uid"]] = info
-
-        return data
+        key = self._calendar_cache_key(listing_id)
+        snapshot = cache.get(key) or {}
+        current = {day.isoformat(): data for day, data in days.items()}
+        changed = sorted(day for day, data in current.items() if snapshot.get(day) != data)
+
+        ranges = []
+        for day in changed:
+            date = datetime.strptime(day, "%Y-%m-%d").date()
+            last = ranges[-1] if ranges else None
+            if (
+                last is not None
+                and last["end_date"] + timedelta(days=1) == date
+                and last["data"] == current[day]
+            ):
+                last["end_date"] = date
+            else:
+                ranges.append({"start_date": date, "end_date": date, "data": current[day]})
+        if not ranges:
+            return []
+
+        calendar_days = [
+            {"start_date": str(r["start_date"]), "end_date": str(r["end_date"]), **r["data"]}
+            for r in ranges
+        ]
+        resp = self._put(
+            "v2/calendar_days", json={"listing_id": listing_id, "calendar_days": calendar_days}
+        )
+        if not resp.ok:
+            raise ServiceException("Calendar days update failed", status=resp.status_code)
+
+        today = datetime.now().date().isoformat()
+        snapshot.update((day, current[day]) for day in changed)
+        snapshot = {day: data for day, data in snapshot.items() if day >= today}
+        cache.set(key, snapshot, self.calendar_snapshot_timeout)
+        return calendar_days
 
     def generate_uid(self, listing_id, data):
         s = "{}-{}".format(listing_id, data["group_id"].split(":")[1])
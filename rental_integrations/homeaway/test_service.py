@@ -0,0 +1,96 @@
+from datetime import date, timedelta
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from rental_integrations.exceptions import ServiceException
+from .service import HomeAwayService
+
+
+class HomeAwayCalendarDaysTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.service = HomeAwayService(username="username", password="password")
+
+    @patch("rental_integrations.homeaway.service.HomeAwayService._put")
+    def test_calendar_days(self, m_put):
+        listing_id = "321.1.1"
+        cache.delete(self.service._calendar_cache_key(listing_id))
+        start = date.today()
+        days = {start + timedelta(days=i): {"available": True} for i in range(10)}
+        m_put.return_value = MagicMock(ok=True)
+
+        sent = self.service.calendar_days(listing_id, days)
+        self.assertEqual(
+            sent,
+            [
+                {
+                    "start_date": str(start),
+                    "end_date": str(start + timedelta(days=9)),
+                    "available": True,
+                }
+            ],
+        )
+
+        with self.subTest(msg="Only changed days are sent"):
+            m_put.reset_mock()
+            days[start + timedelta(days=3)] = {"available": False}
+            days[start + timedelta(days=4)] = {"available": False}
+            days[start + timedelta(days=7)] = {"available": True, "price": 100}
+            sent = self.service.calendar_days(listing_id, days)
+            self.assertEqual(
+                sent,
+                [
+                    {
+                        "start_date": str(start + timedelta(days=3)),
+                        "end_date": str(start + timedelta(days=4)),
+                        "available": False,
+                    },
+                    {
+                        "start_date": str(start + timedelta(days=7)),
+                        "end_date": str(start + timedelta(days=7)),
+                        "available": True,
+                        "price": 100,
+                    },
+                ],
+            )
+            m_put.assert_called_once_with(
+                "v2/calendar_days", json={"listing_id": listing_id, "calendar_days": sent}
+            )
+
+        with self.subTest(msg="Nothing changed"):
+            m_put.reset_mock()
+            self.assertEqual(self.service.calendar_days(listing_id, days), [])
+            m_put.assert_not_called()
+
+        with self.subTest(msg="Rejected days are sent again"):
+            days[start] = {"available": False}
+            m_put.return_value = MagicMock(ok=False, status_code=400)
+            with self.assertRaises(ServiceException):
+                self.service.calendar_days(listing_id, days)
+            m_put.return_value = MagicMock(ok=True)
+            self.assertEqual(len(self.service.calendar_days(listing_id, days)), 1)
+
+    @patch(
+        "rental_integrations.homeaway.service.HomeAwayService.authenticate",
+        return_value={"success": True, "data": {"access_token": "token"}},
+    )
+    @patch("rental_integrations.homeaway.service.HomeAwayService._make_request")
+    def test_calendar_days_after_authentication(self, m_request, m_authenticate):
+        listing_id = "321.1.2"
+        self.service._access_token = None
+        cache.delete(self.service._calendar_cache_key(listing_id))
+        m_request.side_effect = [
+            MagicMock(ok=False, status_code=401, url="https://example.org/v2/calendar_days"),
+            MagicMock(ok=True, status_code=200),
+        ]
+
+        sent = self.service.calendar_days(listing_id, {date.today(): {"available": False}})
+
+        self.assertEqual(m_request.call_count, 2)
+        first, retry = m_request.call_args_list
+        expected = {"listing_id": listing_id, "calendar_days": sent}
+        self.assertEqual(first[1]["json"], expected)
+        self.assertEqual(retry[1]["json"], expected)
+        self.assertEqual(retry[1]["headers"]["X-HOMEAWAY-THIN-UI-HA-SESSION"], "token")
@@ -1,5 +1,6 @@
 import abc
 import logging
+from http.cookiejar import DefaultCookiePolicy
 from inspect import getargspec
 from typing import Dict, List, Optional, Tuple, TypeVar, Union
 
@@ -22,6 +23,19 @@ Response = Tuple[HttpStatus, Payload]
 HTTP_499_NOT_MY_FAULT = 499
 
 
+def _pooled_transport(pool_size=10):
+    session = requests.Session()
+    # Responses of different accounts must never share cookies
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+transport = _pooled_transport()
+
+
 class RentalAPIClient(metaclass=abc.ABCMeta):
 
     _http_methods = ("get", "post", "patch", "put", "delete", "options")
@@ -50,7 +64,7 @@ class RentalAPIClient(metaclass=abc.ABCMeta):
 
         logger.debug(f"method: {http_method}, data: {data}")
         try:
-            resp = requests.request(
+            resp = transport.request(
                 http_method, url, data=data, headers=headers, auth=auth, timeout=self.timeout
             )
             resp.raise_for_status()
@@ -153,7 +167,7 @@ class BaseService:
             raise ValueError("Unsupported method {}".format({}))
 
         try:
-            resp = requests.request(method, url, data=data, timeout=self.timeout, **kwargs)
+            resp = transport.request(method, url, data=data, timeout=self.timeout, **kwargs)
         except requests.RequestException as e:
             logger.exception("Error handling request %s", url)
             resp = requests.Response()
@@ -195,8 +209,8 @@ class BaseService:
             "path_kwargs": path_kwargs,
             "headers": headers,
             "params": params,
+            **kwargs,
         }
-        original_kwargs.update(original_kwargs)
         # parse arguments
         url = self.format_path(path, path_kwargs)
         logger.debug("%s request with %s at %s" % (method, data, url))
@@ -169,7 +169,7 @@ class RentalAPIClientTestCase(TestCase):
     def test_get_headers(self):
         self.assertDictEqual(RentalAPIClient.get_headers(self, context={}), {})
 
-    @mock.patch("rental_integrations.service.requests.request")
+    @mock.patch("rental_integrations.service.transport.request")
     def test_call_api(self, m_request):
         auth = None
         data = b""
@@ -0,0 +1,21 @@
+# Generated by Django 2.0.9 on 2019-10-31 00:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("trip_advisor", "0001_initial")]
+
+    operations = [
+        migrations.AddField(
+            model_name="tripadvisorsync",
+            name="fingerprint",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.AddField(
+            model_name="tripadvisorsync",
+            name="partial_fingerprint",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+    ]
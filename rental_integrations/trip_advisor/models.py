@@ -126,6 +126,8 @@ class TripAdvisorSync(ChannelSync):
     prop = models.ForeignKey(
         Property, on_delete=models.CASCADE, related_name="tripadvisor_sync", null=True
     )
+    fingerprint = models.CharField(max_length=64, blank=True, default="")
+    partial_fingerprint = models.CharField(max_length=64, blank=True, default="")
     name = "TripAdvisor"
 
     def get_info(self):
@@ -10,15 +10,23 @@ from itertools import chain
 from urllib.parse import urljoin, urlparse
 
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 from requests.auth import AuthBase
 from rest_framework import status
 
 from cozmo_common.functions import deep_get
 from listings.choices import CalculationMethod
-from listings.models import Property, Room
+from listings.models import (
+    AdditionalFee,
+    AvailabilitySettings,
+    PricingSettings,
+    Property,
+    Rate,
+    Room,
+)
 from listings.serializers import PropertySerializer, ReservationSerializer
-from listings.services import IsPropertyAvailable
+from listings.services import IsPropertyAvailable, PropertyConstraints
 from rental_integrations.service import RentalAPIClient
 from rental_integrations.tools import strip_falsy
 from rental_integrations.trip_advisor.mappings import (
@@ -100,13 +108,13 @@ class TripAdvisorClient(RentalAPIClient):
         listing_url = urljoin(self.netloc, f"{self._user}/{id}")
         return self._call_api(listing_url, "", "delete")
 
-    def push_listing(self, prop, partial=False):
+    def push_listing(self, prop, partial=False, listing=None):
         url = urljoin(self.netloc, self._user)
         listing_path = f"{self._user}/{prop.id}"
         listing_url = urljoin(url, listing_path)
-        if partial:
+        if listing is None and partial:
             listing = TripParser.from_cozmo_partial(prop)
-        else:
+        elif listing is None:
             listing = TripParser.from_cozmo(prop)
         # They are returning some validation error list
         status_code, data = self._call_api(url=listing_url, data=listing, http_method="put")
@@ -190,6 +198,8 @@ class TripParser:
         ("smoking", "SMOKING"),
         ("pets", "PETS"),
     )
+    # Keys of `from_cozmo_partial` payload, the full payload contains them as well
+    partial_fields = ("active", "calendar", "fees", "rates")
 
     @classmethod
     def to_cozmo(cls, data) -> dict:
@@ -269,47 +279,44 @@ class TripParser:
     @staticmethod
     def _get_rates(prop):
         try:
-            default_rate = prop.pricing_settings.nightly
-        except AttributeError:
+            default_rate = prop.pricing_settings
+        except PricingSettings.DoesNotExist:
             raise ValueError("Missing default rate")
 
+        deposit = default_rate.security_deposit or 0
         try:
-            deposit = prop.pricing_settings.security_deposit
-        except AttributeError:
-            deposit = 0
+            min_stay = max(prop.availability_settings.min_stay, 1)
+        except AvailabilitySettings.DoesNotExist:
+            min_stay = 1
+
+        if hasattr(prop, "seasonal_rates_included"):
+            seasonal_rates = prop.seasonal_rates_included
+        else:
+            seasonal_rates = prop.rate_set.exclude(time_frame=(None, None)).exclude(seasonal=False)
+
+        def rate_data(rate):
+            return {
+                "nightlyRate": int(rate.nightly),
+                "weekendRate": int(rate.weekend or rate.nightly),
+                "weeklyRate": int(rate.weekly),
+                "monthlyRate": int(rate.monthly),
+                "minimumStay": min_stay,
+                "additionalGuestFeeThreshold": prop.max_guests,
+                "additionalGuestFeeAmount": int(rate.extra_person_fee or 0),
+                "changeoverDay": "FLEXIBLE",  # Not supported in Cozmo
+            }
 
         return {
             "rates": {
-                "defaultRate": {
-                    "nightlyRate": int(default_rate.nightly),
-                    "weekendRate": int(default_rate.weekend),
-                    "weeklyRate": int(default_rate.weekly),
-                    "monthlyRate": int(default_rate.monthly),
-                    "minimumStay": int(default_rate.min_stay if default_rate.min_stay < 0 else 1),
-                    "additionalGuestFeeThreshold": prop.max_guests,
-                    "additionalGuestFeeAmount": int(default_rate.extra_person),
-                    "changeoverDay": "FLEXIBLE",  # Not supported in Cozmo
-                },
+                "defaultRate": rate_data(default_rate),
                 "seasonalRates": [
                     {
                         "name": "Cozmo rate {}".format(i),
-                        "nightlyRate": int(rate.nightly),
-                        "weekendRate": int(rate.weekend),
-                        "weeklyRate": int(rate.weekly),
-                        "monthlyRate": int(rate.monthly),
-                        "minimumStay": int(
-                            default_rate.min_stay if default_rate.min_stay < 0 else 1
-                        ),
-                        "additionalGuestFeeThreshold": prop.max_guests,
-                        "additionalGuestFeeAmount": int(rate.extra_person),
-                        "changeoverDay": "FLEXIBLE",  # Not supported in Cozmo
+                        **rate_data(rate),
                         "startDate": str(rate.time_frame.lower),
                         "endDate": str(rate.time_frame.upper),
                     }
-                    for i, rate in enumerate(
-                        prop.rate_set.exclude(time_frame=(None, None)).exclude(seasonal=False),
-                        start=1,
-                    )
+                    for i, rate in enumerate(seasonal_rates, start=1)
                 ],
                 "weekendType": "SATURDAY_SUNDAY",  # Not supported in Cozmo
                 "damageDeposit": str(deposit),  # TODO Might be percentage
@@ -319,15 +326,21 @@ class TripParser:
 
     @staticmethod
     def _get_fees(prop):
-        queryset = prop.additionalfee_set.filter(
-            calculation_method=CalculationMethod.Per_Stay.value, optional=False, refundable=False
-        )
-        return {"fees": [{"name": fee.name, "amount": str(fee.value)} for fee in queryset]}
+        if hasattr(prop, "fees_included"):
+            fees = prop.fees_included
+        else:
+            fees = prop.additionalfee_set.filter(**TripAdvisorFeedLoader.fee_filter)
+        return {"fees": [{"name": fee.name, "amount": str(fee.value)} for fee in fees]}
 
     @staticmethod
     def _get_blocked_days(prop):
         today = date.today()
-        ipa = IsPropertyAvailable(prop, today, today + timedelta(days=360))
+        ipa = IsPropertyAvailable(
+            prop,
+            today,
+            today + timedelta(days=TripAdvisorFeedLoader.horizon),
+            constraints=getattr(prop, "constraints_included", None),
+        )
         ipa.run_check()
 
         return {
@@ -461,3 +474,63 @@ class TripParser:
             **cls._get_fees(prop),
             **cls._get_rates(prop),
         }
+
+
+class TripAdvisorFeedLoader:
+    """
+    Load data of TripAdvisor payloads for many properties at once.
+
+    Seasonal rates, fees and availability constraints of all given properties are fetched
+    with one query each and stored on the properties as `seasonal_rates_included`,
+    `fees_included` and `constraints_included`, as expected by `TripParser`.
+    """
+
+    horizon = 360
+    fee_filter = {
+        "calculation_method": CalculationMethod.Per_Stay.value,
+        "optional": False,
+        "refundable": False,
+    }
+
+    def get_properties(self, ids):
+        return Property.objects.filter(id__in=ids).select_related(
+            "availability_settings", "booking_settings", "pricing_settings"
+        )
+
+    def get_seasonal_rates(self, prop_ids):
+        return (
+            Rate.default_manager.filter(prop_id__in=prop_ids, seasonal=True)
+            .exclude(time_frame=(None, None))
+            .order_by("prop_id", "pk")
+        )
+
+    def get_fees(self, prop_ids):
+        return AdditionalFee.default_manager.filter(
+            prop_id__in=prop_ids, **self.fee_filter
+        ).order_by("prop_id", "pk")
+
+    def load(self, properties):
+        properties = list(properties)
+        prop_ids = [prop.pk for prop in properties]
+        rates = defaultdict(list)
+        for rate in self.get_seasonal_rates(prop_ids):
+            rates[rate.prop_id].append(rate)
+        fees = defaultdict(list)
+        for fee in self.get_fees(prop_ids):
+            fees[fee.prop_id].append(fee)
+
+        today = date.today()
+        constraints = PropertyConstraints.load_many(
+            properties, today, today + timedelta(days=self.horizon)
+        )
+        for prop in properties:
+            prop.seasonal_rates_included = rates[prop.pk]
+            prop.fees_included = fees[prop.pk]
+            prop.constraints_included = constraints[prop.pk]
+        return properties
+
+
+def fingerprint(listing: dict) -> str:
+    """Return a digest of listing payload used to skip pushing unchanged content."""
+    content = json.dumps(listing, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(content.encode()).hexdigest()
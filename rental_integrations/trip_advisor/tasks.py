@@ -4,12 +4,17 @@ from logging import getLogger
 from celery import group
 from celery.task import periodic_task, task
 from django.conf import settings
-from django.db.models import Q
+from django.db.models import Prefetch, Q
 
 from accounts.profile.models import PlanSettings
 from listings.models import Property
 from rental_integrations.trip_advisor.models import TripAdvisorSync
-from rental_integrations.trip_advisor.service import TripAdvisorClient
+from rental_integrations.trip_advisor.service import (
+    TripAdvisorClient,
+    TripAdvisorFeedLoader,
+    TripParser,
+    fingerprint,
+)
 
 logger = getLogger(__name__)
 
@@ -24,11 +29,11 @@ def get_jobs(partial=False):
             (
                 (
                     Q(
-                        tripadvisor__sync_enabled=True,
-                        tripadvisor__last_sync__lte=now - timedelta(hours=12),
+                        tripadvisor_sync__sync_enabled=True,
+                        tripadvisor_sync__last_sync__lte=now - timedelta(hours=12),
                     )
                 )
-                | Q(tripadvisor=None)
+                | Q(tripadvisor_sync=None)
             ),
         ).values_list("id", flat=True)
         jobs.append(update_or_create_listings.s(property_ids, partial))
@@ -51,25 +56,59 @@ def update_listings():
 
 @task
 def update_or_create_listings(ids, partial=False):
+    """
+    Push listings of given properties to TripAdvisor.
+
+    Payload data is prefetched for all properties at once and properties whose payload
+    did not change since the last successful push are skipped.
+    """
     client = TripAdvisorClient(settings.TRIPADVISOR_CLIENT_ID, settings.TRIPADVISOR_SECRET_KEY)
     now = datetime.now()
-    properties = Property.objects.filter(id__in=ids)
+    loader = TripAdvisorFeedLoader()
+    properties = loader.load(
+        loader.get_properties(ids).prefetch_related(
+            Prefetch("tripadvisor_sync", queryset=TripAdvisorSync.objects.order_by("-pk"))
+        )
+    )
+    unchanged = []
     for prop in properties:
-        status = None
-
+        sync = next(iter(prop.tripadvisor_sync.all()), None)
         try:
-            status, _ = client.push_listing(prop, partial)
+            if partial:
+                listing = partial_listing = TripParser.from_cozmo_partial(prop)
+            else:
+                listing = TripParser.from_cozmo(prop)
+                partial_listing = {key: listing[key] for key in TripParser.partial_fields}
         except ValueError as e:
-            logger.warning("Could not Sync property id: %s, exception: ", prop.id, e)
+            logger.warning("Could not Sync property id: %s, exception: %s", prop.id, e)
+            continue
+
+        digest = fingerprint(listing)
+        previous = None
+        if sync is not None:
+            previous = sync.partial_fingerprint if partial else sync.fingerprint
+        if digest == previous:
+            unchanged.append(sync.pk)
+            continue
+
+        status, _ = client.push_listing(prop, partial, listing=listing)
 
         if status == 200:
-            if hasattr(prop, "tripadvisor"):
-                prop.tripadvisor.last_sync = now
-                prop.tripadvisor.save()
+            fingerprints = {"partial_fingerprint": fingerprint(partial_listing)}
+            if not partial:
+                fingerprints["fingerprint"] = digest
+            if sync is not None:
+                TripAdvisorSync.objects.filter(pk=sync.pk).update(last_sync=now, **fingerprints)
             else:
                 TripAdvisorSync.objects.create(
-                    prop=prop, organization=prop.organization, last_sync=now, sync_enabled=True
+                    prop=prop,
+                    organization=prop.organization,
+                    last_sync=now,
+                    sync_enabled=True,
+                    **fingerprints
                 )
             logger.info("Property synced id: %s", prop.id)
         else:
             logger.warning("Could not Sync property id: %s", prop.id)
+
+    TripAdvisorSync.objects.filter(pk__in=unchanged).update(last_sync=now)
@@ -0,0 +1,156 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+from psycopg2.extras import DateRange
+
+from accounts.models import Organization
+from listings.models import AvailabilitySettings, PricingSettings, Property, Rate
+from .models import TripAdvisorSync
+from .service import TripAdvisorFeedLoader, TripParser, fingerprint
+from .tasks import update_or_create_listings
+
+
+class TripAdvisorTestMixin:
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create()
+        cls.prop = Property.objects.create(
+            name="Name",
+            property_type=Property.Types.Apartment.value,
+            rental_type=Property.Rentals.Private.value,
+            status=Property.Statuses.Active.value,
+            max_guests=4,
+            organization=cls.organization,
+        )
+        cls.pricing_settings = PricingSettings.objects.create(
+            prop=cls.prop,
+            nightly=Decimal("100"),
+            weekly=Decimal("600"),
+            extra_person_fee=Decimal("15"),
+            security_deposit=Decimal("200"),
+        )
+        AvailabilitySettings.objects.create(prop=cls.prop, min_stay=3)
+        start = date.today() + timedelta(days=10)
+        cls.rate = Rate.objects.create(
+            prop=cls.prop,
+            seasonal=True,
+            time_frame=DateRange(start, start + timedelta(days=7)),
+            nightly=Decimal("150"),
+            weekend=Decimal("180"),
+        )
+        Rate.objects.create(
+            prop=cls.prop,
+            seasonal=False,
+            time_frame=DateRange(start, start + timedelta(days=30)),
+            nightly=Decimal("90"),
+        )
+
+    def _load(self):
+        loader = TripAdvisorFeedLoader()
+        return loader.load(loader.get_properties([self.prop.pk]))[0]
+
+
+class TripParserRatesTestCase(TripAdvisorTestMixin, TestCase):
+    def test_get_rates(self):
+        expected = {
+            "rates": {
+                "defaultRate": {
+                    "nightlyRate": 100,
+                    "weekendRate": 100,
+                    "weeklyRate": 600,
+                    "monthlyRate": 0,
+                    "minimumStay": 3,
+                    "additionalGuestFeeThreshold": 4,
+                    "additionalGuestFeeAmount": 15,
+                    "changeoverDay": "FLEXIBLE",
+                },
+                "seasonalRates": [
+                    {
+                        "name": "Cozmo rate 1",
+                        "nightlyRate": 150,
+                        "weekendRate": 180,
+                        "weeklyRate": 0,
+                        "monthlyRate": 0,
+                        "minimumStay": 3,
+                        "additionalGuestFeeThreshold": 4,
+                        "additionalGuestFeeAmount": 0,
+                        "changeoverDay": "FLEXIBLE",
+                        "startDate": str(self.rate.time_frame.lower),
+                        "endDate": str(self.rate.time_frame.upper),
+                    }
+                ],
+                "weekendType": "SATURDAY_SUNDAY",
+                "damageDeposit": "200.00",
+                "taxPercentage": "1",
+            }
+        }
+
+        with self.subTest(msg="Property without prefetched data"):
+            prop = Property.objects.get(pk=self.prop.pk)
+            self.assertEqual(TripParser._get_rates(prop), expected)
+
+        with self.subTest(msg="Property loaded in batch"):
+            prop = self._load()
+            with self.assertNumQueries(0):
+                self.assertEqual(TripParser._get_rates(prop), expected)
+
+    def test_get_rates_missing_default_rate(self):
+        PricingSettings.objects.filter(prop=self.prop).delete()
+        with self.assertRaises(ValueError):
+            TripParser._get_rates(self._load())
+
+
+@mock.patch("rental_integrations.trip_advisor.tasks.TripAdvisorClient")
+class UpdateOrCreateListingsTestCase(TripAdvisorTestMixin, TestCase):
+    def _push(self, m_client, partial):
+        push_listing = m_client.return_value.push_listing
+        push_listing.reset_mock()
+        push_listing.return_value = (200, {})
+        update_or_create_listings.s([self.prop.pk], partial).apply()
+        return push_listing
+
+    def test_unchanged_listing_skipped(self, m_client):
+        push_listing = self._push(m_client, True)
+        push_listing.assert_called_once()
+        sync = TripAdvisorSync.objects.get(prop=self.prop)
+        self.assertEqual(
+            sync.partial_fingerprint, fingerprint(push_listing.call_args[1]["listing"])
+        )
+
+        TripAdvisorSync.objects.filter(pk=sync.pk).update(last_sync=None)
+        push_listing = self._push(m_client, True)
+        push_listing.assert_not_called()
+        self.assertIsNotNone(TripAdvisorSync.objects.get(pk=sync.pk).last_sync)
+
+    def test_changed_listing_pushed(self, m_client):
+        self._push(m_client, True)
+
+        PricingSettings.objects.filter(pk=self.pricing_settings.pk).update(nightly=Decimal("120"))
+        push_listing = self._push(m_client, True)
+
+        push_listing.assert_called_once()
+        listing = push_listing.call_args[1]["listing"]
+        self.assertEqual(listing["rates"]["defaultRate"]["nightlyRate"], 120)
+        self.assertEqual(
+            TripAdvisorSync.objects.get(prop=self.prop).partial_fingerprint, fingerprint(listing)
+        )
+
+    def test_full_push(self, m_client):
+        partial_listing = TripParser.from_cozmo_partial(self._load())
+        full_listing = {"photos": [], **partial_listing}
+
+        with mock.patch.object(
+            TripParser, "from_cozmo", return_value=full_listing
+        ), mock.patch.object(TripParser, "from_cozmo_partial") as m_partial:
+            push_listing = self._push(m_client, False)
+            push_listing.assert_called_once()
+            m_partial.assert_not_called()
+
+        sync = TripAdvisorSync.objects.get(prop=self.prop)
+        self.assertEqual(sync.fingerprint, fingerprint(full_listing))
+        self.assertEqual(sync.partial_fingerprint, fingerprint(partial_listing))
+
+        with self.subTest(msg="Partial push of content sent by the full push is skipped"):
+            self._push(m_client, True).assert_not_called()
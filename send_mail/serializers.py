@@ -38,6 +38,7 @@ from send_mail.choices import DeliveryStatus, MessageType, NexmoMessageType
 from send_mail.models import Conversation, EmailMessage, ForwardingEmail, Message, ParseEmailTask
 from send_mail.phone.models import Number
 from vendors.models import Job
+from vendors.services import transition_job
 from . import models
 
 logger = logging.getLogger(__name__)
@@ -360,21 +361,21 @@ class NexmoWebhookSerializer(serializers.Serializer):
         phone = validated_data["msisdn"]
         job = Job.objects.filter(assignee__user__phone=phone).last()
         if "yes" in validated_data["text"].lower():
-            job.status = Job.Statuses.Accepted.value
+            status = Job.Statuses.Accepted.value
         elif "checkin" in validated_data["text"].lower():
-            job.status = Job.Statuses.In_Progress.value
+            status = Job.Statuses.In_Progress.value
         elif "finish" in validated_data["text"].lower():
-            job.status = Job.Statuses.Completed.value
+            status = Job.Statuses.Completed.value
         elif "pause" in validated_data["text"].lower():
-            job.status = Job.Statuses.Paused.value
+            status = Job.Statuses.Paused.value
         elif "cancel" in validated_data["text"].lower():
-            job.status = Job.Statuses.Cancelled.value
+            status = Job.Statuses.Cancelled.value
         elif "decline" in validated_data["text"].lower():
-            job.status = Job.Statuses.Declined.value
+            status = Job.Statuses.Declined.value
         else:
-            job.status = Job.Statuses.Incomplete.value
+            status = Job.Statuses.Incomplete.value
 
-        job.save(update_fields=["status"])
+        transition_job(job, status)
 
         # reservation = Reservation.objects.filter(
         #     guest__phone=phone).order_by("date_updated").last()
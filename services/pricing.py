@@ -1,6 +1,9 @@
 import logging
 from datetime import date, datetime
 
+from django.conf import settings
+from django.utils.module_loading import import_string
+
 logger = logging.getLogger(__name__)
 
 PRICES = {
@@ -172,6 +175,16 @@ PRICES = {
 }
 
 
+def get_price_source(prop):
+    """
+    Return the price source configured by `SMART_PRICING_SOURCE` for a property.
+
+    A price source is created with a property and provides `get_prices(dates)`.
+    """
+    source_class = getattr(settings, "SMART_PRICING_SOURCE", "services.pricing.PricingService")
+    return import_string(source_class)(prop)
+
+
 class PricingService:
     """
     Pricing factors
@@ -207,3 +220,7 @@ class PricingService:
         else:
             # raise Exception("Price not found")
             return 100
+
+    def get_prices(self, dates):
+        """Return prices mapped on given dates."""
+        return {d: self.get_price(d) for d in dates}
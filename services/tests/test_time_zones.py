@@ -0,0 +1,51 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from services.errors import ServiceError
+from services.time_zones import TimeZoneResolver
+
+LAT = Decimal("32.012343")
+LNG = Decimal("-121.034433")
+
+
+@mock.patch("services.time_zones.GoogleService")
+@mock.patch("services.time_zones._timezone_finder")
+class TimeZoneResolverTest(TestCase):
+    def setUp(self):
+        self.key = TimeZoneResolver()._cache_key(float(LAT), float(LNG))
+        cache.delete(self.key)
+
+    def test_resolve_offline(self, m_finder, m_google):
+        m_finder.return_value.timezone_at.return_value = "America/Los_Angeles"
+
+        self.assertEqual(TimeZoneResolver().resolve(LAT, LNG), "America/Los_Angeles")
+        m_finder.return_value.timezone_at.assert_called_once_with(lat=float(LAT), lng=float(LNG))
+        m_google.assert_not_called()
+
+        with self.subTest("Nearby coordinates are served from cache"):
+            m_finder.reset_mock()
+            resolved = TimeZoneResolver().resolve(LAT + Decimal("0.0001"), LNG)
+            self.assertEqual(resolved, "America/Los_Angeles")
+            m_finder.return_value.timezone_at.assert_not_called()
+
+    def test_resolve_remote(self, m_finder, m_google):
+        m_finder.return_value.timezone_at.return_value = None
+        m_google.return_value.get_timezone.return_value = "Pacific/Honolulu"
+
+        resolver = TimeZoneResolver()
+        self.assertEqual(resolver.resolve(LAT, LNG), "Pacific/Honolulu")
+        self.assertEqual(resolver.resolve(LAT, LNG), "Pacific/Honolulu")
+        m_google.return_value.get_timezone.assert_called_once_with(float(LAT), float(LNG))
+
+        with self.subTest("No time zone found"):
+            cache.delete(self.key)
+            m_google.return_value.get_timezone.side_effect = ServiceError
+            self.assertIsNone(TimeZoneResolver().resolve(LAT, LNG))
+
+    def test_resolve_missing_coordinates(self, m_finder, m_google):
+        self.assertIsNone(TimeZoneResolver().resolve(None, LNG))
+        m_finder.assert_not_called()
+        m_google.assert_not_called()
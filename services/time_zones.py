@@ -0,0 +1,88 @@
+import logging
+from functools import lru_cache
+
+import googlemaps
+from django.core.cache import cache
+from timezonefinder import TimezoneFinder
+
+from services.errors import ServiceError
+from services.google import GoogleService
+
+logger = logging.getLogger(__name__)
+
+CACHE_TIMEOUT = 30 * 24 * 60 * 60
+COORDINATES_PRECISION = 2
+
+
+@lru_cache(maxsize=None)
+def _timezone_finder():
+    return TimezoneFinder()
+
+
+class TimeZoneResolver:
+    """
+    Resolve time zone ids of coordinates.
+
+    Coordinates are looked up in the bundled timezone-boundary dataset first, the Google
+    Timezone API is only called for coordinates the dataset does not cover. Results are
+    cached by coordinates rounded to `COORDINATES_PRECISION` decimal places.
+    """
+
+    def __init__(self):
+        self._remote = None
+        self._resolved = {}
+
+    @property
+    def remote(self):
+        if self._remote is None:
+            self._remote = GoogleService()
+        return self._remote
+
+    def _cache_key(self, latitude, longitude):
+        return "time-zone:{:.{p}f}:{:.{p}f}".format(
+            latitude, longitude, p=COORDINATES_PRECISION
+        )
+
+    def _resolve_offline(self, latitude, longitude):
+        try:
+            return _timezone_finder().timezone_at(lat=latitude, lng=longitude)
+        except ValueError:
+            return None
+
+    def _resolve_remote(self, latitude, longitude):
+        try:
+            return self.remote.get_timezone(latitude, longitude)
+        except ServiceError:
+            return None
+        except (
+            googlemaps.exceptions.ApiError,
+            googlemaps.exceptions.TransportError,
+            googlemaps.exceptions.Timeout,
+        ) as e:
+            logger.warning("Time zone lookup failed: %s", e)
+            raise ServiceError("Time zone lookup failed") from e
+
+    def resolve(self, latitude, longitude):
+        """
+        Return time zone id of given coordinates or `None` if there is no time zone there.
+
+        Raises `ServiceError` if the remote lookup could not be completed.
+        """
+        if latitude is None or longitude is None:
+            return None
+        latitude, longitude = float(latitude), float(longitude)
+
+        key = self._cache_key(latitude, longitude)
+        if key in self._resolved:
+            return self._resolved[key]
+
+        time_zone = cache.get(key)
+        if time_zone is None:
+            time_zone = self._resolve_offline(latitude, longitude)
+            if time_zone is None:
+                time_zone = self._resolve_remote(latitude, longitude)
+            if time_zone is not None:
+                cache.set(key, time_zone, CACHE_TIMEOUT)
+
+        self._resolved[key] = time_zone
+        return time_zone
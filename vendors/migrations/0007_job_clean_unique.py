@@ -0,0 +1,28 @@
+# Generated by Django 2.0.9 on 2019-11-01 00:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("vendors", "0006_auto_20190924_0000")]
+
+    operations = [
+        migrations.RunSQL(
+            """
+            UPDATE vendors_job SET is_active = false
+            WHERE job_type = 'JCL' AND is_active AND time_frame IS NOT NULL AND id NOT IN (
+                SELECT MIN(id) FROM vendors_job
+                WHERE job_type = 'JCL' AND is_active AND time_frame IS NOT NULL
+                GROUP BY prop_id, time_frame
+            )
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(
+            'CREATE UNIQUE INDEX "vendors_job_clean_unique" '
+            'ON "vendors_job" ("prop_id", "job_type", "time_frame") '
+            "WHERE job_type = 'JCL' AND is_active;",
+            'DROP INDEX "vendors_job_clean_unique";',
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 2.0.9 on 2019-11-04 00:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+
+def schedule_reminders(apps, schema_editor):
+    from vendors.reminders import schedule_job_reminders
+
+    Job = apps.get_model("vendors", "Job")
+    JobReminder = apps.get_model("vendors", "JobReminder")
+    jobs = Job.objects.filter(is_active=True, time_frame__overlap=(timezone.now(), None)).only(
+        "pk", "time_frame", "time_estimate"
+    )
+    schedule_job_reminders(list(jobs), reminder_model=JobReminder)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("vendors", "0007_job_clean_unique")]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobReminder",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("U", "Upcoming"), ("C", "Check In")], max_length=1
+                    ),
+                ),
+                ("days_before", models.PositiveSmallIntegerField(default=0)),
+                ("due_at", models.DateTimeField()),
+                ("sent_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reminder_set",
+                        to="vendors.Job",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name="jobreminder", unique_together={("job", "kind", "days_before")}
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX "vendors_jobreminder_due" ON "vendors_jobreminder" ("due_at") '
+            "WHERE sent_at IS NULL;",
+            'DROP INDEX "vendors_jobreminder_due";',
+        ),
+        migrations.RunPython(schedule_reminders, migrations.RunPython.noop),
+    ]
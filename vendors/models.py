@@ -6,14 +6,17 @@ from django.db import models
 
 from cozmo.storages import UploadImageTo
 from cozmo_common.db.models import TimestampModel
+from cozmo_common.mixins import ChangedFieldMixin
 from cozmo_common.enums import ChoicesEnum
 
 User = get_user_model()
 
 
-class Job(TimestampModel):
+class Job(ChangedFieldMixin, TimestampModel):
     """Job which needs to be done by Vendor in Property."""
 
+    tracked_fields = ("status", "assignee", "time_frame", "time_estimate")
+
     class Jobs(ChoicesEnum):
 
         Checkup = "JCU"
@@ -144,6 +147,25 @@ class WorkLog(TimestampModel):
         permissions = (("view_worklog", "Can view work logs"),)
 
 
+class JobReminder(models.Model):
+    """Notification to be sent to the assignee of a job at a given time."""
+
+    class Kinds(ChoicesEnum):
+        # Job starts in a few days
+        Upcoming = "U"
+        # Job has to start now to be finished in time
+        Check_In = "C"
+
+    job = models.ForeignKey(Job, related_name="reminder_set", on_delete=models.CASCADE)
+    kind = models.CharField(max_length=1, choices=Kinds.choices())
+    days_before = models.PositiveSmallIntegerField(default=0)
+    due_at = models.DateTimeField()
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ("job", "kind", "days_before")
+
+
 class Report(TimestampModel):
     image = models.ImageField(upload_to=UploadImageTo("vendors/report"), null=True, blank=True)
     job = models.ForeignKey("Job", related_name="report_set", on_delete=models.CASCADE)
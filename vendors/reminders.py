@@ -0,0 +1,55 @@
+import datetime as dt
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import models
+
+UPCOMING_DAYS_BEFORE = (0, 1, 3)
+UPCOMING_LEAD_TIME = dt.timedelta(hours=6)
+
+
+def _aware(value):
+    # Ranges of jobs built in memory are naive, the database stores them in UTC
+    if timezone.is_naive(value):
+        return timezone.make_aware(value, timezone.utc)
+    return value
+
+
+def job_reminders(job):
+    """Yield `(kind, days_before, due_at)` of every reminder of a job."""
+    time_frame = job.time_frame
+    if time_frame is None or time_frame.lower is None:
+        return
+
+    start = _aware(time_frame.lower)
+    for days_before in UPCOMING_DAYS_BEFORE:
+        yield (
+            models.JobReminder.Kinds.Upcoming.value,
+            days_before,
+            start - dt.timedelta(days=days_before) - UPCOMING_LEAD_TIME,
+        )
+    if time_frame.upper is not None:
+        yield (
+            models.JobReminder.Kinds.Check_In.value,
+            0,
+            _aware(time_frame.upper) - job.time_estimate,
+        )
+
+
+def schedule_job_reminders(jobs, reminder_model=models.JobReminder):
+    """
+    Replace reminders of given jobs with the ones due in the future.
+
+    Jobs are expected to be saved, reminders already sent for a previous schedule are
+    discarded as well.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        reminder_model.objects.filter(job__in=[job.pk for job in jobs]).delete()
+        return reminder_model.objects.bulk_create(
+            reminder_model(job_id=job.pk, kind=kind, days_before=days_before, due_at=due_at)
+            for job in jobs
+            for kind, days_before, due_at in job_reminders(job)
+            if due_at > now
+        )
@@ -23,7 +23,7 @@ from listings.serializers import (
 )
 from owners.models import Owner
 from vendors.models import Expense, Job, Vendor
-from . import models
+from . import models, services
 
 User = get_user_model()
 
@@ -73,18 +73,22 @@ class AssignmentSerializer(serializers.ModelSerializer):
         ]
 
 
-class ReassingListSerializer(serializers.ListSerializer):
-    def update(self, instance, validated_data):
-        if validated_data:
-            instance.update(**validated_data[0])
-        return instance
+class OrganizationVendorField(serializers.PrimaryKeyRelatedField):
+    """Vendor of the organization of the requesting user."""
 
+    def get_queryset(self):
+        return models.Vendor.objects.filter(
+            user__organizations=self.context["request"].user.organization
+        )
 
-class ReassingSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = models.Assignment
-        fields = ("id", "vendor")
-        list_serializer_class = ReassingListSerializer
+
+class ReassingSerializer(serializers.Serializer):
+    vendor = OrganizationVendorField()
+
+
+class ReassignSummarySerializer(serializers.Serializer):
+    reassigned = serializers.IntegerField()
+    skipped = serializers.IntegerField()
 
 
 class InstructionSerializer(serializers.ModelSerializer):
@@ -126,11 +130,8 @@ class JobMinimalSerializer(serializers.ModelSerializer):
         fields = ("id", "time_frame", "base_cost", "type", "status", "assignee")
 
 
-class JobReassingSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = models.Job
-        fields = ("id", "assignee")
-        list_serializer_class = ReassingListSerializer
+class JobReassingSerializer(serializers.Serializer):
+    assignee = OrganizationVendorField()
 
 
 class JobAssigneeSerializer(JobMinimalSerializer):
@@ -253,19 +254,13 @@ class JobStatusSerializer(serializers.ModelSerializer):
         model = models.Job
         fields = ("id", "status")
 
-    def create(self, validated_data):
-        status = validated_data["status"]
-        job_id = validated_data["id"]
-        job = self.Meta.model.objects.get(pk=job_id)
-        job.status = status
-        job.save(update_fields=["status"])
-        return job
+    def update(self, instance, validated_data):
+        services.transition_job(instance, validated_data["status"])
+        return instance
 
-    def validate_status(self, obj):
-        return obj
 
-    def validate(self, data):
-        return data
+class JobBulkStatusSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(models.Job.Statuses.choices())
 
 
 class OwnerForJobSerializer(serializers.ModelSerializer):
@@ -0,0 +1,101 @@
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from notifications.models import Notification
+from . import models
+from .mapping import STATUS_TO_EVENT
+from .signals import new_job_notification
+
+
+def _status_event(status):
+    return STATUS_TO_EVENT[models.Job.Statuses(status)].value
+
+
+def transition_job(job, status):
+    """
+    Move a job to another status and log the transition.
+
+    The status is only updated if it has not changed since the job was loaded, so concurrent
+    transitions of the same job are logged once. Return whether the job was transitioned.
+    """
+    loaded_status = job._initial_data.get("status", job.status)
+    if status == loaded_status:
+        return False
+
+    with transaction.atomic():
+        transitioned = models.Job.objects.filter(pk=job.pk, status=loaded_status).update(
+            status=status, date_updated=timezone.now()
+        )
+        if transitioned:
+            models.WorkLog.objects.create(job=job, event=_status_event(status))
+
+    if transitioned:
+        job.status = status
+        job.snapshot_data()
+    return bool(transitioned)
+
+
+def bulk_transition_jobs(jobs, status):
+    """Move jobs to another status with a single UPDATE and log every transition."""
+    with transaction.atomic():
+        job_ids = list(
+            jobs.exclude(status=status)
+            .select_for_update(of=("self",))
+            .prefetch_related(None)
+            .values_list("pk", flat=True)
+        )
+        models.Job.objects.filter(pk__in=job_ids).update(
+            status=status, date_updated=timezone.now()
+        )
+        event = _status_event(status)
+        models.WorkLog.objects.bulk_create(
+            models.WorkLog(job_id=job_id, event=event) for job_id in job_ids
+        )
+
+    return len(job_ids)
+
+
+def reassign_jobs(jobs, assignee):
+    """
+    Reassign jobs to another vendor with a single UPDATE.
+
+    Reassignment work logs and new job notifications are created in bulk instead of by `Job`
+    signals, which are not sent.
+    """
+    with transaction.atomic():
+        jobs = list(
+            jobs.exclude(assignee=assignee)
+            .select_for_update(of=("self",))
+            .only("pk", "time_frame", "base_cost")
+            .annotate(organization_name=F("prop__organization__name"))
+        )
+        models.Job.objects.filter(pk__in=[job.pk for job in jobs]).update(assignee=assignee)
+
+        work_logs, notifications = [], []
+        for job in jobs:
+            work_log, notification = new_job_notification(
+                job, job.organization_name, assignee.user_id
+            )
+            work_logs.append(work_log)
+            notifications.append(notification)
+        models.WorkLog.objects.bulk_create(work_logs)
+        Notification.objects.bulk_create(notifications)
+
+    return {"reassigned": len(jobs), "skipped": 0}
+
+
+def reassign_assignments(assignments, vendor):
+    """
+    Move assignments to another vendor with a single UPDATE.
+
+    Assignments of properties the vendor is already assigned to are skipped.
+    """
+    assignments = assignments.exclude(vendor=vendor)
+    with transaction.atomic():
+        reassigned = assignments.exclude(
+            prop_id__in=models.Assignment.objects.filter(vendor=vendor).values("prop_id")
+        ).update(vendor=vendor)
+        skipped = assignments.count()
+
+    return {"reassigned": reassigned, "skipped": skipped}
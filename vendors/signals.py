@@ -1,34 +1,33 @@
-from contextlib import suppress
-
 from django.conf import settings
-from django.db.models import F
-from django.db.models.functions import Lower
+from django.db import transaction
 from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 
+from listings.models import Reservation
 from notifications.models import Notification
 from vendors.mapping import STATUS_TO_EVENT
+from vendors.reminders import schedule_job_reminders
 from vendors.templates import MESSAGE_NEW_JOB, MESSAGE_NEW_ACCOUNT
 from .models import Job, Report, WorkLog, Vendor
 
 
 @receiver(post_save, sender=Job)
-def notify_status_change_post(sender, instance, created, **kwargs):
-    update_fields = kwargs["update_fields"]
-    if created or (update_fields and "status" in update_fields):
+def track_job_changes(sender, instance, created, update_fields, **kwargs):
+    """
+    Log status of new jobs and status changes saved outside of `transition_job`, and
+    schedule reminders of new and rescheduled jobs.
+    """
+    changes = {} if created else instance._changed_fields()
+    if update_fields is not None:
+        changes = {field: value for field, value in changes.items() if field in update_fields}
+
+    if created or "status" in changes:
         WorkLog.objects.create(
             job=instance, event=STATUS_TO_EVENT.get(Job.Statuses(instance.status)).value
         )
-
-
-@receiver(pre_save, sender=Job)
-def notify_status_change(sender, instance, **kwargs):
-    with suppress(Job.DoesNotExist):
-        old_data = Job.objects.filter(pk=instance.pk).values("status").first()
-        if old_data and old_data["status"] != instance.status:
-            WorkLog.objects.create(
-                job=instance, event=STATUS_TO_EVENT.get(Job.Statuses(instance.status)).value
-            )
+    if created or "time_frame" in changes or "time_estimate" in changes:
+        schedule_job_reminders([instance])
+    instance.snapshot_data()
 
 
 @receiver(post_save, sender=Report)
@@ -39,36 +38,37 @@ def notify_report(sender, instance, created, **kwargs):
         WorkLog.objects.create(job=instance.job, event=event.value)
 
 
-def _send_new_job_notification(instance):
-    assignee = instance.assignee
-    prop = instance.prop
+def new_job_notification(instance, organization_name, assignee_user_id):
+    """Return unsaved records announcing a job to its assignee."""
     date = instance.time_frame.lower
-    WorkLog.objects.create(job=instance, event=WorkLog.Event.Reassign.value)
-    Notification.objects.create(
-        channel=Notification.Channels.SMS.value,  # TODO
-        content=MESSAGE_NEW_JOB.format(
-            name=prop.organization.name,
-            app_name=settings.APP_NAME,
-            fee=f"${instance.base_cost}",
-            date=date.strftime("%b %d, %Y @ %I%p"),
-            link=settings.COZMO_WEB_URL,
+    return (
+        WorkLog(job=instance, event=WorkLog.Event.Reassign.value),
+        Notification(
+            channel=Notification.Channels.SMS.value,  # TODO
+            content=MESSAGE_NEW_JOB.format(
+                name=organization_name,
+                app_name=settings.APP_NAME,
+                fee=f"${instance.base_cost}",
+                date=date.strftime("%b %d, %Y @ %I%p"),
+                link=settings.COZMO_WEB_URL,
+            ),
+            to_id=assignee_user_id,
+            content_object=instance,
         ),
-        to_id=assignee.user.id,
-        content_object=instance,
     )
 
 
+def _send_new_job_notification(instance):
+    for record in new_job_notification(
+        instance, instance.prop.organization.name, instance.assignee.user.id
+    ):
+        record.save()
+
+
 @receiver(pre_save, sender=Job)
 def notify_assignee_change(sender, instance, **kwargs):
-    with suppress(Job.DoesNotExist):
-        old_data = (
-            Job.objects.filter(pk=instance.pk)
-            .annotate(start_date=Lower("time_frame"))
-            .values("status", "assignee_id", "start_date", place=F("prop__name"))
-            .first()
-        )
-        if old_data and old_data["assignee_id"] != instance.assignee.id:
-            _send_new_job_notification(instance)
+    if instance.assignee_id is not None and "assignee_id" in instance._changed_fields():
+        _send_new_job_notification(instance)
 
 
 @receiver(post_save, sender=Job)
@@ -89,3 +89,11 @@ def notify_new_vendor(sender, instance, **kwargs):
         to_id=instance.user.id,
         content_object=instance,
     )
+
+
+@receiver(post_save, sender=Reservation)
+def schedule_clean_job(sender, instance, created, **kwargs):
+    if created:
+        from .tasks import create_reservation_clean_jobs
+
+        transaction.on_commit(lambda: create_reservation_clean_jobs.delay(instance.pk))
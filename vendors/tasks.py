@@ -1,145 +1,212 @@
 import datetime as dt
 import logging
 
-from celery import group
-from celery.exceptions import Ignore
 from celery.task import periodic_task, task
-from django.core.exceptions import MultipleObjectsReturned
-from django.db.models.expressions import F
-from django.db.models.functions import Lower, Upper
+from django.db import IntegrityError, transaction
+from django.db.models.expressions import F, OuterRef, Subquery
 from django.utils import timezone
 from psycopg2._range import DateTimeTZRange
 
-from listings.models import Reservation, SchedulingAssistant
+from listings.models import Reservation
 from notifications.models import Notification
 from . import models
+from .mapping import STATUS_TO_EVENT
+from .reminders import schedule_job_reminders
+from .signals import new_job_notification
 
 logger = logging.getLogger(__name__)
 
 
-@periodic_task(run_every=dt.timedelta(days=1))
-def create_clean_jobs():
-    now = timezone.now()
-    reservations = Reservation.objects.filter(
-        end_date__gte=now, end_date__lte=now + dt.timedelta(days=7)
-    ).values("prop_id", "end_date")
+CLEAN_JOB_DAYS = 7
 
-    job = group(create_clean_job.s(**res) for res in reservations)
-    job.apply_async()
-    return "Scheduled clean job creation"
 
-
-@task
-def create_clean_job(prop_id, end_date):
-    start = dt.datetime.strptime(f"{end_date}T00:00", "%Y-%m-%dT%H:%M")
-    end = dt.datetime.strptime(f"{end_date}T23:59", "%Y-%m-%dT%H:%M")
-    time_frame = DateTimeTZRange(start, end)
-
-    scheduling_a = SchedulingAssistant.objects.get(prop=prop_id)
-    if not scheduling_a.automatically_assign:
-        raise Ignore(f"Clean job for {end_date} in property {prop_id}, automatically_assign=False")
-
-    assignment = (
-        models.Assignment.objects.filter(prop_id=prop_id, order__gte=1)
-        .values(assignee_id=F("vendor_id"), base_cost=F("cleaning_fee"))
-        .order_by("order")
-        .first()
+def _clean_time_frame(day):
+    return DateTimeTZRange(
+        dt.datetime.combine(day, dt.time(0, 0)), dt.datetime.combine(day, dt.time(23, 59))
     )
-    if not assignment:
-        raise Ignore(f"Clean job for {end_date} in property {prop_id}, no assignment")
 
-    try:
-        _, created = models.Job.objects.filter(time_frame__overlap=time_frame).get_or_create(
+
+def _days(time_frame, first, last):
+    """Yield days between `first` and `last` covered by a time frame."""
+    day, end = first, last
+    if time_frame.lower is not None:
+        day = max(day, time_frame.lower.date())
+    if time_frame.upper is not None:
+        end = min(end, (time_frame.upper - dt.timedelta(microseconds=1)).date())
+    while day <= end:
+        yield day
+        day += dt.timedelta(days=1)
+
+
+def _insert_clean_jobs(reservations):
+    first_assignment = models.Assignment.objects.filter(
+        prop_id=OuterRef("prop_id"), order__gte=1
+    ).order_by("order")
+    candidates = (
+        reservations.filter(prop__scheduling_assistant__automatically_assign=True)
+        .annotate(
+            assignee_id=Subquery(first_assignment.values("vendor_id")[:1]),
+            base_cost=Subquery(first_assignment.values("cleaning_fee")[:1]),
+            time_estimate=F("prop__scheduling_assistant__time_estimate"),
+            organization_name=F("prop__organization__name"),
+        )
+        .exclude(assignee_id=None)
+        .order_by()
+        .values_list(
+            "prop_id", "end_date", "assignee_id", "base_cost", "time_estimate", "organization_name"
+        )
+        .distinct()
+    )
+    candidates = {(row[0], row[1]): row for row in candidates}
+    if not candidates:
+        return []
+
+    first = min(day for _, day in candidates)
+    last = max(day for _, day in candidates)
+    existing = models.Job.objects.filter(
+        prop_id__in={prop_id for prop_id, _ in candidates},
+        job_type=models.Job.Jobs.Clean.value,
+        time_frame__overlap=(
+            dt.datetime.combine(first, dt.time.min),
+            dt.datetime.combine(last, dt.time.max),
+        ),
+    ).values_list("prop_id", "time_frame")
+    for prop_id, time_frame in existing:
+        for day in _days(time_frame, first, last):
+            candidates.pop((prop_id, day), None)
+
+    jobs = models.Job.objects.bulk_create(
+        models.Job(
             prop_id=prop_id,
             job_type=models.Job.Jobs.Clean.value,
-            defaults={
-                "time_estimate": scheduling_a.time_estimate,
-                "time_frame": time_frame,
-                **assignment,
-            },
+            time_frame=_clean_time_frame(day),
+            assignee_id=assignee_id,
+            base_cost=base_cost,
+            time_estimate=time_estimate,
         )
-    except MultipleObjectsReturned:
-        created = False
+        for prop_id, day, assignee_id, base_cost, time_estimate, _ in candidates.values()
+    )
 
-    if not created:
-        raise Ignore(f"Clean job for {end_date} in property {prop_id} already exists")
+    assignee_users = dict(
+        models.Vendor.objects.filter(pk__in={job.assignee_id for job in jobs}).values_list(
+            "pk", "user_id"
+        )
+    )
+    status_event = STATUS_TO_EVENT[models.Job.Statuses.Not_Accepted].value
+    work_logs, notifications = [], []
+    for job in jobs:
+        organization_name = candidates[(job.prop_id, job.time_frame.lower.date())][-1]
+        work_log, notification = new_job_notification(
+            job, organization_name, assignee_users[job.assignee_id]
+        )
+        work_logs += [models.WorkLog(job=job, event=status_event), work_log]
+        notifications.append(notification)
+    models.WorkLog.objects.bulk_create(work_logs)
+    Notification.objects.bulk_create(notifications)
+    schedule_job_reminders(jobs)
+    return jobs
+
+
+def create_clean_jobs_for(reservations):
+    """
+    Create missing clean jobs on checkout days of given reservations.
+
+    Jobs are created in bulk for properties which automatically assign the first vendor in
+    order. A concurrent run inserting the same jobs is rejected by the unique index on clean
+    jobs, in which case missing jobs are computed again.
+    """
+    try:
+        with transaction.atomic():
+            return _insert_clean_jobs(reservations)
+    except IntegrityError:
+        with transaction.atomic():
+            return _insert_clean_jobs(reservations)
 
-    return f"Created clean job for {end_date} in property {prop_id}"
 
+@periodic_task(run_every=dt.timedelta(days=1))
+def create_clean_jobs():
+    today = timezone.now().date()
+    jobs = create_clean_jobs_for(
+        Reservation.objects.filter(
+            end_date__gte=today, end_date__lte=today + dt.timedelta(days=CLEAN_JOB_DAYS)
+        )
+    )
+    return f"Created {len(jobs)} clean jobs"
 
-REMINDER_MINUTES = 30
 
+@task
+def create_reservation_clean_jobs(reservation_id):
+    jobs = create_clean_jobs_for(
+        Reservation.objects.filter(pk=reservation_id, end_date__gte=timezone.now().date())
+    )
+    return f"Created {len(jobs)} clean jobs for reservation {reservation_id}"
 
-@periodic_task(run_every=dt.timedelta(minutes=REMINDER_MINUTES))
-def notify_upcoming_job():
-    now = timezone.now() + dt.timedelta(hours=6)
-    start = dt.datetime.combine(now, dt.time(now.hour, 0, tzinfo=now.tzinfo))
-    end = start + dt.timedelta(minutes=REMINDER_MINUTES)
-    day = dt.timedelta(days=1)
-
-    qs = (
-        models.Job.objects.filter(is_active=True)
-        .exclude(
-            status__in=(
-                models.Job.Statuses.Completed.value,
-                models.Job.Statuses.Cancelled.value,
-                models.Job.Statuses.In_Progress.value,
-            )
+
+REMINDER_MINUTES = 5
+REMINDER_BATCH_SIZE = 500
+
+
+def _reminder_content(reminder):
+    job = reminder.job
+    if reminder.kind == models.JobReminder.Kinds.Check_In.value:
+        return "Check in to property {}. Job should end before {}.".format(
+            job.prop.name, job.time_frame.upper.strftime("%Y-%m-%d %H:%M %Z")
         )
-        .annotate(start=Lower("time_frame"), to_id=F("assignee_id"), place=F("prop__name"))
+    return "You have upcoming job in property {} in {} day(s).".format(
+        job.prop.name, reminder.days_before
     )
 
-    for before in (0, 1, 3):
-        Notification.objects.bulk_create(
-            Notification(
-                channel=Notification.Channels.SMS.value,
-                content="You have upcoming job in property {} in {} day(s).".format(
-                    job.place, before
-                ),
-                to_id=job.to_id,
-                content_object=job,
-            )
-            for job in qs.filter(start__contained_by=(start + before * day, end + before * day))
-        )
 
-    return "Job reminders scheduled"
+def _is_reminder_relevant(reminder, now):
+    job = reminder.job
+    if not job.is_active or job.assignee is None or job.time_frame is None:
+        return False
+    if job.status in (
+        models.Job.Statuses.Completed.value,
+        models.Job.Statuses.Cancelled.value,
+        models.Job.Statuses.In_Progress.value,
+    ):
+        return False
+    if reminder.kind == models.JobReminder.Kinds.Check_In.value:
+        return job.time_frame.upper > now
+    return job.time_frame.lower > now
 
 
 @periodic_task(run_every=dt.timedelta(minutes=REMINDER_MINUTES))
-def notify_missed_job():
-    now = timezone.now()
-
-    qs = (
-        models.Job.objects.exclude(
-            is_active=False,
-            status__in=(
-                models.Job.Statuses.Completed.value,
-                models.Job.Statuses.Cancelled.value,
-                models.Job.Statuses.In_Progress.value,
-            ),
-        )
-        .annotate(
-            start=Lower("time_frame"),
-            end=Upper("time_frame"),
-            place=F("prop__name"),
-            to_id=F("assignee_id"),
-        )
-        .filter(
-            time_frame__overlap=(now, now + dt.timedelta(hours=REMINDER_MINUTES)),
-            time_estimate__gt=F("end") - now,
-        )
-    )
+def send_job_reminders():
+    """
+    Send reminders which are due.
 
-    Notification.objects.bulk_create(
-        Notification(
-            channel=Notification.Channels.SMS.value,
-            content="Check in to property {}. Job should end before {}.".format(
-                job.place, job.end.strftime("%Y-%m-%d %H:%M %Z")
-            ),
-            to_id=job.to_id,
-            content_object=job,
-        )
-        for job in qs
-    )
+    Reminders are claimed with `SKIP LOCKED`, so overlapping runs never send the same
+    reminder twice, and reminders missed while workers were down are sent by the next run.
+    """
+    now = timezone.now()
+    sent = 0
+    while True:
+        with transaction.atomic():
+            reminders = list(
+                models.JobReminder.objects.filter(sent_at=None, due_at__lte=now)
+                .select_related("job__prop", "job__assignee")
+                .select_for_update(skip_locked=True, of=("self",))
+                .order_by("due_at")[:REMINDER_BATCH_SIZE]
+            )
+            if not reminders:
+                break
+
+            notifications = [
+                Notification(
+                    channel=Notification.Channels.SMS.value,
+                    content=_reminder_content(reminder),
+                    to_id=reminder.job.assignee.user_id,
+                    content_object=reminder.job,
+                )
+                for reminder in reminders
+                if _is_reminder_relevant(reminder, now)
+            ]
+            Notification.objects.bulk_create(notifications)
+            models.JobReminder.objects.filter(pk__in=[r.pk for r in reminders]).update(
+                sent_at=now
+            )
+        sent += len(notifications)
 
-    return "Job check in remainders scheduled"
+    return f"Sent {sent} job reminders"
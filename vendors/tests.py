@@ -2,20 +2,21 @@ import datetime as dt
 from decimal import Decimal
 from unittest import mock
 
-from celery.exceptions import Ignore
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
 from django.http import Http404
 from django.test import TestCase
 from django.utils import timezone
 from guardian.shortcuts import assign_perm
 from psycopg2.extras import DateTimeTZRange
 from rest_framework.compat import coreapi
-from rest_framework.exceptions import APIException
+from rest_framework.exceptions import APIException, ValidationError
 
 from accounts.models import Membership, Organization
 from accounts.permissions import MANAGE_ORGANIZATION_PERMISSION
-from listings.models import Property
-from . import filters, models, serializers, tasks, views
+from listings.models import Property, Reservation
+from notifications.models import Notification
+from . import filters, models, serializers, services, tasks, views
 
 User = get_user_model()
 
@@ -397,54 +398,291 @@ class CreateCleanJobsTestCase(TestCase):
             assignee_id=cls.vendor.id,
         )
 
+    def _clean_jobs(self, day):
+        return models.Job.objects.filter(
+            prop_id=self.prop.id,
+            job_type=models.Job.Jobs.Clean.value,
+            time_frame__overlap=(day, day + dt.timedelta(days=1)),
+        )
+
+    def _reservation(self, end_date):
+        return Reservation.objects.create(
+            start_date=end_date - dt.timedelta(days=2),
+            end_date=end_date,
+            price=Decimal("0"),
+            paid=Decimal("0"),
+            prop=self.prop,
+        )
+
     def test_create_clean_jobs(self):
-        pass
+        self._reservation(self.date_has_job)
+        self._reservation(self.date_no_job)
+        self._reservation(self.date_no_job)
 
-    def test_create_clean_job(self):
-        def check_job_exsits():
-            return models.Job.objects.filter(
-                prop_id=self.prop.id,
-                time_frame__overlap=(self.date_no_job, self.date_no_job + dt.timedelta(days=1)),
-            ).first()
+        with self.subTest("No assignment"):
+            self.assertEqual(tasks.create_clean_jobs(), "Created 0 clean jobs")
+            self.assertFalse(self._clean_jobs(self.date_no_job).exists())
 
-        with self.subTest("Job already exists"), self.assertRaises(Ignore):
-            tasks.create_clean_job(self.prop.id, self.date_has_job)
+        fee = 10
+        models.Assignment.objects.create(
+            prop=self.prop, vendor=self.vendor, order=1, cleaning_fee=fee
+        )
 
-        with self.subTest("More then one job exists"), self.assertRaises(Ignore):
+        with self.subTest("Create missing jobs"):
+            self.assertEqual(tasks.create_clean_jobs(), "Created 1 clean jobs")
+            self.assertEqual(self._clean_jobs(self.date_has_job).count(), 1)
+            job = self._clean_jobs(self.date_no_job).get()
+            self.assertEqual(job.base_cost, fee)
+            self.assertEqual(job.assignee, self.vendor)
+            self.assertEqual(job.worklog_set.count(), 2)
+            self.assertTrue(
+                Notification.objects.filter(object_id=job.pk, to=self.vendor.user).exists()
+            )
+
+        with self.subTest("Jobs are not created twice"):
+            self.assertEqual(tasks.create_clean_jobs(), "Created 0 clean jobs")
+            self.assertEqual(self._clean_jobs(self.date_no_job).count(), 1)
+
+        with self.subTest("Duplicates are rejected by database"), self.assertRaises(
+            IntegrityError
+        ), transaction.atomic():
             models.Job.objects.create(
                 job_type=models.Job.Jobs.Clean.value,
                 base_cost=0,
-                time_frame=DateTimeTZRange(
-                    dt.datetime.combine(self.date_has_job, dt.datetime.min.time()),
-                    dt.datetime.combine(self.date_has_job, dt.datetime.max.time()),
-                ),
+                time_frame=job.time_frame,
                 prop=self.prop,
                 assignee_id=self.vendor.id,
             )
-            tasks.create_clean_job(self.prop.id, self.date_has_job)
 
-        with self.subTest("No assignment"):
-            self.assertIsNone(check_job_exsits())
-            with self.assertRaises(Ignore):
-                tasks.create_clean_job(self.prop.id, self.date_no_job)
-
-        fee = 10
+    def test_create_reservation_clean_jobs(self):
         models.Assignment.objects.create(
-            prop=self.prop, vendor=self.vendor, order=1, cleaning_fee=fee
+            prop=self.prop, vendor=self.vendor, order=1, cleaning_fee=10
         )
-
-        with self.subTest("Create new job"):
-            self.assertIsNone(check_job_exsits())
-            tasks.create_clean_job(self.prop.id, self.date_no_job)
-            job = check_job_exsits()
-            self.assertEqual(job.base_cost, fee)
-            job.delete()
+        reservation = self._reservation(self.date_no_job + dt.timedelta(days=30))
 
         with self.subTest("automatically_assign = False"):
             self.prop.scheduling_assistant.automatically_assign = False
             self.prop.scheduling_assistant.save()
-            with self.assertRaises(Ignore):
-                tasks.create_clean_job(self.prop.id, self.date_no_job)
+            tasks.create_reservation_clean_jobs(reservation.pk)
+            self.assertFalse(self._clean_jobs(reservation.end_date).exists())
+
+        with self.subTest("Create job"):
+            self.prop.scheduling_assistant.automatically_assign = True
+            self.prop.scheduling_assistant.save()
+            tasks.create_reservation_clean_jobs(reservation.pk)
+            self.assertTrue(self._clean_jobs(reservation.end_date).exists())
+
+
+class ServicesTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        org = Organization.objects.create(name="CO")
+        inviter = User.objects.create(username="owner@example.com")
+        Membership.objects.create(organization=org, user=inviter, is_default=True)
+        cls.vendor, cls.other_vendor = (
+            models.Vendor.objects.create(
+                user=User.objects.create(username=username, email=username), invited_by=inviter
+            )
+            for username in ("egg@example.com", "spam@example.com")
+        )
+        cls.props = [
+            Property.objects.create(
+                name=f"Name {i}",
+                property_type=Property.Types.Apartment.value,
+                rental_type=Property.Rentals.Private.value,
+                organization=org,
+            )
+            for i in range(3)
+        ]
+
+    def _job(self, status=models.Job.Statuses.Accepted.value):
+        start = timezone.now()
+        return models.Job.objects.create(
+            job_type=models.Job.Jobs.Clean.value,
+            base_cost=0,
+            time_frame=DateTimeTZRange(start, start + dt.timedelta(hours=1)),
+            prop=self.props[0],
+            assignee=self.vendor,
+            status=status,
+        )
+
+    def test_transition_job(self):
+        job = models.Job.objects.get(pk=self._job().pk)
+        stale_job = models.Job.objects.get(pk=job.pk)
+        in_progress = models.Job.Statuses.In_Progress.value
+
+        self.assertTrue(services.transition_job(job, in_progress))
+        self.assertEqual(job.status, in_progress)
+        self.assertEqual(
+            list(job.worklog_set.values_list("event", flat=True)),
+            [models.WorkLog.Event.Accept.value, models.WorkLog.Event.Start.value],
+        )
+
+        with self.subTest("Repeated transition"):
+            self.assertFalse(services.transition_job(job, in_progress))
+            self.assertFalse(services.transition_job(stale_job, in_progress))
+            self.assertEqual(job.worklog_set.count(), 2)
+
+        with self.subTest("Saved status change is logged once"):
+            job.status = models.Job.Statuses.Completed.value
+            with self.assertNumQueries(2):
+                job.save()
+            job.save()
+            self.assertEqual(
+                job.worklog_set.filter(event=models.WorkLog.Event.Finish.value).count(), 1
+            )
+
+    def test_bulk_transition_jobs(self):
+        in_progress = models.Job.Statuses.In_Progress.value
+        jobs = [self._job(), self._job(), self._job(status=in_progress)]
+        queryset = models.Job.objects.filter(pk__in=[job.pk for job in jobs])
+
+        self.assertEqual(services.bulk_transition_jobs(queryset, in_progress), 2)
+        self.assertEqual(queryset.filter(status=in_progress).count(), 3)
+        self.assertEqual(
+            models.WorkLog.objects.filter(
+                job__in=queryset, event=models.WorkLog.Event.Start.value
+            ).count(),
+            3,
+        )
+        self.assertEqual(services.bulk_transition_jobs(queryset, in_progress), 0)
+
+    def test_reassign_jobs(self):
+        start = timezone.now()
+        for prop in self.props:
+            models.Job.objects.create(
+                job_type=models.Job.Jobs.Clean.value,
+                base_cost=0,
+                time_frame=DateTimeTZRange(start, start + dt.timedelta(hours=1)),
+                prop=prop,
+                assignee=self.vendor,
+            )
+        notifications = Notification.objects.filter(to=self.other_vendor.user)
+
+        summary = services.reassign_jobs(self.vendor.job_set.all(), self.other_vendor)
+        self.assertEqual(summary, {"reassigned": 3, "skipped": 0})
+        self.assertFalse(self.vendor.job_set.exists())
+        self.assertEqual(notifications.count(), 3)
+        self.assertEqual(
+            models.WorkLog.objects.filter(
+                job__assignee=self.other_vendor, event=models.WorkLog.Event.Reassign.value
+            ).count(),
+            3,
+        )
+
+        with self.subTest("Nothing to reassign"):
+            summary = services.reassign_jobs(self.vendor.job_set.all(), self.other_vendor)
+            self.assertEqual(summary, {"reassigned": 0, "skipped": 0})
+            self.assertEqual(notifications.count(), 3)
+
+    def test_reassign_assignments(self):
+        for prop in self.props:
+            models.Assignment.objects.create(prop=prop, vendor=self.vendor, cleaning_fee=10)
+        models.Assignment.objects.create(
+            prop=self.props[0], vendor=self.other_vendor, cleaning_fee=10
+        )
+
+        summary = services.reassign_assignments(
+            models.Assignment.objects.filter(vendor=self.vendor), self.other_vendor
+        )
+        self.assertEqual(summary, {"reassigned": 2, "skipped": 1})
+        self.assertEqual(
+            list(self.vendor.assignment_set.values_list("prop_id", flat=True)),
+            [self.props[0].id],
+        )
+        self.assertEqual(self.other_vendor.assignment_set.count(), 3)
+
+
+class ReassignSerializerTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization, other_organization = (
+            Organization.objects.create(name=name) for name in ("CO", "Other CO")
+        )
+        cls.vendors = []
+        for i, org in enumerate((cls.organization, other_organization)):
+            user = User.objects.create(username=f"vendor-{i}@example.com")
+            Membership.objects.create(organization=org, user=user, is_default=True)
+            cls.vendors.append(models.Vendor.objects.create(user=user, invited_by=user))
+
+    def test_vendor_of_other_organization(self):
+        own, foreign = self.vendors
+        context = {"request": mock.MagicMock(**{"user.organization": self.organization})}
+        for serializer_class, field in (
+            (serializers.ReassingSerializer, "vendor"),
+            (serializers.JobReassingSerializer, "assignee"),
+        ):
+            with self.subTest(serializer=serializer_class.__name__):
+                serializer = serializer_class(data={field: own.pk}, context=context)
+                self.assertTrue(serializer.is_valid(), serializer.errors)
+                self.assertEqual(serializer.validated_data[field], own)
+
+                serializer = serializer_class(data={field: foreign.pk}, context=context)
+                with self.assertRaises(ValidationError) as e:
+                    serializer.is_valid(raise_exception=True)
+                self.assertEqual(e.exception.status_code, 400)
+                self.assertIn(field, serializer.errors)
+
+
+class JobRemindersTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        org = Organization.objects.create(name="CO")
+        inviter = User.objects.create(username="owner@example.com")
+        Membership.objects.create(organization=org, user=inviter, is_default=True)
+        cls.vendor = models.Vendor.objects.create(
+            user=User.objects.create(username="egg@example.com"), invited_by=inviter
+        )
+        cls.prop = Property.objects.create(
+            name="Name",
+            property_type=Property.Types.Apartment.value,
+            rental_type=Property.Rentals.Private.value,
+            organization=org,
+        )
+
+    def _job(self, start):
+        return models.Job.objects.create(
+            job_type=models.Job.Jobs.Clean.value,
+            base_cost=0,
+            time_frame=DateTimeTZRange(start, start + dt.timedelta(hours=2)),
+            time_estimate=dt.timedelta(hours=1),
+            prop=self.prop,
+            assignee=self.vendor,
+        )
+
+    def test_schedule_reminders(self):
+        start = timezone.now() + dt.timedelta(days=2)
+        job = self._job(start)
+
+        self.assertCountEqual(
+            job.reminder_set.values_list("kind", "days_before", "due_at"),
+            [
+                ("U", 0, start - dt.timedelta(hours=6)),
+                ("U", 1, start - dt.timedelta(days=1, hours=6)),
+                ("C", 0, start + dt.timedelta(hours=1)),
+            ],
+        )
+
+        with self.subTest("Reschedule"):
+            job.time_frame = DateTimeTZRange(start, start + dt.timedelta(hours=3))
+            job.save()
+            self.assertEqual(
+                job.reminder_set.get(kind="C").due_at, start + dt.timedelta(hours=2)
+            )
+            self.assertEqual(job.reminder_set.count(), 3)
+
+    def test_send_job_reminders(self):
+        job = self._job(timezone.now() + dt.timedelta(hours=7))
+        notifications = Notification.objects.filter(to=self.vendor.user, object_id=job.pk)
+        job.reminder_set.update(due_at=timezone.now() - dt.timedelta(minutes=1))
+
+        self.assertEqual(tasks.send_job_reminders(), "Sent 2 job reminders")
+        self.assertEqual(notifications.count(), 2)
+        self.assertFalse(job.reminder_set.filter(sent_at=None).exists())
+
+        with self.subTest("Reminders are sent once"):
+            self.assertEqual(tasks.send_job_reminders(), "Sent 0 job reminders")
+            self.assertEqual(notifications.count(), 2)
 
 
 # Views tests
@@ -18,7 +18,7 @@ from cozmo_common.mixins import ApplicationPermissionViewMixin
 from cozmo_common.pagination import PageNumberTenPagination
 from listings.filters import GroupAccessFilter, PropertyIdFilter
 from listings.models import Property
-from . import filters, models, serializers
+from . import filters, models, serializers, services
 
 User = get_user_model()
 
@@ -67,10 +67,10 @@ class JobStatusViewSet(mixins.UpdateModelMixin, viewsets.GenericViewSet):
 
     @action(detail=True, methods=["PATCH"], serializer_class=serializers.JobStatusSerializer)
     def status(self, request, pk=None):
-        ser = self.get_serializer(data=request.data, prop_id=pk)
+        ser = self.get_serializer(self.get_object(), data=request.data)
         ser.is_valid(raise_exception=True)
-        order = ser.save()
-        return Response(data=order, status=HTTP_200_OK)
+        ser.save()
+        return Response(data=ser.data, status=HTTP_200_OK)
 
 
 class JobViewSet(ApplicationPermissionViewMixin, viewsets.ModelViewSet):
@@ -107,10 +107,25 @@ class JobViewSet(ApplicationPermissionViewMixin, viewsets.ModelViewSet):
 
     @action(detail=True, methods=["PATCH"], serializer_class=serializers.JobStatusSerializer)
     def status(self, request, pk=None):
-        ser = self.get_serializer(data=request.data, prop_id=pk)
+        ser = self.get_serializer(self.get_object(), data=request.data)
         ser.is_valid(raise_exception=True)
-        order = ser.save()
-        return Response(data=order, status=HTTP_200_OK)
+        ser.save()
+        return Response(data=ser.data, status=HTTP_200_OK)
+
+    @action(
+        detail=False,
+        methods=["PATCH"],
+        url_path="bulk-status",
+        serializer_class=serializers.JobBulkStatusSerializer,
+    )
+    def bulk_status(self, request, *args, **kwargs):
+        """Change status of all filtered jobs, e.g. start all of today's jobs."""
+        ser = self.get_serializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        updated = services.bulk_transition_jobs(
+            self.filter_queryset(self.get_queryset()), ser.validated_data["status"]
+        )
+        return Response(data={"updated": updated}, status=HTTP_200_OK)
 
 
 class JobCalendarViewSet(
@@ -187,14 +202,13 @@ class VendorViewSet(ApplicationPermissionViewMixin, viewsets.ModelViewSet):
     )
     def reassign(self, request, *args, **kwargs):
         """Reassing all jobs from one Vendor to another."""
-        queryset = self.get_object().job_set.all()
-        serializer = self.get_serializer(
-            queryset, data=[request.data] * queryset.count(), partial=True, many=True
-        )
+        serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        summary = services.reassign_jobs(
+            self.get_object().job_set.all(), serializer.validated_data["assignee"]
+        )
 
-        return Response(status=HTTP_204_NO_CONTENT)
+        return Response(serializers.ReassignSummarySerializer(summary).data)
 
 
 class AssignmentViewSet(ApplicationPermissionViewMixin, NestedViewSetMixin, viewsets.ModelViewSet):
@@ -213,14 +227,13 @@ class AssignmentViewSet(ApplicationPermissionViewMixin, NestedViewSetMixin, view
     @action(detail=False, methods=["PATCH"], serializer_class=serializers.ReassingSerializer)
     def reassign(self, request, *args, **kwargs):
         """Reassing all Assignments from one Vendor to another."""
-        queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(
-            queryset, data=[request.data] * queryset.count(), partial=True, many=True
-        )
+        serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        summary = services.reassign_assignments(
+            self.filter_queryset(self.get_queryset()), serializer.validated_data["vendor"]
+        )
 
-        return Response(status=HTTP_204_NO_CONTENT)
+        return Response(serializers.ReassignSummarySerializer(summary).data)
 
     @action(detail=False, methods=["DELETE"])
     def delete(self, request, *args, **kwargs):